@@ -0,0 +1,27 @@
+"""Offline benchmarks for the bot's hot paths."""
+
+from __future__ import annotations
+
+import random
+from typing import Dict, Optional
+
+from bot.storage import UserState
+
+# Snowflake-sized ids, so key sizes match real Discord users.
+BASE_ID = 300_000_000_000_000_000
+
+
+def population(size: int, rng: Optional[random.Random] = None) -> Dict[int, UserState]:
+    """``size`` players with random balances, seeded by ``size`` unless ``rng`` is given."""
+    rng = rng or random.Random(size)
+    return {
+        BASE_ID + index: UserState(
+            coins=rng.randint(0, 50_000),
+            streak=rng.randint(0, 30),
+            last_daily=1_700_000_000 + rng.randint(0, 86_400),
+        )
+        for index in range(size)
+    }
+
+
+__all__ = ["BASE_ID", "population"]
@@ -0,0 +1,123 @@
+"""Latency and success rate of LanguageOracle under injected gateway faults.
+
+Usage::
+
+    python -m bench.ai_gateway --requests 400 --concurrency 20
+
+Each scenario starts a :class:`~bench.fake_gateway.FakeGateway` with a
+different fault profile and runs the same uncached word-chain load through
+an oracle without any resilience (no retries, hedging or breaker) and one
+with the default :class:`~bot.resilience.ResiliencePolicy`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import Dict, List
+
+import httpx
+from openai import AsyncOpenAI
+
+from bench.fake_gateway import FakeGateway
+from bot.oracle import LanguageOracle
+from bot.resilience import ResiliencePolicy
+
+SCENARIOS: Dict[str, Dict[str, float]] = {
+    "healthy": {"latency": 0.1, "jitter": 0.05},
+    "slow-tail": {"latency": 0.1, "jitter": 0.05, "tail_probability": 0.05, "tail_latency": 3.0},
+    "flaky": {"latency": 0.1, "jitter": 0.05, "error_rate": 0.2},
+    "outage": {"latency": 0.5, "jitter": 0.0, "error_rate": 1.0},
+}
+
+POLICIES: Dict[str, ResiliencePolicy] = {
+    "none": ResiliencePolicy(deadline=10.0, max_retries=0, hedge_percentile=0.0, breaker_threshold=2.0),
+    "resilient": ResiliencePolicy(deadline=10.0),
+}
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def _run(scenario: Dict[str, float], policy: ResiliencePolicy, requests: int, concurrency: int) -> Dict[str, float]:
+    gateway = FakeGateway(seed=0, **scenario)
+    base_url = await gateway.start()
+    client = AsyncOpenAI(
+        api_key="bench",
+        base_url=base_url,
+        http_client=httpx.AsyncClient(limits=httpx.Limits(max_connections=concurrency * 2)),
+        max_retries=0,
+    )
+    oracle = LanguageOracle(client, max_concurrency=concurrency * 2, cache_size=0, resilience=policy)
+
+    latencies: List[float] = []
+    failures = 0
+    queue: "asyncio.Queue[int]" = asyncio.Queue()
+    for index in range(requests):
+        queue.put_nowait(index)
+
+    async def worker() -> None:
+        nonlocal failures
+        while not queue.empty():
+            index = queue.get_nowait()
+            started = time.perf_counter()
+            try:
+                await oracle.word_chain(f"seed{index % 6}", cached=False)
+            except Exception:
+                failures += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    stats = oracle.stats
+    await oracle.close()
+    await gateway.stop()
+
+    return {
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": _percentile(latencies, 0.95) * 1000,
+        "p99_ms": _percentile(latencies, 0.99) * 1000,
+        "success": 1 - failures / requests,
+        "gateway_requests": gateway.requests,
+        "retries": stats.retries,
+        "hedges": stats.hedges,
+        "rejected": stats.rejected,
+        "seconds": elapsed,
+    }
+
+
+async def _main(args: argparse.Namespace) -> None:
+    results = []
+    print(f"{'scenario':<11}{'policy':<11}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'ok %':>7}{'sent':>7}{'retry':>7}{'hedge':>7}{'reject':>8}")
+    for scenario_name in args.scenarios:
+        for policy_name, policy in POLICIES.items():
+            row = await _run(SCENARIOS[scenario_name], policy, args.requests, args.concurrency)
+            print(
+                f"{scenario_name:<11}{policy_name:<11}{row['p50_ms']:>9.0f}{row['p95_ms']:>9.0f}"
+                f"{row['p99_ms']:>9.0f}{row['success'] * 100:>7.1f}{row['gateway_requests']:>7}"
+                f"{row['retries']:>7}{row['hedges']:>7}{row['rejected']:>8}"
+            )
+            results.append({"scenario": scenario_name, "policy": policy_name, **row})
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--scenarios", nargs="+", choices=sorted(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--output", help="write results as JSON to this file")
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
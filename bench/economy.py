@@ -0,0 +1,334 @@
+"""Monte Carlo economy simulator for the game payout tables.
+
+Usage::
+
+    python -m bench.economy --plays 1000000
+    python -m bench.economy --players 10000 --hours 168 --rate 6 --mix dice=3,slots=3,fish=1,mine=1,work=1,daily=1
+    python -m bench.economy --verify 20000 --output economy.json
+
+Needs ``pip install numpy``. Every game is sampled from the tables in
+:mod:`bot.games.tables`, the ones the live games read, with whole batches
+of plays drawn as NumPy arrays instead of one ``random`` call at a time.
+
+The per-play report gives each game's expected value, standard deviation,
+tail quantiles and loss rate over ``--plays`` samples. The population run
+gives ``--players`` players ``--rate`` commands an hour for ``--hours``,
+split by ``--mix``. Work is capped by its cooldown and daily is claimed
+at most once per reset. It reports coins created per hour and the spread
+of final balances. Balances are floored at zero after each game's batch
+within an hour rather than after every play, so heavy losers lose a
+little less than they would live.
+
+``--verify N`` plays ``N`` rounds of each game through a real
+:class:`~bot.games.GameEngine` and checks that the live mean payout is
+within four standard errors of the simulated one.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import shutil
+import tempfile
+import time
+from typing import Callable, Dict, List, Tuple
+
+from bot.games.daily import DAILY_RESET
+from bot.games.tables import (
+    DAILY,
+    DICE,
+    FISHING,
+    MINING,
+    SLOTS,
+    WORK_PAY,
+    DiceTable,
+    FishingTable,
+    MiningTable,
+    Prize,
+    Range,
+    SlotsTable,
+)
+from bot.games.work import COOLDOWN_SECONDS
+
+try:  # pragma: no cover - optional dependency
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+DEFAULT_MIX = "work=1,daily=1,dice=3,slots=3,fish=1,mine=1"
+QUANTILES = (0.001, 0.01, 0.05, 0.5, 0.95, 0.99, 0.999)
+PER_PLAY_GAMES = ("work", "dice", "slots", "fish", "mine")
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise RuntimeError("bench.economy requires `pip install numpy`")
+
+
+def _randint(rng: "np.random.Generator", bounds: Range, size: int) -> "np.ndarray":
+    """``random.randint`` semantics (inclusive) for a batch."""
+    return rng.integers(bounds[0], bounds[1] + 1, size)
+
+
+def _loot(
+    rng: "np.random.Generator", prizes: Tuple[Prize, ...], weights: Tuple[int, ...], counts: "np.ndarray"
+) -> "np.ndarray":
+    """Total reward of ``counts[i]`` weighted draws for every play ``i``."""
+    draws = int(counts.sum())
+    p = np.asarray(weights, dtype=np.float64)
+    picks = rng.choice(len(prizes), size=draws, p=p / p.sum())
+    low = np.array([prize.low for prize in prizes])[picks]
+    high = np.array([prize.high for prize in prizes])[picks]
+    rewards = rng.integers(low, high + 1)
+    owners = np.repeat(np.arange(len(counts)), counts)
+    return np.bincount(owners, weights=rewards, minlength=len(counts)).astype(np.int64)
+
+
+def sample_fishing(rng: "np.random.Generator", size: int, table: FishingTable = FISHING) -> "np.ndarray":
+    casts = _randint(rng, table.casts, size)
+    total = _loot(rng, table.schools, table.weights, casts)
+    wave = (total >= table.bonus_threshold) & (rng.random(size) < table.bonus_chance)
+    return total + np.where(wave, _randint(rng, table.bonus, size), 0)
+
+
+def sample_mining(rng: "np.random.Generator", size: int, table: MiningTable = MINING) -> "np.ndarray":
+    excavations = _randint(rng, table.excavations, size)
+    total = _loot(rng, table.veins, table.weights, excavations)
+    jackpot = rng.random(size) < table.jackpot_chance
+    total += np.where(jackpot, _randint(rng, table.jackpot, size), 0)
+    return total - _randint(rng, table.fatigue, size)
+
+
+def sample_slots(rng: "np.random.Generator", size: int, table: SlotsTable = SLOTS) -> "np.ndarray":
+    reels = rng.integers(0, len(table.icons), (size, table.reels))
+    ordered = np.sort(reels, axis=1)
+    distinct = 1 + (np.diff(ordered, axis=1) != 0).sum(axis=1)
+    jackpot = (distinct == 1) & (reels[:, 0] == table.icons.index(table.jackpot_icon))
+    return np.select(
+        [jackpot, distinct == 1, distinct == 2],
+        [table.jackpot, table.triple, _randint(rng, table.pair, size)],
+        -_randint(rng, table.loss, size),
+    )
+
+
+def sample_dice(rng: "np.random.Generator", size: int, table: DiceTable = DICE) -> "np.ndarray":
+    roll = rng.integers(1, table.sides + 1, size)
+    return np.where(roll >= table.win_from, _randint(rng, table.win, size), -_randint(rng, table.loss, size))
+
+
+def sample_work(rng: "np.random.Generator", size: int, pay: Range = WORK_PAY) -> "np.ndarray":
+    return _randint(rng, pay, size)
+
+
+SAMPLERS: Dict[str, Callable[["np.random.Generator", int], "np.ndarray"]] = {
+    "work": sample_work,
+    "dice": sample_dice,
+    "slots": sample_slots,
+    "fish": sample_fishing,
+    "mine": sample_mining,
+}
+
+
+def summarize(deltas: "np.ndarray") -> Dict[str, float]:
+    """Expected value, spread and tails of one game's per-play coin delta."""
+    values = deltas.astype(np.float64)
+    report = {
+        "plays": int(values.size),
+        "mean": float(values.mean()),
+        "std": float(values.std()),
+        "variance": float(values.var()),
+        "min": int(deltas.min()),
+        "max": int(deltas.max()),
+        "loss_rate": float((deltas < 0).mean()),
+    }
+    for fraction, value in zip(QUANTILES, np.quantile(values, QUANTILES)):
+        report[f"p{fraction * 100:g}"] = float(value)
+    return report
+
+
+def _parse_mix(text: str) -> Dict[str, float]:
+    mix: Dict[str, float] = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SAMPLERS and name != "daily":
+            raise SystemExit(f"unknown game '{name}' in --mix (choose from {', '.join([*SAMPLERS, 'daily'])})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def simulate_population(
+    rng: "np.random.Generator",
+    players: int,
+    hours: int,
+    rate: float,
+    mix: Dict[str, float],
+) -> Dict[str, object]:
+    """Hour-by-hour balances of ``players`` playing ``rate`` commands an hour."""
+    total_weight = sum(mix.values())
+    work_cap = max(1, 3600 // COOLDOWN_SECONDS)
+    daily_every = math.ceil(DAILY_RESET / 3600)
+    balances = np.zeros(players, dtype=np.int64)
+    streaks = np.zeros(players, dtype=np.int64)
+    last_daily = np.full(players, -daily_every, dtype=np.int64)
+    per_hour: List[int] = []
+    minted = {name: 0 for name in mix}
+
+    for hour in range(hours):
+        before = int(balances.sum())
+        for name, weight in mix.items():
+            wants = rng.poisson(rate * weight / total_weight, players)
+            if name == "daily":
+                claims = (wants > 0) & (hour - last_daily >= daily_every)
+                streaks[claims] += 1
+                last_daily[claims] = hour
+                payout = DAILY.base + np.minimum(DAILY.streak_cap, streaks * DAILY.streak_step)
+                gained = np.where(claims, payout, 0)
+            else:
+                if name == "work":
+                    wants = np.minimum(wants, work_cap)
+                deltas = SAMPLERS[name](rng, int(wants.sum()))
+                owners = np.repeat(np.arange(players), wants)
+                gained = np.bincount(owners, weights=deltas, minlength=players).astype(np.int64)
+            updated = np.maximum(0, balances + gained)
+            minted[name] += int((updated - balances).sum())
+            balances = updated
+        per_hour.append(int(balances.sum()) - before)
+
+    created = np.asarray(per_hour, dtype=np.float64)
+    final = balances.astype(np.float64)
+    return {
+        "players": players,
+        "hours": hours,
+        "commands_per_player_hour": rate,
+        "mix": mix,
+        "coins_per_hour": float(created.mean()),
+        "coins_per_player_hour": float(created.mean() / players),
+        "coins_per_hour_by_game": {name: total / hours for name, total in minted.items()},
+        "money_supply": int(balances.sum()),
+        "final_balance": {
+            "mean": float(final.mean()),
+            "p50": float(np.quantile(final, 0.5)),
+            "p99": float(np.quantile(final, 0.99)),
+            "max": int(balances.max()),
+            "broke_share": float((balances == 0).mean()),
+        },
+    }
+
+
+async def _live_deltas(name: str, plays: int, data_path: str) -> List[int]:
+    from bot.games import GameEngine
+    from bot.storage import UserStore
+
+    store = UserStore(data_path, flush_interval=0, flush_threshold=10**9)
+    await store.load()
+    engine = GameEngine(store)
+    engine.start()
+    deltas = []
+    for index in range(plays):
+        # A fresh player per work round sidesteps the cooldown.
+        user_id = 1 + index if name == "work" else 1
+        deltas.append((await engine.play(name, user_id)).coins_delta)
+    await engine.close()
+    await store.close()
+    return deltas
+
+
+def verify(simulated: Dict[str, Dict[str, float]], plays: int) -> Dict[str, Dict[str, float]]:
+    """Compare each game's live mean payout with the simulated one."""
+    results = {}
+    workdir = tempfile.mkdtemp(prefix="economy-")
+    try:
+        for name in PER_PLAY_GAMES:
+            data_path = os.path.join(workdir, f"{name}.json")
+            live = np.asarray(asyncio.run(_live_deltas(name, plays, data_path)), dtype=np.float64)
+            expected = simulated[name]["mean"]
+            error = math.sqrt(simulated[name]["variance"] / plays) or 1.0
+            z = (float(live.mean()) - expected) / error
+            results[name] = {"live_mean": float(live.mean()), "simulated_mean": expected,
+                             "z": z, "ok": abs(z) < 4}
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--plays", type=int, default=1_000_000, help="samples per game for the per-play report")
+    parser.add_argument("--players", type=int, default=10_000, help="simulated population size")
+    parser.add_argument("--hours", type=int, default=168, help="simulated hours (0 = skip the population run)")
+    parser.add_argument("--rate", type=float, default=6.0, help="commands per player per hour")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="comma separated game=weight pairs")
+    parser.add_argument("--verify", type=int, default=0, metavar="N",
+                        help="also play N live rounds per game and compare the means")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="write the report as JSON to this file")
+    args = parser.parse_args()
+
+    try:
+        _require_numpy()
+    except RuntimeError as error:
+        raise SystemExit(str(error))
+    rng = np.random.default_rng(args.seed)
+    report: Dict[str, object] = {"config": {key: value for key, value in vars(args).items() if key != "output"}}
+
+    per_play = {}
+    print(f"{'game':<8}{'EV':>9}{'std':>9}{'loss %':>8}{'p1':>8}{'p50':>8}{'p99':>8}{'p99.9':>8}{'Mplays/s':>10}")
+    for name, sampler in SAMPLERS.items():
+        started = time.perf_counter()
+        deltas = sampler(rng, args.plays)
+        elapsed = time.perf_counter() - started
+        row = per_play[name] = {**summarize(deltas), "seconds": elapsed}
+        print(
+            f"{name:<8}{row['mean']:>9.1f}{row['std']:>9.1f}{row['loss_rate'] * 100:>8.1f}"
+            f"{row['p1']:>8.0f}{row['p50']:>8.0f}{row['p99']:>8.0f}{row['p99.9']:>8.0f}"
+            f"{args.plays / elapsed / 1e6:>10.1f}"
+        )
+    streak_cap_days = math.ceil(DAILY.streak_cap / DAILY.streak_step)
+    print(f"daily   {DAILY.base + DAILY.streak_step}..{DAILY.base + DAILY.streak_cap} "
+          f"(max from day {streak_cap_days})")
+    report["per_play"] = per_play
+
+    if args.hours > 0:
+        started = time.perf_counter()
+        population = simulate_population(rng, args.players, args.hours, args.rate, _parse_mix(args.mix))
+        population["seconds"] = time.perf_counter() - started
+        report["population"] = population
+        final = population["final_balance"]
+        print(
+            f"\n{args.players} players x {args.hours}h at {args.rate:g} commands/h: "
+            f"{population['coins_per_hour']:.0f} coins/h created "
+            f"({population['coins_per_player_hour']:.1f} per player), "
+            f"money supply {population['money_supply']}"
+        )
+        print(
+            "by game/h: "
+            + ", ".join(f"{name} {value:.0f}" for name, value in population["coins_per_hour_by_game"].items())
+        )
+        print(
+            f"final balance mean {final['mean']:.0f}, p50 {final['p50']:.0f}, p99 {final['p99']:.0f}, "
+            f"max {final['max']}, broke {final['broke_share'] * 100:.1f}%"
+        )
+
+    if args.verify:
+        random.seed(args.seed)
+        checks = report["verify"] = verify(per_play, args.verify)
+        print()
+        for name, check in checks.items():
+            status = "ok" if check["ok"] else "DRIFT"
+            print(f"verify {name:<6} live {check['live_mean']:>8.2f} sim {check['simulated_mean']:>8.2f} "
+                  f"z {check['z']:>6.2f} {status}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+    if args.verify and not all(check["ok"] for check in report["verify"].values()):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
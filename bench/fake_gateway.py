@@ -0,0 +1,165 @@
+"""Local OpenAI-compatible chat completions server with injectable faults.
+
+Usage::
+
+    python -m bench.fake_gateway --port 8765 --latency 0.3 --tail-probability 0.05
+
+Point the oracle at ``http://127.0.0.1:8765/v1`` to exercise deadlines,
+retries, hedging and the circuit breaker without touching the real AI
+gateway. Both plain and ``stream=True`` requests are answered.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Optional
+
+from aiohttp import web
+
+CHUNK_WORDS = 24
+
+
+class FakeGateway:
+    """Answer ``POST /v1/chat/completions`` after a configurable delay.
+
+    Each request sleeps ``latency`` plus up to ``jitter`` seconds; with
+    probability ``tail_probability`` it sleeps ``tail_latency`` instead.
+    A share ``error_rate`` of requests fail with HTTP ``error_status``.
+    Streaming responses send the first chunk after the delay and then one
+    chunk every ``chunk_delay`` seconds.
+    """
+
+    def __init__(
+        self,
+        *,
+        latency: float = 0.2,
+        jitter: float = 0.05,
+        tail_probability: float = 0.0,
+        tail_latency: float = 2.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        chunk_delay: float = 0.02,
+        seed: Optional[int] = None,
+    ) -> None:
+        self.latency = latency
+        self.jitter = jitter
+        self.tail_probability = tail_probability
+        self.tail_latency = tail_latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.chunk_delay = chunk_delay
+        self.requests = 0
+        self.errors = 0
+        self._rng = random.Random(seed)
+        self._runner: Optional[web.AppRunner] = None
+        self.base_url = ""
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/v1/chat/completions", self._completions)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start serving and return the ``/v1`` base URL."""
+        self._runner = web.AppRunner(self.app())
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        bound_port = self._runner.addresses[0][1]
+        self.base_url = f"http://{host}:{bound_port}/v1"
+        return self.base_url
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _completions(self, request: web.Request) -> web.StreamResponse:
+        self.requests += 1
+        body = await request.json()
+        if self._rng.random() < self.tail_probability:
+            delay = self.tail_latency
+        else:
+            delay = self.latency + self._rng.uniform(0.0, self.jitter)
+        await asyncio.sleep(delay)
+
+        if self._rng.random() < self.error_rate:
+            self.errors += 1
+            return web.json_response(
+                {"error": {"message": "injected failure", "type": "server_error"}},
+                status=self.error_status,
+            )
+
+        text = " ".join(f"từ{index}" for index in range(CHUNK_WORDS))
+        completion_id = f"chatcmpl-{self.requests}"
+        created = int(time.time())
+        model = body.get("model", "fake")
+        if not body.get("stream"):
+            return web.json_response(
+                {
+                    "id": completion_id,
+                    "object": "chat.completion",
+                    "created": created,
+                    "model": model,
+                    "choices": [
+                        {
+                            "index": 0,
+                            "message": {"role": "assistant", "content": text},
+                            "finish_reason": "stop",
+                        }
+                    ],
+                }
+            )
+
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        for index, word in enumerate(text.split(" ")):
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [
+                    {
+                        "index": 0,
+                        "delta": {"content": word if index == 0 else f" {word}"},
+                        "finish_reason": None,
+                    }
+                ],
+            }
+            await response.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            await asyncio.sleep(self.chunk_delay)
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--jitter", type=float, default=0.05)
+    parser.add_argument("--tail-probability", type=float, default=0.0)
+    parser.add_argument("--tail-latency", type=float, default=2.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    args = parser.parse_args()
+
+    gateway = FakeGateway(
+        latency=args.latency,
+        jitter=args.jitter,
+        tail_probability=args.tail_probability,
+        tail_latency=args.tail_latency,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+    )
+    web.run_app(gateway.app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+"""Drive GameEngine with simulated players and no Discord connection.
+
+Usage::
+
+    python -m bench.game_load --users 100000 --concurrency 200 --commands 50000
+    python -m bench.game_load --mix dice=1 --output dice.json
+    python -m bench.game_load --mix wordchain=1,dice=4 --ai-latency 0.3
+    python -m bench.game_load --data-path sqlite:///tmp/users.db
+
+Each worker picks a player and a command (weighted by ``--mix``) and awaits
+``GameEngine.play`` until ``--commands`` have run. Before every command
+it sleeps ``--think-time`` seconds, or at least yields to the event loop.
+Uncontended commands never suspend, so without this one worker would run
+everything back to back and the background flusher would never get a
+turn during the measurement. Cooldown refusals (work,
+daily) count as ``rejected``, not errors. AI games use an in-process fake
+oracle whose latency is ``--ai-latency`` +/- ``--ai-jitter``. The report
+has throughput, p50/p95/p99 per command and overall, the store's size on
+disk after close, and peak RSS. ``--output`` writes it as JSON, tagged
+with the current git commit, so runs can be compared across commits.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from bench import BASE_ID, population
+from bot.content_pool import ContentPool
+from bot.games import GAMES, GameEngine, GameError
+from bot.storage import UserStore, open_backend, parse_data_url
+
+DEFAULT_MIX = "work=1,daily=1,dice=3,slots=3,fish=1,mine=1"
+
+
+class FakeOracle:
+    """Stand-in for :class:`~bot.oracle.LanguageOracle` with injectable latency."""
+
+    def __init__(self, latency: float, jitter: float, rng: random.Random) -> None:
+        self.latency = latency
+        self.jitter = jitter
+        self.calls = 0
+        self._rng = rng
+
+    async def _wait(self) -> None:
+        self.calls += 1
+        await asyncio.sleep(max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter)))
+
+    async def word_chain(self, start_word: str, *, cached: bool = True) -> str:
+        await self._wait()
+        return f"{start_word} - sáng tạo - tạo hình - hình ảnh"
+
+    async def vietnamese_king(self, *, cached: bool = True) -> str:
+        await self._wait()
+        return "Sắp xếp các chữ cái: n/g/ư/ờ/i → người"
+
+    async def stream_word_chain(self, start_word: str) -> AsyncIterator[str]:
+        yield await self.word_chain(start_word)
+
+    async def stream_vietnamese_king(self) -> AsyncIterator[str]:
+        yield await self.vietnamese_king()
+
+
+def _parse_mix(text: str) -> Dict[str, float]:
+    mix: Dict[str, float] = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in GAMES:
+            raise SystemExit(f"unknown game '{name}' in --mix (choose from {', '.join(GAMES)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def _summary(latencies: List[float]) -> Dict[str, float]:
+    ordered = sorted(latencies)
+    return {
+        "count": len(ordered),
+        "mean_ms": statistics.fmean(ordered) * 1000 if ordered else 0.0,
+        "p50_ms": _percentile(ordered, 0.50) * 1000,
+        "p95_ms": _percentile(ordered, 0.95) * 1000,
+        "p99_ms": _percentile(ordered, 0.99) * 1000,
+    }
+
+
+def _disk_usage(data_path: str) -> int:
+    path = parse_data_url(data_path)[1]
+    directory = os.path.dirname(path) or "."
+    prefix = os.path.basename(path)
+    return sum(
+        os.path.getsize(os.path.join(directory, name))
+        for name in os.listdir(directory)
+        if name.startswith(prefix)
+    )
+
+
+def _peak_rss_bytes() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _seed_population(data_path: str, users: int, rng: random.Random) -> None:
+    backend = open_backend(data_path)
+    if getattr(backend, "lazy", False):
+        backend.open()
+    backend.write_snapshot(population(users, rng))
+    backend.close()
+
+
+async def run(args: argparse.Namespace, data_path: str) -> Dict[str, object]:
+    rng = random.Random(args.seed)
+    mix = _parse_mix(args.mix)
+    names = list(mix)
+    weights = [mix[name] for name in names]
+
+    if args.preload:
+        _seed_population(data_path, args.users, rng)
+    store = UserStore(
+        data_path,
+        flush_interval=args.flush_interval,
+        flush_threshold=args.flush_threshold,
+        cache_size=args.cache_size,
+    )
+    started = time.perf_counter()
+    await store.load()
+    load_seconds = time.perf_counter() - started
+
+    oracle = FakeOracle(args.ai_latency, args.ai_jitter, rng)
+    needs_ai = any(GAMES[name].requires_ai for name in names)
+    engine = GameEngine(store, language_oracle=oracle if needs_ai else None, content_pool=ContentPool())
+    engine.start()
+
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    outcomes: Dict[Tuple[str, str], int] = defaultdict(int)
+    remaining = args.commands
+
+    async def worker() -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            await asyncio.sleep(args.think_time)
+            name = rng.choices(names, weights)[0]
+            user_id = BASE_ID + rng.randrange(args.users)
+            began = time.perf_counter()
+            try:
+                await engine.play(name, user_id)
+                outcome = "ok"
+            except GameError:
+                outcome = "rejected"
+            except Exception:
+                outcome = "error"
+            latencies[name].append(time.perf_counter() - began)
+            outcomes[name, outcome] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+
+    await engine.close()
+    started = time.perf_counter()
+    await store.close()
+    close_seconds = time.perf_counter() - started
+
+    every = [latency for values in latencies.values() for latency in values]
+    per_command = {
+        name: {
+            **_summary(latencies[name]),
+            "ok": outcomes[name, "ok"],
+            "rejected": outcomes[name, "rejected"],
+            "errors": outcomes[name, "error"],
+        }
+        for name in names
+    }
+    write_stats = store.stats
+    return {
+        "commit": _git_commit(),
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        "data_path": data_path,
+        "elapsed_seconds": elapsed,
+        "throughput_per_second": args.commands / elapsed,
+        "latency": _summary(every),
+        "commands": per_command,
+        "store": {
+            "load_seconds": load_seconds,
+            "close_seconds": close_seconds,
+            "bytes_on_disk": _disk_usage(data_path),
+            "bytes_written": store.bytes_written,
+            "mutations": write_stats.marked,
+            "writes": write_stats.flushes,
+        },
+        "lock_contended": engine.lock_stats.contended,
+        "oracle_calls": oracle.calls,
+        "peak_rss_bytes": _peak_rss_bytes(),
+    }
+
+
+def _print(report: Dict[str, object]) -> None:
+    print(
+        f"{report['config']['commands']} commands in {report['elapsed_seconds']:.2f}s "
+        f"= {report['throughput_per_second']:.0f}/s"
+    )
+    print(f"{'command':<12}{'count':>8}{'ok':>8}{'rejected':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    rows = dict(report["commands"])
+    rows["all"] = {**report["latency"], "ok": "", "rejected": ""}
+    for name, row in rows.items():
+        print(
+            f"{name:<12}{row['count']:>8}{row['ok']:>8}{row['rejected']:>10}"
+            f"{row['p50_ms']:>9.2f}{row['p95_ms']:>9.2f}{row['p99_ms']:>9.2f}"
+        )
+    store = report["store"]
+    print(
+        f"store: load {store['load_seconds']:.2f}s, close {store['close_seconds']:.2f}s, "
+        f"{store['bytes_on_disk'] / 2**20:.1f} MiB on disk, {store['writes']} writes; "
+        f"peak RSS {report['peak_rss_bytes'] / 2**20:.0f} MiB"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=10_000, help="player population size")
+    parser.add_argument("--concurrency", type=int, default=100, help="simulated players in flight")
+    parser.add_argument("--commands", type=int, default=20_000, help="total commands to run")
+    parser.add_argument("--think-time", type=float, default=0.0,
+                        help="seconds each worker waits before its next command")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="comma separated game=weight pairs")
+    parser.add_argument("--ai-latency", type=float, default=0.2, help="fake oracle latency (seconds)")
+    parser.add_argument("--ai-jitter", type=float, default=0.05)
+    parser.add_argument("--data-path", help="DATA_PATH to test (default: a JSON file in a temp dir)")
+    parser.add_argument("--no-preload", dest="preload", action="store_false",
+                        help="start from an empty store instead of --users existing players")
+    parser.add_argument("--flush-interval", type=float, default=2.0)
+    parser.add_argument("--flush-threshold", type=int, default=100)
+    parser.add_argument("--cache-size", type=int, default=50_000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="write the report as JSON to this file")
+    args = parser.parse_args()
+
+    workdir = None
+    data_path = args.data_path
+    if data_path is None:
+        workdir = tempfile.mkdtemp(prefix="game-load-")
+        data_path = os.path.join(workdir, "users.json")
+    try:
+        report = asyncio.run(run(args, data_path))
+    finally:
+        if workdir is not None:
+            shutil.rmtree(workdir, ignore_errors=True)
+    _print(report)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""Requests/s and latency of the webhook server's ``/health`` and webhook routes.
+
+Usage::
+
+    python -m bench.http_load --requests 5000 --concurrency 50
+
+``aiohttp`` is the current :class:`~bot.webhook_server.WebhookServer`;
+``flask`` is the previous Flask development server with the same routes,
+kept as the baseline and skipped when Flask is not installed. Each server
+runs in its own process so the load generator does not share its CPU.
+Pass ``--url`` to load an already running server instead.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import statistics
+import time
+from typing import Dict, List, Optional
+
+import aiohttp
+
+WEBHOOK_PATH = "/discord-webhook"
+PAYLOAD = {"type": 1, "id": "1234567890", "data": {"name": "work"}}
+
+
+def _serve_aiohttp(port: int) -> None:
+    from bot.webhook_server import WebhookServer
+
+    async def serve() -> None:
+        server = WebhookServer(port=port, path=WEBHOOK_PATH, host="127.0.0.1")
+        await server.start()
+        await asyncio.Event().wait()
+
+    logging.disable(logging.INFO)
+    asyncio.run(serve())
+
+
+def _serve_flask(port: int) -> None:
+    from flask import Flask, jsonify, request
+
+    app = Flask(__name__)
+
+    @app.route("/health", methods=["GET"])
+    def health_check():
+        return jsonify({"status": "ok", "service": "discord-bot"}), 200
+
+    @app.route(WEBHOOK_PATH, methods=["POST"])
+    def discord_webhook():
+        request.get_json()
+        return jsonify({"status": "received"}), 200
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    app.run(host="127.0.0.1", port=port, debug=False)
+
+
+SERVERS = {"aiohttp": _serve_aiohttp, "flask": _serve_flask}
+
+
+async def _wait_ready(session: aiohttp.ClientSession, base_url: str) -> None:
+    deadline = time.monotonic() + 15
+    while True:
+        try:
+            async with session.get(f"{base_url}/health") as response:
+                if response.status == 200:
+                    return
+        except aiohttp.ClientError:
+            if time.monotonic() > deadline:
+                raise
+        await asyncio.sleep(0.1)
+
+
+async def _load(base_url: str, route: str, requests: int, concurrency: int) -> Dict[str, float]:
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        await _wait_ready(session, base_url)
+        latencies: List[float] = []
+        errors = 0
+        remaining = requests
+
+        async def worker() -> None:
+            nonlocal remaining, errors
+            while remaining > 0:
+                remaining -= 1
+                started = time.perf_counter()
+                try:
+                    if route == "health":
+                        request = session.get(f"{base_url}/health")
+                    else:
+                        request = session.post(f"{base_url}{WEBHOOK_PATH}", json=PAYLOAD)
+                    async with request as response:
+                        await response.read()
+                        if response.status != 200:
+                            errors += 1
+                except aiohttp.ClientError:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "rps": requests / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(0.99 * len(latencies)))] * 1000,
+        "errors": errors,
+    }
+
+
+def _start(name: str, port: int) -> Optional[multiprocessing.Process]:
+    if name == "flask":
+        try:
+            import flask  # noqa: F401
+        except ImportError:
+            print("skipping flask: pip install flask to run the baseline")
+            return None
+    process = multiprocessing.Process(target=SERVERS[name], args=(port,), daemon=True)
+    process.start()
+    return process
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--servers", nargs="+", choices=sorted(SERVERS), default=["flask", "aiohttp"])
+    parser.add_argument("--url", help="load this running server instead of starting one")
+    parser.add_argument("--port", type=int, default=18080)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    targets = [("url", args.url.rstrip("/"))] if args.url else [
+        (name, f"http://127.0.0.1:{args.port + index}") for index, name in enumerate(args.servers)
+    ]
+    results = []
+    print(f"{'server':<10}{'route':<9}{'req/s':>10}{'p50 ms':>9}{'p99 ms':>9}{'errors':>8}")
+    for index, (name, base_url) in enumerate(targets):
+        process = None if args.url else _start(name, args.port + index)
+        if process is None and not args.url:
+            continue
+        try:
+            for route in ("health", "webhook"):
+                row = asyncio.run(_load(base_url, route, args.requests, args.concurrency))
+                print(
+                    f"{name:<10}{route:<9}{row['rps']:>10.0f}{row['p50_ms']:>9.1f}"
+                    f"{row['p99_ms']:>9.1f}{row['errors']:>8}"
+                )
+                results.append({"server": name, "route": route, **row})
+        finally:
+            if process is not None:
+                process.terminate()
+                process.join()
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Latency of leaderboard queries: incremental index vs sorting per request.
+
+Usage::
+
+    python -m bench.leaderboard --sizes 10000 100000 1000000 --ops 2000
+
+Each operation changes one random player's balance and then answers a
+top-10 query and a rank query for that player. ``sort`` is the approach
+available before the index existed: sort every cached ``UserState`` per
+query. ``index`` is :class:`~bot.leaderboard.Leaderboard` fed by the
+store listener.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import time
+from typing import Callable, Dict
+
+from bench import BASE_ID, population
+from bot.leaderboard import Leaderboard
+from bot.storage import UserState
+
+TOP = 10
+
+
+Op = Callable[[int, int], None]
+
+
+def _sort(users: Dict[int, UserState]) -> Op:
+    def op(user_id: int, coins: int) -> None:
+        users[user_id].coins = coins
+        ordered = sorted(users.items(), key=lambda item: (-item[1].coins, item[0]))
+        ordered[:TOP]
+        next(position for position, (key, _) in enumerate(ordered, start=1) if key == user_id)
+
+    return op
+
+
+def _index(users: Dict[int, UserState]) -> Op:
+    board = Leaderboard()
+    board.rebuild(users.items())
+
+    def op(user_id: int, coins: int) -> None:
+        state = users[user_id]
+        state.coins = coins
+        board.on_change(user_id, state, ("coins",))
+        board.top(TOP)
+        board.rank(user_id)
+
+    return op
+
+
+STRATEGIES: Dict[str, Callable[[Dict[int, UserState]], Op]] = {
+    "sort": _sort,
+    "index": _index,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--ops", type=int, default=2000, help="updates + queries per strategy")
+    parser.add_argument("--sort-ops", type=int, default=20, help="cap for the naive strategy")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'strategy':<10}{'users':>10}{'setup s':>10}{'ops':>8}{'us/op':>14}")
+    for size in args.sizes:
+        rng = random.Random(args.seed)
+        users = population(size, rng)
+        ops = [(BASE_ID + rng.randrange(size), rng.randint(0, 50_000)) for _ in range(args.ops)]
+        for name, prepare in STRATEGIES.items():
+            batch = ops[: args.sort_ops] if name == "sort" else ops
+            started = time.perf_counter()
+            op = prepare(users)
+            setup = time.perf_counter() - started
+            started = time.perf_counter()
+            for user_id, coins in batch:
+                op(user_id, coins)
+            per_op = (time.perf_counter() - started) / len(batch)
+            results.append({
+                "strategy": name,
+                "users": size,
+                "setup_seconds": setup,
+                "ops": len(batch),
+                "seconds_per_op": per_op,
+            })
+            print(f"{name:<10}{size:>10}{setup:>10.2f}{len(batch):>8}{per_op * 1e6:>14.1f}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Measure the memory cost of cached user populations with ``tracemalloc``.
+
+Usage::
+
+    python -m bench.memory --sizes 10000 100000 1000000
+
+Compares the original layout (``__dict__`` dataclasses keyed by ``str``)
+against the current slotted ``UserState`` keyed by the integer Discord id.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import tracemalloc
+from dataclasses import dataclass
+from typing import Callable, Dict
+
+from bench import BASE_ID
+from bot.storage import UserState
+
+
+@dataclass
+class LegacyUserState:
+    coins: int = 0
+    streak: int = 0
+    last_daily: int = 0
+
+
+def _legacy(size: int) -> Dict[str, LegacyUserState]:
+    return {
+        str(BASE_ID + index): LegacyUserState(coins=index % 50_000, streak=index % 30, last_daily=1_700_000_000 + index)
+        for index in range(size)
+    }
+
+
+def _slotted(size: int) -> Dict[int, UserState]:
+    return {
+        BASE_ID + index: UserState(coins=index % 50_000, streak=index % 30, last_daily=1_700_000_000 + index)
+        for index in range(size)
+    }
+
+
+LAYOUTS: Dict[str, Callable[[int], object]] = {
+    "dict+str": _legacy,
+    "slots+int": _slotted,
+}
+
+
+def measure(build: Callable[[int], object], size: int) -> int:
+    gc.collect()
+    tracemalloc.start()
+    population = build(size)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del population
+    return current
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'layout':<12}{'users':>10}{'total MiB':>12}{'bytes/user':>12}")
+    for size in args.sizes:
+        for name, build in LAYOUTS.items():
+            used = measure(build, size)
+            results.append({"layout": name, "users": size, "bytes": used, "bytes_per_user": used / size})
+            print(f"{name:<12}{size:>10}{used / 2**20:>12.1f}{used / size:>12.1f}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
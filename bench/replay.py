@@ -0,0 +1,245 @@
+"""Replay a recorded command trace against GameEngine and UserStore.
+
+Usage::
+
+    python -m bench.replay bot/data/trace.jsonl              # real time
+    python -m bench.replay trace.jsonl --speed 10            # 10x faster
+    python -m bench.replay trace.jsonl --speed 0 --concurrency 50
+    python -m bench.replay trace.jsonl --check-balances --output run.json
+
+Record a trace by setting ``TRACE_PATH`` on the bot. Each record is
+scheduled at its original offset divided by ``--speed``. ``--speed 0``
+ignores the timestamps and keeps ``--concurrency`` commands in flight. The
+global ``random`` module is seeded with ``--seed`` before the first
+command, so a sequential replay (``--speed 0 --concurrency 1``) rolls the
+same dice on every run.
+
+Game outcomes depend on that RNG and on the wall clock (cooldowns), so they
+are compared to the trace but not expected to match exactly. The report
+counts mismatches per game. ``--check-balances`` reopens the store after
+the replay and checks that every player's persisted balance equals the
+last balance a command returned. The report always includes a digest of
+the final balances, so two runs of the same trace and seed can be
+compared across commits.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+from bot.content_pool import ContentPool
+from bot.games import GAMES, GameEngine, GameError
+from bot.storage import UserStore
+from bot.trace import TraceRecord, read_trace
+
+from .game_load import FakeOracle, _disk_usage, _git_commit, _peak_rss_bytes, _summary
+
+
+def _balances_digest(balances: Dict[int, int]) -> str:
+    digest = hashlib.sha256()
+    for user_id in sorted(balances):
+        digest.update(f"{user_id}:{balances[user_id]}\n".encode("ascii"))
+    return digest.hexdigest()[:16]
+
+
+async def _check_balances(data_path: str, expected: Dict[int, int]) -> List[Dict[str, int]]:
+    """Reopen ``data_path`` and list players whose stored coins differ."""
+    store = UserStore(data_path, flush_interval=0)
+    await store.load()
+    persisted = {user_id: (await store.get(user_id)).coins for user_id in expected}
+    await store.close()
+    mismatches = [
+        {"user": user_id, "expected": coins, "persisted": persisted[user_id]}
+        for user_id, coins in sorted(expected.items())
+        if persisted[user_id] != coins
+    ]
+    return mismatches
+
+
+async def run(args: argparse.Namespace, records: List[TraceRecord], data_path: str) -> Dict[str, object]:
+    unknown = sorted({record.game for record in records if record.game not in GAMES})
+    if unknown:
+        raise SystemExit(f"trace uses unknown games: {', '.join(unknown)}")
+
+    random.seed(args.seed)
+    store = UserStore(
+        data_path,
+        flush_interval=args.flush_interval,
+        flush_threshold=args.flush_threshold,
+        cache_size=args.cache_size,
+    )
+    await store.load()
+    oracle = FakeOracle(args.ai_latency, args.ai_jitter, random.Random(args.seed))
+    engine = GameEngine(store, language_oracle=oracle, content_pool=ContentPool())
+    engine.start()
+
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    outcomes: Dict[Tuple[str, str], int] = defaultdict(int)
+    mismatched: Dict[str, int] = defaultdict(int)
+    schedule_lag: List[float] = []
+    balances: Dict[int, int] = {}
+    coins_delta = 0
+
+    async def play(record: TraceRecord) -> None:
+        nonlocal coins_delta
+        began = time.perf_counter()
+        try:
+            result = await engine.play(record.game, record.user)
+            outcome = "ok"
+            coins_delta += result.coins_delta
+            if result.state is not None:
+                balances[record.user] = result.state.coins
+        except GameError:
+            outcome = "rejected"
+        except Exception:
+            outcome = "error"
+        latencies[record.game].append(time.perf_counter() - began)
+        outcomes[record.game, outcome] += 1
+        if outcome != record.outcome:
+            mismatched[record.game] += 1
+
+    started = time.perf_counter()
+    if args.speed > 0:
+        tasks = []
+        for record in records:
+            delay = started + record.offset / args.speed - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            schedule_lag.append(max(0.0, -delay))
+            tasks.append(asyncio.create_task(play(record)))
+        await asyncio.gather(*tasks)
+    else:
+        pending = iter(records)
+
+        async def worker() -> None:
+            for record in pending:
+                await play(record)
+
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+
+    await engine.close()
+    await store.close()
+
+    every = [latency for values in latencies.values() for latency in values]
+    per_command = {
+        name: {
+            **_summary(latencies[name]),
+            "ok": outcomes[name, "ok"],
+            "rejected": outcomes[name, "rejected"],
+            "errors": outcomes[name, "error"],
+            "mismatched": mismatched[name],
+        }
+        for name in sorted(latencies)
+    }
+    report: Dict[str, object] = {
+        "commit": _git_commit(),
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        "data_path": data_path,
+        "records": len(records),
+        "players": len({record.user for record in records}),
+        "trace_seconds": records[-1].offset if records else 0.0,
+        "elapsed_seconds": elapsed,
+        "throughput_per_second": len(records) / elapsed if elapsed else 0.0,
+        "latency": _summary(every),
+        "schedule_lag": _summary(schedule_lag),
+        "commands": per_command,
+        "trace_coins_delta": sum(record.coins_delta for record in records),
+        "replay_coins_delta": coins_delta,
+        "balances_digest": _balances_digest(balances),
+        "bytes_on_disk": _disk_usage(data_path),
+        "peak_rss_bytes": _peak_rss_bytes(),
+    }
+    if args.check_balances:
+        report["balance_mismatches"] = await _check_balances(data_path, balances)
+    return report
+
+
+def _print(report: Dict[str, object]) -> None:
+    print(
+        f"{report['records']} commands from {report['players']} players "
+        f"({report['trace_seconds']:.1f}s of trace) in {report['elapsed_seconds']:.2f}s "
+        f"= {report['throughput_per_second']:.0f}/s"
+    )
+    print(f"{'command':<12}{'count':>8}{'ok':>8}{'rejected':>10}{'mismatch':>10}"
+          f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for name, row in report["commands"].items():
+        print(
+            f"{name:<12}{row['count']:>8}{row['ok']:>8}{row['rejected']:>10}{row['mismatched']:>10}"
+            f"{row['p50_ms']:>9.2f}{row['p95_ms']:>9.2f}{row['p99_ms']:>9.2f}"
+        )
+    latency = report["latency"]
+    print(
+        f"{'all':<12}{latency['count']:>8}{'':>28}"
+        f"{latency['p50_ms']:>9.2f}{latency['p95_ms']:>9.2f}{latency['p99_ms']:>9.2f}"
+    )
+    if report["schedule_lag"]["count"]:
+        print(f"schedule lag p99 {report['schedule_lag']['p99_ms']:.2f} ms")
+    print(
+        f"coins delta: trace {report['trace_coins_delta']}, replay {report['replay_coins_delta']}; "
+        f"balances digest {report['balances_digest']}"
+    )
+    if "balance_mismatches" in report:
+        mismatches = report["balance_mismatches"]
+        if mismatches:
+            print(f"balance check FAILED for {len(mismatches)} players, e.g. {mismatches[0]}")
+        else:
+            print("balance check passed")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("trace", help="trace file written with TRACE_PATH")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="replay speed multiplier (0 = as fast as possible)")
+    parser.add_argument("--concurrency", type=int, default=1, help="commands in flight with --speed 0")
+    parser.add_argument("--limit", type=int, help="replay only the first N records")
+    parser.add_argument("--seed", type=int, default=7, help="seed for the games' random module")
+    parser.add_argument("--check-balances", action="store_true",
+                        help="reopen the store afterwards and verify every balance")
+    parser.add_argument("--ai-latency", type=float, default=0.2, help="fake oracle latency (seconds)")
+    parser.add_argument("--ai-jitter", type=float, default=0.05)
+    parser.add_argument("--data-path", help="DATA_PATH to replay into (default: a JSON file in a temp dir)")
+    parser.add_argument("--flush-interval", type=float, default=2.0)
+    parser.add_argument("--flush-threshold", type=int, default=100)
+    parser.add_argument("--cache-size", type=int, default=50_000)
+    parser.add_argument("--output", help="write the report as JSON to this file")
+    args = parser.parse_args()
+
+    records = list(read_trace(args.trace))
+    if args.limit is not None:
+        records = records[: args.limit]
+    if not records:
+        raise SystemExit(f"no commands in {args.trace}")
+
+    workdir = None
+    data_path = args.data_path
+    if data_path is None:
+        workdir = tempfile.mkdtemp(prefix="replay-")
+        data_path = os.path.join(workdir, "users.json")
+    try:
+        report = asyncio.run(run(args, records, data_path))
+    finally:
+        if workdir is not None:
+            shutil.rmtree(workdir, ignore_errors=True)
+    _print(report)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+    if report.get("balance_mismatches"):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
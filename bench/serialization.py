@@ -0,0 +1,88 @@
+"""Serialize/deserialize throughput and file size for each user codec.
+
+Usage::
+
+    python -m bench.serialization --sizes 10000 100000 1000000
+
+Codecs whose optional dependency is missing are skipped. ``json-indent``
+is the original ``json.dump(..., indent=2)`` path, kept as the baseline.
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import time
+from typing import BinaryIO, Dict, List, Mapping
+
+from bench import population
+from bot.serialization import CODECS, UserCodec, detect_codec, get_codec
+from bot.storage import UserState
+
+
+class IndentedJsonCodec:
+    name = "json-indent"
+
+    def encode(self, users: Mapping[int, UserState], handle: BinaryIO) -> None:
+        text = json.dumps({uid: state.to_dict() for uid, state in users.items()}, indent=2)
+        handle.write(text.encode("utf-8"))
+
+    def decode(self, raw: bytes) -> Dict[int, UserState]:
+        return {int(uid): UserState.from_dict(data) for uid, data in json.loads(raw).items()}
+
+
+def _codecs() -> List[UserCodec]:
+    codecs: List[UserCodec] = [IndentedJsonCodec()]
+    for name in CODECS:
+        try:
+            codecs.append(get_codec(name))
+        except RuntimeError as error:
+            print(f"skipping {name}: {error}")
+    return codecs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    codecs = _codecs()
+    results = []
+    print(f"{'codec':<13}{'users':>10}{'encode k/s':>13}{'decode k/s':>13}{'size MiB':>11}")
+    for size in args.sizes:
+        users = population(size)
+        for codec in codecs:
+            buffer = io.BytesIO()
+            started = time.perf_counter()
+            codec.encode(users, buffer)
+            encode_s = time.perf_counter() - started
+
+            raw = buffer.getvalue()
+            decoder = codec if isinstance(codec, IndentedJsonCodec) else detect_codec(raw)
+            started = time.perf_counter()
+            decoded = decoder.decode(raw)
+            decode_s = time.perf_counter() - started
+            assert decoded == users
+
+            row = {
+                "codec": codec.name,
+                "users": size,
+                "encode_users_per_s": size / encode_s,
+                "decode_users_per_s": size / decode_s,
+                "bytes": len(raw),
+            }
+            results.append(row)
+            print(
+                f"{codec.name:<13}{size:>10}{row['encode_users_per_s'] / 1000:>13.0f}"
+                f"{row['decode_users_per_s'] / 1000:>13.0f}{len(raw) / 2**20:>11.2f}"
+            )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
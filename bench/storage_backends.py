@@ -0,0 +1,91 @@
+"""Compare per-command write cost and recovery time of storage backends.
+
+Usage::
+
+    python -m bench.storage_backends --sizes 10000 100000 1000000
+
+Every simulated command changes one user's coins and is persisted on its
+own, which is the worst case for the store (no write-behind coalescing).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+from bench import population
+from bot.journal import JournalBackend
+from bot.storage import JsonFileBackend, StorageBackend
+
+
+def _run(factory: Callable[[str], StorageBackend], size: int, commands: int, workdir: str) -> Dict[str, float]:
+    path = os.path.join(workdir, "users.json")
+    users = population(size)
+    keys = list(users)
+    backend = factory(path)
+    backend.write_snapshot(users)
+
+    rng = random.Random(0)
+    timings: List[float] = []
+    for _ in range(commands):
+        user_id = rng.choice(keys)
+        users[user_id].coins += rng.randint(-40, 120)
+        started = time.perf_counter()
+        backend.write_changes(users, {user_id: {"coins"}})
+        timings.append(time.perf_counter() - started)
+    backend.close()
+
+    started = time.perf_counter()
+    recovered = factory(path).read_all()
+    recovery = time.perf_counter() - started
+    assert len(recovered) == size
+
+    return {
+        "write_mean_ms": statistics.fmean(timings) * 1000,
+        "write_max_ms": max(timings) * 1000,
+        "recovery_s": recovery,
+    }
+
+
+BACKENDS: Dict[str, Callable[[str], StorageBackend]] = {
+    "json": JsonFileBackend,
+    "journal": lambda path: JournalBackend(path, fsync_interval=1.0, snapshot_every=10_000),
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--commands", type=int, default=20, help="persisted commands per run")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'backend':<10}{'users':>10}{'write mean ms':>16}{'write max ms':>15}{'recovery s':>13}")
+    for size in args.sizes:
+        for name, factory in BACKENDS.items():
+            workdir = tempfile.mkdtemp(prefix="bench-storage-")
+            try:
+                row = _run(factory, size, args.commands, workdir)
+            finally:
+                shutil.rmtree(workdir, ignore_errors=True)
+            results.append({"backend": name, "users": size, **row})
+            print(
+                f"{name:<10}{size:>10}{row['write_mean_ms']:>16.3f}"
+                f"{row['write_max_ms']:>15.3f}{row['recovery_s']:>13.3f}"
+            )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1 @@
-"""Telegram game bot package."""
-
-from .bot import main
-
-__all__ = ["main"]
+"""Discord game bot package."""
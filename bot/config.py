@@ -5,6 +5,8 @@ from __future__ import annotations
 import os
 from dataclasses import dataclass
 
+from .storage import SUPPORTED_SCHEMES, parse_data_url
+
 
 class ConfigError(RuntimeError):
     """Raised when mandatory configuration is missing."""
@@ -20,6 +22,26 @@ class BotConfig:
     webhook_port: int = 8080
     webhook_path: str = "/discord-webhook"
     command_prefix: str = "!"
+    flush_interval: float = 2.0
+    flush_threshold: int = 100
+    user_cache_size: int = 50_000
+    content_pool_path: str = "bot/data/content_pool.json"
+    content_pool_size: int = 5
+    content_pool_low_water: int = 2
+    stream_edit_interval: float = 1.0
+    discord_public_key: str = ""
+    message_content_intent: bool = True
+    request_log_sample_rate: float = 0.01
+    request_log_excerpt_bytes: int = 256
+    request_stats_interval: float = 60.0
+    announce_min_coins: int = 300
+    trace_path: str = ""
+    trace_salt: str = ""
+
+    @property
+    def storage_scheme(self) -> str:
+        """Storage engine selected by ``data_path`` (``json``, ``journal``, ``sqlite``)."""
+        return parse_data_url(self.data_path)[0]
 
 
 def load_config() -> BotConfig:
@@ -34,9 +56,31 @@ def load_config() -> BotConfig:
 
     discord_webhook_url = os.getenv("DISCORD_WEBHOOK_URL", "")
     data_path = os.getenv("DATA_PATH", "bot/data/users.json")
+    scheme = parse_data_url(data_path)[0]
+    if scheme not in SUPPORTED_SCHEMES:
+        raise ConfigError(
+            f"Unsupported DATA_PATH scheme '{scheme}'. "
+            f"Use a .json path or one of: {', '.join(SUPPORTED_SCHEMES)}."
+        )
+
     webhook_port = int(os.getenv("WEBHOOK_PORT", "8080"))
     webhook_path = os.getenv("WEBHOOK_PATH", "/discord-webhook")
     command_prefix = os.getenv("COMMAND_PREFIX", "!")
+    flush_interval = float(os.getenv("FLUSH_INTERVAL", "2.0"))
+    flush_threshold = int(os.getenv("FLUSH_THRESHOLD", "100"))
+    user_cache_size = int(os.getenv("USER_CACHE_SIZE", "50000"))
+    content_pool_path = os.getenv("CONTENT_POOL_PATH", "bot/data/content_pool.json")
+    content_pool_size = int(os.getenv("CONTENT_POOL_SIZE", "5"))
+    content_pool_low_water = int(os.getenv("CONTENT_POOL_LOW_WATER", "2"))
+    stream_edit_interval = float(os.getenv("STREAM_EDIT_INTERVAL", "1.0"))
+    discord_public_key = os.getenv("DISCORD_PUBLIC_KEY", "")
+    message_content_intent = os.getenv("MESSAGE_CONTENT_INTENT", "1").lower() not in ("0", "false", "no")
+    request_log_sample_rate = float(os.getenv("REQUEST_LOG_SAMPLE_RATE", "0.01"))
+    request_log_excerpt_bytes = int(os.getenv("REQUEST_LOG_EXCERPT_BYTES", "256"))
+    request_stats_interval = float(os.getenv("REQUEST_STATS_INTERVAL", "60"))
+    announce_min_coins = int(os.getenv("ANNOUNCE_MIN_COINS", "300"))
+    trace_path = os.getenv("TRACE_PATH", "")
+    trace_salt = os.getenv("TRACE_SALT", "")
     
     return BotConfig(
         discord_token=discord_token,
@@ -45,4 +89,19 @@ def load_config() -> BotConfig:
         webhook_port=webhook_port,
         webhook_path=webhook_path,
         command_prefix=command_prefix,
+        flush_interval=flush_interval,
+        flush_threshold=flush_threshold,
+        user_cache_size=user_cache_size,
+        content_pool_path=content_pool_path,
+        content_pool_size=content_pool_size,
+        content_pool_low_water=content_pool_low_water,
+        stream_edit_interval=stream_edit_interval,
+        discord_public_key=discord_public_key,
+        message_content_intent=message_content_intent,
+        request_log_sample_rate=request_log_sample_rate,
+        request_log_excerpt_bytes=request_log_excerpt_bytes,
+        request_stats_interval=request_stats_interval,
+        announce_min_coins=announce_min_coins,
+        trace_path=trace_path,
+        trace_salt=trace_salt,
     )
@@ -0,0 +1,220 @@
+"""Background-prefetched pool of generated game content."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+from collections import deque
+from dataclasses import dataclass, replace
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Set
+
+LOGGER = logging.getLogger(__name__)
+
+Generator = Callable[[], Awaitable[str]]
+
+
+@dataclass
+class PoolStats:
+    """Counters describing how well the pool keeps up with demand."""
+
+    hits: int = 0
+    misses: int = 0
+    refills: int = 0
+    refill_failures: int = 0
+    saves: int = 0
+
+
+class ContentPool:
+    """Keep a few ready-made generations per key so players never wait.
+
+    Each registered key (one per word-chain seed, one per challenge type)
+    owns a generator coroutine and a bounded FIFO of results. :meth:`get`
+    pops the oldest entry, and only generates inline when the pool for
+    that key is empty. Whenever a key drops below ``low_water`` it is
+    queued for the background workers, which top it back up to
+    ``capacity``. Unused entries are written to ``path`` after each refill
+    round and on :meth:`close`, so a restart does not start cold.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        *,
+        capacity: int = 5,
+        low_water: int = 2,
+        concurrency: int = 2,
+    ) -> None:
+        self.path = path
+        self._capacity = max(1, capacity)
+        self._low_water = min(max(0, low_water), self._capacity)
+        self._concurrency = max(1, concurrency)
+        self._generators: Dict[str, Generator] = {}
+        self._on_demand: Dict[str, Generator] = {}
+        self._items: Dict[str, Deque[str]] = {}
+        self._restored: Dict[str, List[str]] = {}
+        self._queue: "asyncio.Queue[str]" = asyncio.Queue()
+        self._pending: Set[str] = set()
+        self._workers: List[asyncio.Task[None]] = []
+        self._dirty = False
+        self._save_lock = asyncio.Lock()
+        self._stats = PoolStats()
+
+    @property
+    def stats(self) -> PoolStats:
+        return replace(self._stats)
+
+    def sizes(self) -> Dict[str, int]:
+        """Number of ready entries for every registered key."""
+        return {key: len(items) for key, items in self._items.items()}
+
+    def ready(self, key: str) -> bool:
+        """Whether :meth:`get` for ``key`` would be answered from the pool."""
+        return bool(self._items.get(key))
+
+    def register(self, key: str, generator: Generator, on_demand: Optional[Generator] = None) -> None:
+        """Serve ``key`` from the pool, producing new entries with ``generator``.
+
+        ``on_demand`` answers a :meth:`get` that finds the pool empty and
+        defaults to ``generator``.
+        """
+        self._generators[key] = generator
+        self._on_demand[key] = on_demand or generator
+        items = self._items[key] = deque(maxlen=self._capacity)
+        items.extend(self._restored.pop(key, ()))
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._generators
+
+    def start(self) -> None:
+        """Restore persisted entries and start filling every key."""
+        self._restore()
+        if not self._workers:
+            self._workers = [
+                asyncio.create_task(self._refill_worker()) for _ in range(self._concurrency)
+            ]
+        for key in self._generators:
+            if len(self._items[key]) < self._capacity:
+                self._schedule(key)
+
+    async def get(self, key: str) -> str:
+        """Return a generation for ``key``, from the pool when possible."""
+        value = self.take(key)
+        if value is None:
+            value = await self.generate(key)
+        return value
+
+    async def generate(self, key: str) -> str:
+        """Produce a generation for ``key`` right now, bypassing the pool."""
+        return await self._on_demand[key]()
+
+    def take(self, key: str) -> Optional[str]:
+        """Pop a ready generation for ``key``, or return ``None`` if it is empty."""
+        items = self._items[key]
+        if items:
+            self._stats.hits += 1
+            value: Optional[str] = items.popleft()
+            self._dirty = True
+        else:
+            self._stats.misses += 1
+            value = None
+        if len(items) < max(self._low_water, 1):
+            self._schedule(key)
+        return value
+
+    async def close(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        for worker in self._workers:
+            try:
+                await worker
+            except asyncio.CancelledError:
+                pass
+        self._workers = []
+        await self._save()
+        stats = self._stats
+        LOGGER.info(
+            "Content pool: %d hits, %d misses, %d refills (%d failed)",
+            stats.hits,
+            stats.misses,
+            stats.refills,
+            stats.refill_failures,
+        )
+
+    def _schedule(self, key: str) -> None:
+        if key not in self._pending:
+            self._pending.add(key)
+            self._queue.put_nowait(key)
+
+    async def _refill_worker(self) -> None:
+        while True:
+            key = await self._queue.get()
+            try:
+                await self._refill(key)
+            finally:
+                self._pending.discard(key)
+            if self._queue.empty() and self._dirty:
+                await self._save()
+
+    async def _refill(self, key: str) -> None:
+        items = self._items[key]
+        generator = self._generators[key]
+        while len(items) < self._capacity:
+            try:
+                value = await generator()
+            except Exception as error:
+                # Leave the key below low water; the next get() retries it.
+                self._stats.refill_failures += 1
+                LOGGER.warning("Refilling content pool '%s' failed: %s", key, error)
+                return
+            items.append(value)
+            self._stats.refills += 1
+            self._dirty = True
+
+    def _restore(self) -> None:
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as handle:
+                payload = json.load(handle)
+        except (OSError, ValueError) as error:
+            LOGGER.warning("Ignoring unreadable content pool %s: %s", self.path, error)
+            return
+        for key, values in payload.items():
+            values = [value for value in values if isinstance(value, str)]
+            if key in self._items:
+                self._items[key].extend(values)
+            else:
+                self._restored[key] = values
+        LOGGER.info("Restored %d pooled generations", sum(map(len, payload.values())))
+
+    async def _save(self) -> None:
+        if not self.path:
+            return
+        async with self._save_lock:
+            if not self._dirty:
+                return
+            self._dirty = False
+            payload = {key: list(items) for key, items in self._items.items() if items}
+            loop = asyncio.get_running_loop()
+            try:
+                await loop.run_in_executor(None, self._write, payload)
+            except OSError as error:
+                self._dirty = True
+                LOGGER.warning("Could not persist content pool: %s", error)
+                return
+            self._stats.saves += 1
+
+    def _write(self, payload: Dict[str, List[str]]) -> None:
+        assert self.path is not None
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as handle:
+            json.dump(payload, handle, ensure_ascii=False)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(temp_path, self.path)
+
+
+__all__ = ["ContentPool", "PoolStats"]
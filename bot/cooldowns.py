@@ -0,0 +1,74 @@
+"""Named, persisted cooldowns with heap-driven expiry."""
+
+from __future__ import annotations
+
+import heapq
+import time
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from .storage import UserState
+
+
+class CooldownTracker:
+    """Check and start cooldowns stored on :class:`UserState`.
+
+    Expiry times live in ``state.cooldowns`` so they survive restarts, and a
+    check is a single dict lookup. Every started cooldown is also pushed on
+    a min-heap of ``(expires, user_id, name)`` so expired entries can be
+    popped in O(log n) and pruned from players that never come back.
+    """
+
+    def __init__(self) -> None:
+        self._heap: List[Tuple[int, int, str]] = []
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    @staticmethod
+    def remaining(state: UserState, name: str, now: Optional[float] = None) -> float:
+        """Seconds left on ``name`` for ``state`` (0 when it is not running)."""
+        if not state.cooldowns:
+            return 0.0
+        expires = state.cooldowns.get(name)
+        if expires is None:
+            return 0.0
+        current = time.time() if now is None else now
+        return max(0.0, expires - current)
+
+    def start(
+        self,
+        user_id: int,
+        state: UserState,
+        name: str,
+        seconds: float,
+        now: Optional[float] = None,
+    ) -> int:
+        """Start ``name`` on ``state`` for ``seconds`` and return its expiry."""
+        current = time.time() if now is None else now
+        expires = int(current + seconds)
+        cooldowns = {
+            key: value
+            for key, value in (state.cooldowns or {}).items()
+            if value > current
+        }
+        cooldowns[name] = expires
+        state.cooldowns = cooldowns
+        heapq.heappush(self._heap, (expires, user_id, name))
+        return expires
+
+    def track(self, items: Iterable[Tuple[int, UserState]]) -> None:
+        """Schedule expiry for cooldowns loaded from storage."""
+        for user_id, state in items:
+            for name, expires in (state.cooldowns or {}).items():
+                self._heap.append((expires, user_id, name))
+        heapq.heapify(self._heap)
+
+    def pop_expired(self, now: Optional[float] = None) -> Iterator[Tuple[int, str, int]]:
+        """Yield ``(user_id, name, expires)`` for every cooldown that has run out."""
+        current = time.time() if now is None else now
+        while self._heap and self._heap[0][0] <= current:
+            expires, user_id, name = heapq.heappop(self._heap)
+            yield user_id, name, expires
+
+
+__all__ = ["CooldownTracker"]
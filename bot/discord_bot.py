@@ -3,18 +3,26 @@
 from __future__ import annotations
 
 import logging
-from typing import Optional
+from typing import Awaitable, Callable, Optional
 
 import discord
 from discord.ext import commands
-from discord_webhook import DiscordWebhook
 
 from .config import BotConfig
-from .games import GameEngine, GameError, LanguageOracle
+from .content_pool import ContentPool
+from .games import CATEGORIES, GAMES, GameEngine, GameError, GameSpec, LanguageOracle
+from .interactions import register_commands
 from .storage import UserStore
+from .streaming import StreamingMessage
+from .trace import TraceRecorder
+from .webhook_sender import WebhookSender
+from .webhook_server import WebhookServer
 
 LOGGER = logging.getLogger(__name__)
 
+TOP_SIZE = 10
+MEDALS = {1: "🥇", 2: "🥈", 3: "🥉"}
+
 
 class DiscordGameBot(commands.Bot):
     """Discord bot for game commands."""
@@ -24,9 +32,14 @@ class DiscordGameBot(commands.Bot):
         config: BotConfig,
         store: UserStore,
         language_oracle: Optional[LanguageOracle] = None,
+        content_pool: Optional[ContentPool] = None,
+        webhook_sender: Optional[WebhookSender] = None,
+        trace: Optional[TraceRecorder] = None,
     ):
         intents = discord.Intents.default()
-        intents.message_content = True
+        # Only prefix commands need message content; slash commands arrive
+        # over the interactions endpoint.
+        intents.message_content = config.message_content_intent
         intents.members = True
         
         super().__init__(
@@ -37,12 +50,20 @@ class DiscordGameBot(commands.Bot):
         
         self.config = config
         self.store = store
-        self.engine = GameEngine(store, language_oracle=language_oracle)
-        self._webhook_url = config.discord_webhook_url
+        self.engine = GameEngine(
+            store,
+            language_oracle=language_oracle,
+            content_pool=content_pool,
+            trace=trace,
+        )
+        self.webhook = webhook_sender or WebhookSender(config.discord_webhook_url)
 
     async def setup_hook(self) -> None:
         """Called when the bot is ready."""
         await self.store.load()
+        self.engine.start()
+        if self.config.discord_public_key and self.application_id:
+            await register_commands(self.application_id, self.config.discord_token)
         count = await self.store.count()
         LOGGER.info("Loaded %d người chơi", count)
         LOGGER.info("Bot is ready: %s", self.user)
@@ -50,10 +71,19 @@ class DiscordGameBot(commands.Bot):
     async def on_ready(self) -> None:
         """Called when bot is connected."""
         LOGGER.info("Bot %s is online!", self.user)
+        for guild in self.guilds:
+            for member in guild.members:
+                self.engine.leaderboard.add_member(guild.id, member.id)
         await self.change_presence(
             activity=discord.Game(name=f"{self.command_prefix}help | Chơi game kiếm tiền!")
         )
 
+    async def on_member_join(self, member: discord.Member) -> None:
+        self.engine.leaderboard.add_member(member.guild.id, member.id)
+
+    async def on_member_remove(self, member: discord.Member) -> None:
+        self.engine.leaderboard.remove_member(member.guild.id, member.id)
+
     async def on_command_error(self, ctx: commands.Context, error: Exception) -> None:
         """Handle command errors."""
         if isinstance(error, commands.CommandNotFound):
@@ -67,16 +97,12 @@ class DiscordGameBot(commands.Bot):
             await ctx.send("❌ Có lỗi xảy ra, vui lòng thử lại sau!")
 
     def send_webhook_message(self, content: str, username: str = "Game Bot") -> None:
-        """Send message via Discord webhook."""
-        if not self._webhook_url:
-            LOGGER.warning("Webhook URL not configured, skipping webhook send")
+        """Queue a message for the Discord webhook without waiting for delivery."""
+        if not self.webhook.url:
+            LOGGER.debug("Webhook URL not configured, skipping webhook send")
             return
-        
-        try:
-            webhook = DiscordWebhook(url=self._webhook_url, content=content, username=username)
-            webhook.execute()
-        except Exception as error:
-            LOGGER.error("Failed to send webhook: %s", error)
+        if not self.webhook.send(content, username=username):
+            LOGGER.warning("Webhook queue full, dropped announcement")
 
 
 async def start_command(ctx: commands.Context) -> None:
@@ -116,39 +142,21 @@ async def help_command(ctx: commands.Context) -> None:
         value=(
             f"`{prefix}start` - Bắt đầu chơi\n"
             f"`{prefix}balance` - Xem số dư\n"
+            f"`{prefix}top [global]` - Bảng xếp hạng server (hoặc toàn cầu)\n"
+            f"`{prefix}rank` - Xem thứ hạng của bạn\n"
             f"`{prefix}help` - Xem lệnh này"
         ),
         inline=False
     )
     
-    embed.add_field(
-        name="🎮 Game kiếm tiền",
-        value=(
-            f"`{prefix}work` - Làm việc kiếm tiền (20 phút hồi)\n"
-            f"`{prefix}daily` - Nhận quà mỗi ngày\n"
-            f"`{prefix}dice` - Chơi xúc xắc may rủi\n"
-            f"`{prefix}slots` - Quay hũ vui vẻ"
-        ),
-        inline=False
-    )
-    
-    embed.add_field(
-        name="⚔️ Game phiêu lưu",
-        value=(
-            f"`{prefix}fish` - Chiến dịch câu cá\n"
-            f"`{prefix}mine` - Khai thác hầm mỏ"
-        ),
-        inline=False
-    )
-    
-    embed.add_field(
-        name="🧠 Game trí tuệ (AI)",
-        value=(
-            f"`{prefix}wordchain` - Nối từ siêu tốc\n"
-            f"`{prefix}vietking` - Thử sức Vua Tiếng Việt"
-        ),
-        inline=False
-    )
+    for category in CATEGORIES:
+        lines = [
+            f"`{prefix}{spec.name}` - {spec.help_text}"
+            for spec in GAMES.values()
+            if spec.category == category
+        ]
+        if lines:
+            embed.add_field(name=category, value="\n".join(lines), inline=False)
     
     await ctx.send(embed=embed)
 
@@ -170,76 +178,105 @@ async def balance_command(ctx: commands.Context) -> None:
     await ctx.send(embed=embed)
 
 
-async def work_command(ctx: commands.Context) -> None:
-    """Work to earn money."""
-    await _play_game(ctx, "work")
-
-
-async def dice_command(ctx: commands.Context) -> None:
-    """Play dice game."""
-    await _play_game(ctx, "dice")
-
-
-async def slots_command(ctx: commands.Context) -> None:
-    """Play slots game."""
-    await _play_game(ctx, "slots")
-
-
-async def daily_command(ctx: commands.Context) -> None:
-    """Claim daily reward."""
-    await _play_game(ctx, "daily")
-
-
-async def fish_command(ctx: commands.Context) -> None:
-    """Go fishing."""
-    await _play_game(ctx, "fish")
+async def top_command(ctx: commands.Context, scope: str = "") -> None:
+    """Show the richest players in this server, or globally."""
+    bot: DiscordGameBot = ctx.bot
+    board = bot.engine.leaderboard
+    guild_id = ctx.guild.id if ctx.guild is not None and scope.lower() != "global" else None
+    if guild_id is not None:
+        board.add_member(guild_id, ctx.author.id)
+
+    entries = board.top(TOP_SIZE, guild_id)
+    lines = [
+        f"{MEDALS.get(position, f'`#{position}`')} <@{user_id}> — **{coins}** coins"
+        for position, (user_id, coins) in enumerate(entries, start=1)
+    ]
+    title = f"🏆 Bảng xếp hạng {ctx.guild.name}" if guild_id is not None else "🌏 Bảng xếp hạng toàn cầu"
+    embed = discord.Embed(
+        title=title,
+        description="\n".join(lines) or "Chưa có ai trên bảng xếp hạng.",
+        color=discord.Color.gold()
+    )
+    embed.set_footer(text=f"{board.size(guild_id)} người chơi")
+    await ctx.send(embed=embed)
 
 
-async def mine_command(ctx: commands.Context) -> None:
-    """Go mining."""
-    await _play_game(ctx, "mine")
+async def rank_command(ctx: commands.Context) -> None:
+    """Show the caller's rank in this server and globally."""
+    bot: DiscordGameBot = ctx.bot
+    board = bot.engine.leaderboard
+    user_id = ctx.author.id
+    state = await bot.engine.ensure_ready(user_id)
+    # Lazily loaded players are only ranked once the store has seen them.
+    board.update(user_id, state.coins)
 
+    embed = discord.Embed(
+        title=f"📊 Thứ hạng của {ctx.author.display_name}",
+        color=discord.Color.gold()
+    )
+    embed.add_field(name="💰 Số dư", value=f"**{state.coins}** coins", inline=True)
+    if ctx.guild is not None:
+        board.add_member(ctx.guild.id, user_id)
+        embed.add_field(
+            name="🏆 Server",
+            value=f"**#{board.rank(user_id, ctx.guild.id)}** / {board.size(ctx.guild.id)}",
+            inline=True
+        )
+    embed.add_field(
+        name="🌏 Toàn cầu",
+        value=f"**#{board.rank(user_id)}** / {board.size()}",
+        inline=True
+    )
+    await ctx.send(embed=embed)
 
-async def wordchain_command(ctx: commands.Context) -> None:
-    """Play word chain game."""
-    await _play_game(ctx, "word_chain")
 
+def _game_command(spec: GameSpec) -> Callable[[commands.Context], Awaitable[None]]:
+    """Build the prefix command callback for a registered game."""
+    async def command(ctx: commands.Context) -> None:
+        await _play_game(ctx, spec.name)
 
-async def vietking_command(ctx: commands.Context) -> None:
-    """Play Vietnamese king game."""
-    await _play_game(ctx, "viet_king")
+    return command
 
 
-async def _play_game(ctx: commands.Context, action: str) -> None:
+async def _play_game(ctx: commands.Context, name: str) -> None:
     """Generic game play handler."""
     bot: DiscordGameBot = ctx.bot
+    spec = GAMES[name]
     user_id = ctx.author.id
-    
+    if ctx.guild is not None:
+        bot.engine.leaderboard.add_member(ctx.guild.id, user_id)
+    message: Optional[discord.Message] = None
+    streaming: Optional[StreamingMessage] = None
+    on_chunk = None
+
+    if spec.requires_ai:
+        async def publish(text: str) -> None:
+            nonlocal message
+            embed = discord.Embed(description=text, color=discord.Color.blurple())
+            if message is None:
+                message = await ctx.send(embed=embed)
+            else:
+                await message.edit(embed=embed)
+
+        streaming = StreamingMessage(publish, interval=bot.config.stream_edit_interval)
+        on_chunk = streaming.update
+
     try:
-        if action == "work":
-            result = await bot.engine.play_work(user_id)
-        elif action == "dice":
-            result = await bot.engine.play_dice(user_id)
-        elif action == "slots":
-            result = await bot.engine.play_slots(user_id)
-        elif action == "daily":
-            result = await bot.engine.play_daily(user_id)
-        elif action == "fish":
-            result = await bot.engine.play_fishing(user_id)
-        elif action == "mine":
-            result = await bot.engine.play_mining(user_id)
-        elif action == "word_chain":
-            result = await bot.engine.play_word_chain(user_id)
-        elif action == "viet_king":
-            result = await bot.engine.play_vietnamese_king(user_id)
-        else:
-            raise ValueError(f"Unknown game action: {action}")
+        result = await bot.engine.play(name, user_id, on_chunk)
     except GameError as error:
-        await ctx.send(f"❌ {error}")
+        if streaming is not None:
+            await streaming.close()
+        if message is not None:
+            await message.edit(content=f"❌ {error}", embed=None)
+        else:
+            await ctx.send(f"❌ {error}")
         return
+    finally:
+        if streaming is not None:
+            await streaming.close()
     
-    # Get updated balance
-    state = await bot.engine.ensure_ready(user_id)
+    # Games hand back the state they committed, so no second locked lookup.
+    state = result.state or await bot.engine.ensure_ready(user_id)
     
     embed = discord.Embed(
         description=result.message,
@@ -247,7 +284,15 @@ async def _play_game(ctx: commands.Context, action: str) -> None:
     )
     embed.set_footer(text=f"Số dư hiện tại: {state.coins} coins")
     
-    await ctx.send(embed=embed)
+    if message is not None:
+        await message.edit(embed=embed)
+    else:
+        await ctx.send(embed=embed)
+
+    if result.coins_delta >= bot.config.announce_min_coins > 0:
+        bot.send_webhook_message(
+            f"🎉 **{ctx.author.display_name}** vừa thắng **{result.coins_delta}** coins với `{bot.command_prefix}{ctx.invoked_with}`!"
+        )
 
 
 def setup_commands(bot: DiscordGameBot) -> None:
@@ -255,27 +300,44 @@ def setup_commands(bot: DiscordGameBot) -> None:
     bot.command(name="start")(start_command)
     bot.command(name="help")(help_command)
     bot.command(name="balance", aliases=["bal", "money"])(balance_command)
-    bot.command(name="work")(work_command)
-    bot.command(name="dice")(dice_command)
-    bot.command(name="slots")(slots_command)
-    bot.command(name="daily")(daily_command)
-    bot.command(name="fish")(fish_command)
-    bot.command(name="mine")(mine_command)
-    bot.command(name="wordchain")(wordchain_command)
-    bot.command(name="vietking")(vietking_command)
+    bot.command(name="top", aliases=["leaderboard", "lb"])(top_command)
+    bot.command(name="rank")(rank_command)
+    for spec in GAMES.values():
+        bot.command(name=spec.name, help=spec.help_text)(_game_command(spec))
 
 
 async def run_bot(
     config: BotConfig,
     language_oracle: Optional[LanguageOracle] = None,
+    webhook_server: Optional[WebhookServer] = None,
 ) -> None:
     """Run the Discord bot."""
-    store = UserStore(config.data_path)
-    bot = DiscordGameBot(config, store, language_oracle)
+    store = UserStore(
+        config.data_path,
+        flush_interval=config.flush_interval,
+        flush_threshold=config.flush_threshold,
+        cache_size=config.user_cache_size,
+    )
+    content_pool = ContentPool(
+        config.content_pool_path,
+        capacity=config.content_pool_size,
+        low_water=config.content_pool_low_water,
+    )
+    trace = TraceRecorder(config.trace_path, salt=config.trace_salt) if config.trace_path else None
+    bot = DiscordGameBot(config, store, language_oracle, content_pool, trace=trace)
     setup_commands(bot)
+    if webhook_server is not None:
+        webhook_server.attach(bot.engine)
     
+    if trace is not None:
+        trace.start()
+        LOGGER.info("Recording command trace to %s", config.trace_path)
     try:
         await bot.start(config.discord_token)
     finally:
-        await store.save()
+        if trace is not None:
+            await trace.close()
         await bot.close()
+        await bot.engine.close()
+        await bot.webhook.close()
+        await store.close()
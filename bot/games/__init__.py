@@ -2,16 +2,30 @@
 
 from .daily import DailyGame
 from .dice import DiceGame
+from .engine import GameEngine, GameError, GameResult, LanguageOracle
 from .fishing import FishingGame
 from .mining import MiningGame
+from .registry import CATEGORIES, GAMES, GameSpec, register_game
 from .slots import SlotsGame
+from .vietnamese_king import VietnameseKingGame
+from .word_chain import WordChainGame
 from .work import WorkGame
 
 __all__ = [
+    "CATEGORIES",
+    "GAMES",
     "DailyGame",
     "DiceGame",
     "FishingGame",
+    "GameEngine",
+    "GameError",
+    "GameResult",
+    "GameSpec",
+    "LanguageOracle",
     "MiningGame",
     "SlotsGame",
+    "VietnameseKingGame",
+    "WordChainGame",
     "WorkGame",
+    "register_game",
 ]
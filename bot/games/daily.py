@@ -3,8 +3,13 @@
 from __future__ import annotations
 
 import time
+from typing import TYPE_CHECKING
 
-from ..storage import UserStore
+from .registry import GameError, GameResult, GameSpec, register_game
+from .tables import DAILY
+
+if TYPE_CHECKING:
+    from .engine import GameEngine
 
 DAILY_RESET = 20 * 60 * 60  # 20 hours
 
@@ -12,32 +17,37 @@ DAILY_RESET = 20 * 60 * 60  # 20 hours
 class DailyGame:
     """Handle daily reward logic."""
 
-    def __init__(self, store: UserStore):
-        self.store = store
+    def __init__(self, engine: "GameEngine"):
+        self.engine = engine
 
-    async def play(self, user_id: int) -> tuple[str, int]:
+    async def play(self, user_id: int) -> GameResult:
         """
         Claim daily reward.
         
         Returns:
-            tuple[str, int]: (message, coins_earned)
+            GameResult: message, coins_earned and the committed state
         """
-        now = int(time.time())
-        state = await self.store.get(user_id)
-        
-        if now - state.last_daily < DAILY_RESET:
-            hours = (DAILY_RESET - (now - state.last_daily)) // 3600 + 1
-            raise ValueError(f"Bạn đã nhận quà hôm nay rồi! Thử lại sau {hours} giờ.")
-
-        state.last_daily = now
-        state.streak = state.streak + 1 if state.streak else 1
-        
-        base = 120
-        bonus = min(100, state.streak * 15)
-        payout = base + bonus
-        
-        state.coins += payout
-        await self.store.save()
+        cooldowns = self.engine.cooldowns
+        async with self.engine.transaction(user_id) as state:
+            now = int(time.time())
+            # last_daily still guards players whose claim predates the cooldown entry.
+            remaining = max(
+                cooldowns.remaining(state, "daily", now),
+                DAILY_RESET - (now - state.last_daily),
+            )
+            
+            if remaining > 0:
+                hours = int(remaining) // 3600 + 1
+                raise GameError(f"Bạn đã nhận quà hôm nay rồi! Thử lại sau {hours} giờ.")
+
+            cooldowns.start(user_id, state, "daily", DAILY_RESET, now)
+            state.last_daily = now
+            state.streak = state.streak + 1 if state.streak else 1
+            
+            bonus = DAILY.bonus(state.streak)
+            payout = DAILY.base + bonus
+            
+            state.coins += payout
 
         message = (
             "🎁 Nhận quà hàng ngày!\n"
@@ -45,4 +55,7 @@ class DailyGame:
             f"Bạn nhận được {payout}💰 (bao gồm {bonus}💰 thưởng chuỗi)."
         )
         
-        return message, payout
+        return GameResult(message, payout, state)
+
+
+register_game(GameSpec("daily", DailyGame, "Nhận quà mỗi ngày", cooldown=DAILY_RESET))
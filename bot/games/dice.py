@@ -3,38 +3,44 @@
 from __future__ import annotations
 
 import random
+from typing import TYPE_CHECKING
 
-from ..storage import UserStore
+from .registry import GameResult, GameSpec, register_game
+from .tables import DICE
+
+if TYPE_CHECKING:
+    from .engine import GameEngine
 
 
 class DiceGame:
     """Handle dice game logic."""
 
-    def __init__(self, store: UserStore):
-        self.store = store
+    def __init__(self, engine: "GameEngine"):
+        self.engine = engine
 
-    async def play(self, user_id: int) -> tuple[str, int]:
+    async def play(self, user_id: int) -> GameResult:
         """
         Play dice game.
         
         Returns:
-            tuple[str, int]: (message, coins_delta)
+            GameResult: message, coins_delta and the committed state
         """
-        roll = random.randint(1, 6)
+        roll = random.randint(1, DICE.sides)
         
-        if roll >= 5:
-            payout = random.randint(50, 120)
-            state = await self.store.get(user_id)
-            state.coins += payout
-            await self.store.save()
+        if roll >= DICE.win_from:
+            payout = random.randint(*DICE.win)
+            async with self.engine.transaction(user_id) as state:
+                state.coins += payout
             
             message = f"🎲 Bạn đổ được {roll} và kiếm được {payout}💰!"
-            return message, payout
+            return GameResult(message, payout, state)
         else:
-            penalty = random.randint(10, 40)
-            state = await self.store.get(user_id)
-            state.coins = max(0, state.coins - penalty)
-            await self.store.save()
+            penalty = random.randint(*DICE.loss)
+            async with self.engine.transaction(user_id) as state:
+                state.coins = max(0, state.coins - penalty)
             
             message = f"🎲 Xui quá! Bạn đổ {roll} và mất {penalty}💰..."
-            return message, -penalty
+            return GameResult(message, -penalty, state)
+
+
+register_game(GameSpec("dice", DiceGame, "Chơi xúc xắc may rủi"))
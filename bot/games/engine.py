@@ -0,0 +1,232 @@
+"""Game engine and orchestration for all games."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import Counter, defaultdict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, DefaultDict, Dict, List, Optional, Tuple
+
+from ..content_pool import ContentPool
+from ..cooldowns import CooldownTracker
+from ..leaderboard import Leaderboard
+from ..locks import LockStats, UserLockManager
+from ..metrics import LatencyHistogram
+from ..oracle import LanguageOracle
+from ..storage import UserState, UserStore
+from ..trace import TraceRecorder
+from . import daily, dice, fishing, mining, slots, vietnamese_king, word_chain, work  # noqa: F401 - register games
+from .registry import GAMES, ChunkCallback, GameError, GameResult
+
+COOLDOWN_SWEEP_SECONDS = 60  # how often expired cooldowns are pruned
+
+
+LOGGER = logging.getLogger(__name__)
+
+
+class GameEngine:
+    """Coordinate game commands and persistence operations."""
+
+    def __init__(
+        self,
+        store: UserStore,
+        language_oracle: Optional[LanguageOracle] = None,
+        content_pool: Optional[ContentPool] = None,
+        trace: Optional[TraceRecorder] = None,
+    ) -> None:
+        self.store = store
+        self._locks = UserLockManager()
+        self.cooldowns = CooldownTracker()
+        self.leaderboard = Leaderboard()
+        store.add_listener(self.leaderboard.on_change)
+        self._sweeper: Optional[asyncio.Task[None]] = None
+        self._seeding: Optional[asyncio.Task[None]] = None
+        self.language_oracle = language_oracle
+        self.content = content_pool or ContentPool()
+        # One instance per registered game; AI games register their pool
+        # keys here when an oracle is configured.
+        self.games: Dict[str, Any] = {name: spec.factory(self) for name, spec in GAMES.items()}
+        self.play_latency: DefaultDict[str, LatencyHistogram] = defaultdict(LatencyHistogram)
+        # (game, outcome) -> count; outcome is "ok", "rejected" or "error".
+        self.play_outcomes: "Counter[Tuple[str, str]]" = Counter()
+        self.trace = trace
+
+    def start(self) -> None:
+        """Schedule loaded cooldowns, rank loaded players and start pruning."""
+        items = self.store.cached_items()
+        self.cooldowns.track(items)
+        self.leaderboard.rebuild(items)
+        if self.store.lazy and self._seeding is None:
+            # Lazy backends hold few players in memory; rank the rest from
+            # storage without delaying startup.
+            self._seeding = asyncio.create_task(self._seed_leaderboard())
+        if self._sweeper is None:
+            self._sweeper = asyncio.create_task(self._sweep_cooldowns())
+        self.content.start()
+
+    async def close(self) -> None:
+        await self.content.close()
+        if self._seeding is not None:
+            self._seeding.cancel()
+            try:
+                await self._seeding
+            except asyncio.CancelledError:
+                pass
+            self._seeding = None
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            try:
+                await self._sweeper
+            except asyncio.CancelledError:
+                pass
+            self._sweeper = None
+
+    async def _seed_leaderboard(self) -> None:
+        try:
+            balances = await self.store.balances()
+        except Exception:
+            LOGGER.exception("Could not load balances for the leaderboard")
+            return
+        self.leaderboard.seed(balances)
+
+    def prune_cooldowns(self, now: Optional[float] = None) -> int:
+        """Remove every expired cooldown from cached players."""
+        pruned = 0
+        for user_id, name, expires in self.cooldowns.pop_expired(now):
+            if self.store.prune_cooldown(user_id, name, expires):
+                pruned += 1
+        return pruned
+
+    async def _sweep_cooldowns(self) -> None:
+        while True:
+            await asyncio.sleep(COOLDOWN_SWEEP_SECONDS)
+            pruned = self.prune_cooldowns()
+            if pruned:
+                LOGGER.debug("Pruned %d expired cooldowns", pruned)
+
+    @property
+    def running(self) -> bool:
+        """Whether :meth:`start` has run and games can be played."""
+        return self._sweeper is not None
+
+    @property
+    def active_locks(self) -> int:
+        """Number of per-user locks currently held or awaited."""
+        return len(self._locks)
+
+    @property
+    def lock_stats(self) -> LockStats:
+        return self._locks.stats
+
+    @property
+    def lock_waits(self) -> LatencyHistogram:
+        """Wait times of contended per-user lock acquisitions."""
+        return self._locks.waits
+
+    @asynccontextmanager
+    async def transaction(self, user_id: int) -> AsyncIterator[UserState]:
+        """Serialize a command for ``user_id`` and persist its changes once.
+
+        Yields a private copy of the player's state while holding their
+        lock. If the block exits normally the fields the block changed are
+        committed to the store and marked dirty in one step; fields it left
+        alone keep whatever the store holds by then. If it raises, the copy
+        is discarded and nothing is written.
+        """
+        async with self._locks.hold(user_id), self.store.pinned(user_id):
+            original = (await self.store.get(user_id)).copy()
+            state = original.copy()
+            yield state
+            self.store.commit(user_id, state, original)
+
+    async def ensure_ready(self, user_id: int) -> UserState:
+        async with self._locks.hold(user_id):
+            return await self.store.get(user_id)
+
+    async def apply_reward(self, user_id: int, coins: int) -> UserState:
+        async with self.transaction(user_id) as state:
+            state.coins = max(0, state.coins + coins)
+        return state
+
+    async def play(
+        self, name: str, user_id: int, on_chunk: Optional[ChunkCallback] = None
+    ) -> GameResult:
+        """Play the registered game ``name`` for ``user_id``.
+
+        ``on_chunk`` is passed to games that need the language model, which
+        report their partially generated message through it.
+        """
+        spec = GAMES[name]
+        started = time.perf_counter()
+        outcome = "error"
+        coins_delta = 0
+        try:
+            if spec.requires_ai:
+                result = await self.games[name].play(user_id, on_chunk=on_chunk)
+            else:
+                result = await self.games[name].play(user_id)
+            outcome = "ok"
+            coins_delta = result.coins_delta
+            return result
+        except GameError:
+            outcome = "rejected"
+            raise
+        finally:
+            self.play_latency[name].observe(time.perf_counter() - started)
+            self.play_outcomes[name, outcome] += 1
+            if self.trace is not None:
+                self.trace.record(user_id, name, outcome, coins_delta)
+
+    async def play_work(self, user_id: int) -> GameResult:
+        return await self.play("work", user_id)
+
+    async def play_dice(self, user_id: int) -> GameResult:
+        return await self.play("dice", user_id)
+
+    async def play_slots(self, user_id: int) -> GameResult:
+        return await self.play("slots", user_id)
+
+    async def play_daily(self, user_id: int) -> GameResult:
+        return await self.play("daily", user_id)
+
+    async def play_fishing(self, user_id: int) -> GameResult:
+        return await self.play("fish", user_id)
+
+    async def play_mining(self, user_id: int) -> GameResult:
+        return await self.play("mine", user_id)
+
+    async def play_word_chain(self, user_id: int, on_chunk: Optional[ChunkCallback] = None) -> GameResult:
+        return await self.play("wordchain", user_id, on_chunk)
+
+    async def play_vietnamese_king(self, user_id: int, on_chunk: Optional[ChunkCallback] = None) -> GameResult:
+        return await self.play("vietking", user_id, on_chunk)
+
+    async def ai_content(
+        self,
+        key: str,
+        stream: Callable[[], AsyncIterator[str]],
+        on_chunk: Optional[ChunkCallback],
+        header: str,
+    ) -> str:
+        """Return pooled content for ``key``, streaming a fresh one if it is empty.
+
+        With ``on_chunk`` a pool miss streams the completion and reports the
+        message rendered so far after every chunk; without it the miss
+        waits for the whole completion as before.
+        """
+        pooled = self.content.take(key)
+        if pooled is not None:
+            return pooled
+        if on_chunk is None:
+            return await self.content.generate(key)
+
+        parts: List[str] = []
+        async for chunk in stream():
+            parts.append(chunk)
+            await on_chunk(f"{header}{''.join(parts)} ▌")
+        return "".join(parts).strip()
+
+
+__all__ = ["GameEngine", "GameResult", "GameError", "LanguageOracle"]
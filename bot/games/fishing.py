@@ -3,53 +3,50 @@
 from __future__ import annotations
 
 import random
+from typing import TYPE_CHECKING
 
-from ..storage import UserStore
+from .registry import ADVENTURE, GameResult, GameSpec, register_game
+from .tables import FISHING
+
+if TYPE_CHECKING:
+    from .engine import GameEngine
 
 
 class FishingGame:
     """Handle fishing game logic."""
 
-    def __init__(self, store: UserStore):
-        self.store = store
+    def __init__(self, engine: "GameEngine"):
+        self.engine = engine
 
-    async def play(self, user_id: int) -> tuple[str, int]:
+    async def play(self, user_id: int) -> GameResult:
         """
         Go fishing.
         
         Returns:
-            tuple[str, int]: (message, coins_earned)
+            GameResult: message, coins_earned and the committed state
         """
-        schools = [
-            ("🐟 Cá cơm", 8, 16, 40),
-            ("🐠 Cá hồng", 22, 45, 30),
-            ("🦑 Mực khổng lồ", 90, 160, 15),
-            ("🐬 Cá heo lạc", 200, 400, 8),
-            ("🐉 Rồng nước huyền thoại", 800, 1200, 2),
-        ]
-        
+        table = FISHING
         haul = []
         total = 0
-        casts = random.randint(2, 5)
-        weights = [school[3] for school in schools]
+        casts = random.randint(*table.casts)
+        weights = table.weights
         
         for _ in range(casts):
-            name, low, high, _ = random.choices(schools, weights=weights)[0]
-            reward = random.randint(low, high)
+            school = random.choices(table.schools, weights=weights)[0]
+            reward = random.randint(school.low, school.high)
             total += reward
-            haul.append(f"{name} (+{reward}💰)")
+            haul.append(f"{school.name} (+{reward}💰)")
 
         # Bonus wave
         bonus = 0
-        if total >= 600 and random.random() < 0.35:
-            bonus = random.randint(120, 300)
+        if total >= table.bonus_threshold and random.random() < table.bonus_chance:
+            bonus = random.randint(*table.bonus)
             haul.append(f"⚡ Cơn sóng vàng mang thêm {bonus}💰")
             total += bonus
 
         # Update user coins
-        state = await self.store.get(user_id)
-        state.coins += total
-        await self.store.save()
+        async with self.engine.transaction(user_id) as state:
+            state.coins += total
 
         details = "\n".join(haul)
         message = (
@@ -58,4 +55,7 @@ class FishingGame:
             f"Chi tiết:\n{details}"
         )
         
-        return message, total
+        return GameResult(message, total, state)
+
+
+register_game(GameSpec("fish", FishingGame, "Chiến dịch câu cá", category=ADVENTURE))
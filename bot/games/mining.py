@@ -3,59 +3,56 @@
 from __future__ import annotations
 
 import random
+from typing import TYPE_CHECKING
 
-from ..storage import UserStore
+from .registry import ADVENTURE, GameResult, GameSpec, register_game
+from .tables import MINING
+
+if TYPE_CHECKING:
+    from .engine import GameEngine
 
 
 class MiningGame:
     """Handle mining game logic."""
 
-    def __init__(self, store: UserStore):
-        self.store = store
+    def __init__(self, engine: "GameEngine"):
+        self.engine = engine
 
-    async def play(self, user_id: int) -> tuple[str, int]:
+    async def play(self, user_id: int) -> GameResult:
         """
         Go mining.
         
         Returns:
-            tuple[str, int]: (message, coins_earned)
+            GameResult: message, coins_earned and the committed state
         """
-        veins = [
-            ("⛏️ Quặng sắt", 40, 90, 45),
-            ("💎 Quặng kim cương", 180, 320, 25),
-            ("🌌 Tinh thể sao", 350, 520, 18),
-            ("🪐 Mảnh thiên thạch quý", 600, 900, 9),
-            ("⚙️ Cỗ máy cổ đại", 1100, 1600, 3),
-        ]
-        
-        excavations = random.randint(3, 6)
+        table = MINING
+        excavations = random.randint(*table.excavations)
         total = 0
         lines = []
         jackpot = False
-        weights = [item[3] for item in veins]
+        weights = table.weights
         
         for _ in range(excavations):
-            name, low, high, _ = random.choices(veins, weights=weights)[0]
-            reward = random.randint(low, high)
+            vein = random.choices(table.veins, weights=weights)[0]
+            reward = random.randint(vein.low, vein.high)
             total += reward
-            lines.append(f"{name}: +{reward}💰")
+            lines.append(f"{vein.name}: +{reward}💰")
 
         # Jackpot chance
-        if random.random() < 0.1:
+        if random.random() < table.jackpot_chance:
             jackpot = True
-            relic = random.randint(1500, 2500)
+            relic = random.randint(*table.jackpot)
             total += relic
             lines.append(f"🏺 Kho báu cổ đại trị giá {relic}💰!")
 
         # Fatigue cost
-        fatigue = random.randint(120, 240)
+        fatigue = random.randint(*table.fatigue)
         total -= fatigue
         lines.append(f"😮‍💨 Chi phí năng lượng: -{fatigue}💰")
 
         # Update user coins
-        state = await self.store.get(user_id)
-        state.coins = max(0, state.coins + total)
-        await self.store.save()
+        async with self.engine.transaction(user_id) as state:
+            state.coins = max(0, state.coins + total)
 
         summary = "\n".join(lines)
         highlight = "Bạn đào trúng siêu phẩm!" if jackpot else "Một ngày khai thác hăng say!"
@@ -67,4 +64,7 @@ class MiningGame:
             f"Chi tiết:\n{summary}"
         )
         
-        return message, total
+        return GameResult(message, total, state)
+
+
+register_game(GameSpec("mine", MiningGame, "Khai thác hầm mỏ", category=ADVENTURE))
@@ -0,0 +1,86 @@
+"""Registry of playable games and the types they share."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, Optional
+
+if TYPE_CHECKING:
+    from ..storage import UserState
+    from .engine import GameEngine
+
+# Help sections, in display order.
+EARN = "🎮 Game kiếm tiền"
+ADVENTURE = "⚔️ Game phiêu lưu"
+AI = "🧠 Game trí tuệ (AI)"
+CATEGORIES = (EARN, ADVENTURE, AI)
+
+# Receives the partially generated message while an AI game streams.
+ChunkCallback = Callable[[str], Awaitable[None]]
+
+
+@dataclass
+class GameResult:
+    message: str
+    coins_delta: int = 0
+    # The player's state as committed by the game, for balance footers.
+    state: Optional["UserState"] = None
+
+
+class GameError(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class GameSpec:
+    """How a game is built, listed and dispatched.
+
+    ``factory`` is called once with the :class:`GameEngine` and must return
+    an object whose ``play(user_id)`` coroutine returns a
+    :class:`GameResult`. Games with ``requires_ai`` also accept an
+    ``on_chunk`` keyword and are streamed by the front ends. ``name`` is
+    both the registry key and the command name.
+    """
+
+    name: str
+    factory: Callable[["GameEngine"], Any]
+    description: str
+    category: str = EARN
+    cooldown: float = 0.0
+    requires_ai: bool = False
+
+    @property
+    def help_text(self) -> str:
+        """Description with the cooldown, as shown by help and slash commands."""
+        if self.cooldown >= 3600:
+            return f"{self.description} ({int(self.cooldown // 3600)} giờ hồi)"
+        if self.cooldown > 0:
+            return f"{self.description} ({int(self.cooldown // 60)} phút hồi)"
+        return self.description
+
+
+GAMES: Dict[str, GameSpec] = {}
+
+
+def register_game(spec: GameSpec) -> GameSpec:
+    """Add ``spec`` to :data:`GAMES`; names must be unique."""
+    if spec.name in GAMES:
+        raise ValueError(f"Game '{spec.name}' is already registered")
+    if spec.category not in CATEGORIES:
+        raise ValueError(f"Unknown game category '{spec.category}'")
+    GAMES[spec.name] = spec
+    return spec
+
+
+__all__ = [
+    "ADVENTURE",
+    "AI",
+    "CATEGORIES",
+    "EARN",
+    "GAMES",
+    "ChunkCallback",
+    "GameError",
+    "GameResult",
+    "GameSpec",
+    "register_game",
+]
@@ -3,43 +3,50 @@
 from __future__ import annotations
 
 import random
+from typing import TYPE_CHECKING
 
-from ..storage import UserStore
+from .registry import GameResult, GameSpec, register_game
+from .tables import SLOTS
+
+if TYPE_CHECKING:
+    from .engine import GameEngine
 
 
 class SlotsGame:
     """Handle slots game logic."""
 
-    def __init__(self, store: UserStore):
-        self.store = store
+    def __init__(self, engine: "GameEngine"):
+        self.engine = engine
 
-    async def play(self, user_id: int) -> tuple[str, int]:
+    async def play(self, user_id: int) -> GameResult:
         """
         Play slots game.
         
         Returns:
-            tuple[str, int]: (message, coins_delta)
+            GameResult: message, coins_delta and the committed state
         """
-        icons = ["🍒", "🍋", "⭐", "💎", "7️⃣"]
-        spin = [random.choice(icons) for _ in range(3)]
+        table = SLOTS
+        spin = [random.choice(table.icons) for _ in range(table.reels)]
         display = " | ".join(spin)
 
         # Calculate payout
         if len(set(spin)) == 1:  # All same
-            payout = 300 if spin[0] == "7️⃣" else 180
+            payout = table.jackpot if spin[0] == table.jackpot_icon else table.triple
         elif len(set(spin)) == 2:  # Two same
-            payout = random.randint(60, 120)
+            payout = random.randint(*table.pair)
         else:  # All different
-            payout = -random.randint(15, 45)
+            payout = -random.randint(*table.loss)
 
         # Update user coins
-        state = await self.store.get(user_id)
-        state.coins = max(0, state.coins + payout)
-        await self.store.save()
+        async with self.engine.transaction(user_id) as state:
+            state.coins = max(0, state.coins + payout)
 
         if payout >= 0:
             message = f"🎰 {display}\nBạn thắng {payout}💰!"
         else:
             message = f"🎰 {display}\nBạn mất {-payout}💰..."
 
-        return message, payout
+        return GameResult(message, payout, state)
+
+
+register_game(GameSpec("slots", SlotsGame, "Quay hũ vui vẻ"))
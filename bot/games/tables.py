@@ -0,0 +1,146 @@
+"""Payout tables shared by the games and the economy simulator.
+
+Each game reads its odds and reward ranges from here, and
+``python -m bench.economy`` samples the same objects. Rebalancing a game
+therefore means editing one table, and the simulated numbers always
+describe what players get. Ranges are inclusive ``(low, high)`` pairs as
+passed to ``random.randint``.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Tuple
+
+Range = Tuple[int, int]
+
+
+@dataclass(frozen=True)
+class Prize:
+    """One weighted entry of a loot table."""
+
+    name: str
+    low: int
+    high: int
+    weight: int
+
+
+def _weights(prizes: Tuple[Prize, ...]) -> Tuple[int, ...]:
+    return tuple(prize.weight for prize in prizes)
+
+
+@dataclass(frozen=True)
+class FishingTable:
+    schools: Tuple[Prize, ...]
+    casts: Range
+    bonus_threshold: int
+    bonus_chance: float
+    bonus: Range
+
+    @property
+    def weights(self) -> Tuple[int, ...]:
+        return _weights(self.schools)
+
+
+@dataclass(frozen=True)
+class MiningTable:
+    veins: Tuple[Prize, ...]
+    excavations: Range
+    jackpot_chance: float
+    jackpot: Range
+    fatigue: Range
+
+    @property
+    def weights(self) -> Tuple[int, ...]:
+        return _weights(self.veins)
+
+
+@dataclass(frozen=True)
+class SlotsTable:
+    icons: Tuple[str, ...]
+    reels: int
+    jackpot_icon: str
+    jackpot: int  # three jackpot icons
+    triple: int  # three of any other icon
+    pair: Range  # exactly two alike
+    loss: Range  # all different, taken from the player
+
+
+@dataclass(frozen=True)
+class DiceTable:
+    sides: int
+    win_from: int  # lowest winning roll
+    win: Range
+    loss: Range
+
+
+@dataclass(frozen=True)
+class DailyTable:
+    base: int
+    streak_step: int
+    streak_cap: int
+
+    def bonus(self, streak: int) -> int:
+        return min(self.streak_cap, streak * self.streak_step)
+
+
+FISHING = FishingTable(
+    schools=(
+        Prize("🐟 Cá cơm", 8, 16, 40),
+        Prize("🐠 Cá hồng", 22, 45, 30),
+        Prize("🦑 Mực khổng lồ", 90, 160, 15),
+        Prize("🐬 Cá heo lạc", 200, 400, 8),
+        Prize("🐉 Rồng nước huyền thoại", 800, 1200, 2),
+    ),
+    casts=(2, 5),
+    bonus_threshold=600,
+    bonus_chance=0.35,
+    bonus=(120, 300),
+)
+
+MINING = MiningTable(
+    veins=(
+        Prize("⛏️ Quặng sắt", 40, 90, 45),
+        Prize("💎 Quặng kim cương", 180, 320, 25),
+        Prize("🌌 Tinh thể sao", 350, 520, 18),
+        Prize("🪐 Mảnh thiên thạch quý", 600, 900, 9),
+        Prize("⚙️ Cỗ máy cổ đại", 1100, 1600, 3),
+    ),
+    excavations=(3, 6),
+    jackpot_chance=0.1,
+    jackpot=(1500, 2500),
+    fatigue=(120, 240),
+)
+
+SLOTS = SlotsTable(
+    icons=("🍒", "🍋", "⭐", "💎", "7️⃣"),
+    reels=3,
+    jackpot_icon="7️⃣",
+    jackpot=300,
+    triple=180,
+    pair=(60, 120),
+    loss=(15, 45),
+)
+
+DICE = DiceTable(sides=6, win_from=5, win=(50, 120), loss=(10, 40))
+
+WORK_PAY: Range = (25, 65)
+
+DAILY = DailyTable(base=120, streak_step=15, streak_cap=100)
+
+
+__all__ = [
+    "DAILY",
+    "DICE",
+    "FISHING",
+    "MINING",
+    "SLOTS",
+    "WORK_PAY",
+    "DailyTable",
+    "DiceTable",
+    "FishingTable",
+    "MiningTable",
+    "Prize",
+    "Range",
+    "SlotsTable",
+]
@@ -0,0 +1,67 @@
+"""Vietnamese king language challenge module (needs the language model)."""
+
+from __future__ import annotations
+
+import logging
+import random
+from functools import partial
+from typing import TYPE_CHECKING, Optional
+
+from .registry import AI, ChunkCallback, GameError, GameResult, GameSpec, register_game
+
+if TYPE_CHECKING:
+    from .engine import GameEngine
+
+LOGGER = logging.getLogger(__name__)
+
+VIETNAMESE_KING_KEY = "vietnamese_king"
+
+
+class VietnameseKingGame:
+    """Handle Vietnamese king challenge logic."""
+
+    def __init__(self, engine: "GameEngine"):
+        self.engine = engine
+        oracle = engine.language_oracle
+        if oracle is not None:
+            engine.content.register(
+                VIETNAMESE_KING_KEY,
+                partial(oracle.vietnamese_king, cached=False),
+                oracle.vietnamese_king,
+            )
+
+    async def play(self, user_id: int, on_chunk: Optional[ChunkCallback] = None) -> GameResult:
+        oracle = self.engine.language_oracle
+        if not oracle:
+            raise GameError(
+                "Vua Tiếng Việt cần cấu hình AI_GATEWAY_API_KEY để kích hoạt thử thách ngôn ngữ."
+            )
+
+        header = "👑 Thử thách Vua Tiếng Việt!\n"
+        try:
+            challenge = await self.engine.ai_content(
+                VIETNAMESE_KING_KEY,
+                oracle.stream_vietnamese_king,
+                on_chunk,
+                header,
+            )
+        except Exception as error:  # pragma: no cover - defensive logging
+            LOGGER.exception("Vietnamese king generation failed: %s", error)
+            raise GameError("Không thể tạo thử thách Vua Tiếng Việt, bạn thử lại giúp mình nhé!") from error
+
+        reward = random.randint(110, 220)
+        state = await self.engine.apply_reward(user_id, reward)
+        return GameResult(
+            message=(
+                f"{header}"
+                f"{challenge}\n\n"
+                f"Hoàn thành và bạn được thưởng {reward}💰. Cố lên nào!"
+            ),
+            coins_delta=reward,
+            state=state,
+        )
+
+
+register_game(
+    GameSpec("vietking", VietnameseKingGame, "Thử sức Vua Tiếng Việt", category=AI, requires_ai=True)
+)
@@ -0,0 +1,77 @@
+"""Word chain game module (needs the language model)."""
+
+from __future__ import annotations
+
+import logging
+import random
+from functools import partial
+from typing import TYPE_CHECKING, Optional
+
+from .registry import AI, ChunkCallback, GameError, GameResult, GameSpec, register_game
+
+if TYPE_CHECKING:
+    from .engine import GameEngine
+
+LOGGER = logging.getLogger(__name__)
+
+WORD_CHAIN_SEEDS = ("ánh sáng", "nông dân", "hải đăng", "thiên nhiên", "cộng đồng", "khởi nghiệp")
+
+
+def word_chain_key(seed: str) -> str:
+    return f"word_chain:{seed}"
+
+
+class WordChainGame:
+    """Handle word chain game logic."""
+
+    def __init__(self, engine: "GameEngine"):
+        self.engine = engine
+        oracle = engine.language_oracle
+        if oracle is not None:
+            # Refills want fresh generations; only players who find the pool
+            # empty go through the oracle's cache and share requests.
+            for seed in WORD_CHAIN_SEEDS:
+                engine.content.register(
+                    word_chain_key(seed),
+                    partial(oracle.word_chain, seed, cached=False),
+                    partial(oracle.word_chain, seed),
+                )
+
+    async def play(self, user_id: int, on_chunk: Optional[ChunkCallback] = None) -> GameResult:
+        oracle = self.engine.language_oracle
+        if not oracle:
+            raise GameError(
+                "Tính năng nối từ cần cấu hình AI_GATEWAY_API_KEY để gọi mô hình ngôn ngữ."
+            )
+
+        # Prefer a seed with content ready so the player does not wait on
+        # the gateway, which also rides out outages while the pool lasts.
+        content = self.engine.content
+        ready = [seed for seed in WORD_CHAIN_SEEDS if content.ready(word_chain_key(seed))]
+        start_word = random.choice(ready or WORD_CHAIN_SEEDS)
+        header = f"🔗 Trò chơi nối từ!\nTừ khởi động: {start_word}\n"
+        try:
+            sequence = await self.engine.ai_content(
+                word_chain_key(start_word),
+                partial(oracle.stream_word_chain, start_word),
+                on_chunk,
+                header,
+            )
+        except Exception as error:  # pragma: no cover - defensive logging
+            LOGGER.exception("Word chain generation failed: %s", error)
+            raise GameError("Không thể tạo lượt chơi nối từ lúc này, thử lại sau nhé!") from error
+
+        reward = random.randint(90, 180)
+        state = await self.engine.apply_reward(user_id, reward)
+        return GameResult(
+            message=(
+                f"{header}"
+                f"{sequence}\n\n"
+                f"Bạn nhận được {reward}💰 cho sự nhanh trí!"
+            ),
+            coins_delta=reward,
+            state=state,
+        )
+
+
+register_game(GameSpec("wordchain", WordChainGame, "Nối từ siêu tốc", category=AI, requires_ai=True))
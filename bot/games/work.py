@@ -3,10 +3,13 @@
 from __future__ import annotations
 
 import random
-import time
-from typing import Dict
+from typing import TYPE_CHECKING
 
-from ..storage import UserStore
+from .registry import GameError, GameResult, GameSpec, register_game
+from .tables import WORK_PAY
+
+if TYPE_CHECKING:
+    from .engine import GameEngine
 
 COOLDOWN_SECONDS = 20 * 60  # 20 minutes
 
@@ -14,32 +17,30 @@ COOLDOWN_SECONDS = 20 * 60  # 20 minutes
 class WorkGame:
     """Handle work game logic."""
 
-    def __init__(self, store: UserStore):
-        self.store = store
-        self._cooldowns: Dict[int, float] = {}
+    def __init__(self, engine: "GameEngine"):
+        self.engine = engine
 
-    async def play(self, user_id: int) -> tuple[str, int]:
+    async def play(self, user_id: int) -> GameResult:
         """
         Play work game.
         
         Returns:
-            tuple[str, int]: (message, coins_earned)
+            GameResult: message, coins_earned and the committed state
         """
-        now = time.time()
-        last = self._cooldowns.get(user_id, 0)
-        remaining = last + COOLDOWN_SECONDS - now
-        
-        if remaining > 0:
-            minutes = int(remaining // 60) + 1
-            raise ValueError(f"Bạn vừa làm việc xong, thử lại sau {minutes} phút nữa nhé!")
-
-        payout = random.randint(25, 65)
-        self._cooldowns[user_id] = now
-        
-        # Update user coins
-        state = await self.store.get(user_id)
-        state.coins += payout
-        await self.store.save()
+        cooldowns = self.engine.cooldowns
+        async with self.engine.transaction(user_id) as state:
+            remaining = cooldowns.remaining(state, "work")
+            
+            if remaining > 0:
+                minutes = int(remaining // 60) + 1
+                raise GameError(f"Bạn vừa làm việc xong, thử lại sau {minutes} phút nữa nhé!")
+
+            payout = random.randint(*WORK_PAY)
+            cooldowns.start(user_id, state, "work", COOLDOWN_SECONDS)
+            state.coins += payout
         
         message = f"Bạn làm việc chăm chỉ và nhận được {payout}💰!"
-        return message, payout
+        return GameResult(message, payout, state)
+
+
+register_game(GameSpec("work", WorkGame, "Làm việc kiếm tiền", cooldown=COOLDOWN_SECONDS))
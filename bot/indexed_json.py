@@ -0,0 +1,361 @@
+"""JSON user file with a sidecar index for on-demand record lookups."""
+
+from __future__ import annotations
+
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+from json.decoder import scanstring
+from typing import Dict, Iterator, List, Mapping, Optional, Set, Tuple
+
+from .serialization import JsonCodec
+from .storage import JsonFileBackend, UserState
+
+LOGGER = logging.getLogger(__name__)
+
+INDEX_MAGIC = b"UIDX0002"
+# magic, sorted entry count, data file size, data file mtime in nanoseconds
+INDEX_HEADER = struct.Struct("<8sQQQ")
+# user id, byte offset of the record value, byte length of its slot
+INDEX_ENTRY = struct.Struct("<QQI")
+WHITESPACE = b" \t\r\n"
+# Spare bytes after an appended record, so it can grow in place later.
+APPEND_SLACK = 32
+# Compact once the appended tail holds this share of the sorted entries.
+COMPACT_RATIO = 8
+COMPACT_MIN_TAIL = 1024
+
+
+class IndexedJsonBackend(JsonFileBackend):
+    """Serve single users out of ``users.json`` without parsing the whole file.
+
+    ``<path>.idx`` holds one fixed-width entry per user, sorted by id, so a
+    lookup is a binary search over the memory-mapped index followed by one
+    ``pread`` of the record. The header stores the sorted entry count and
+    the size and mtime of the data file it describes; a missing or stale
+    index is rebuilt with a single streaming pass. The data file stays a
+    regular JSON object, so switching back to the eager backend needs no
+    migration.
+
+    A flush costs O(changed users), not O(all users). A record whose new
+    value fits its slot is overwritten in place, padded with spaces. One
+    that grew, or a new user, is appended before the closing brace with
+    ``APPEND_SLACK`` spare bytes, and its entry is appended to an unsorted
+    tail of the index that is kept in memory. The abandoned slot stays in
+    the file as an earlier duplicate key, which JSON readers overwrite with
+    the later one. Once the tail reaches 1/``COMPACT_RATIO`` of the sorted
+    entries the whole file and index are rewritten, so that O(all users)
+    cost is paid once per that many appends.
+
+    In-place writes are not atomic. Use the ``journal`` or ``sqlite``
+    backend where a torn record after a power loss is unacceptable.
+    """
+
+    lazy = True
+
+    def __init__(self, path: str) -> None:
+        super().__init__(path)
+        self.index_path = f"{path}.idx"
+        self._lock = threading.Lock()
+        self._index: Optional[mmap.mmap] = None
+        self._data_fd: Optional[int] = None
+        self._count = 0
+        self._sorted = 0
+        self._tail: Dict[int, Tuple[int, int]] = {}
+        self._tail_entries = 0
+        self._close_at = 0
+
+    def open(self) -> None:
+        with self._lock:
+            self._open_index()
+
+    def fetch(self, user_id: int) -> Optional[UserState]:
+        with self._lock:
+            location = self._locate(user_id)
+            if location is None or self._data_fd is None:
+                return None
+            offset, length = location
+            raw = os.pread(self._data_fd, length, offset)
+        return UserState.from_dict(json.loads(raw))
+
+    def count(self) -> int:
+        return self._count
+
+    def balances(self) -> List[Tuple[int, int]]:
+        # One sequential read under the lock gives a consistent copy; the
+        # records are parsed after releasing it.
+        with self._lock:
+            if self._data_fd is None:
+                return []
+            entries = list(self._iter_index())
+            data = os.pread(self._data_fd, os.fstat(self._data_fd).st_size, 0)
+        return [
+            (user_id, int(json.loads(data[offset:offset + length]).get("coins", 0)))
+            for user_id, offset, length in entries
+        ]
+
+    def needs_all_users(self) -> bool:
+        # Compaction merges the users it is given with the records on disk.
+        return False
+
+    def write_changes(self, users: Mapping[int, UserState], dirty: Mapping[int, Set[str]]) -> None:
+        """Patch or append the ``dirty`` users; compact when the tail is long."""
+        with self._lock:
+            if self._data_fd is None or self._tail_entries >= max(COMPACT_MIN_TAIL, self._sorted // COMPACT_RATIO):
+                compact = True
+            else:
+                compact = False
+                patches: List[Tuple[int, bytes]] = []
+                appends: List[Tuple[int, bytes]] = []
+                for user_id in sorted(dirty):
+                    state = users.get(user_id)
+                    if state is None:
+                        continue
+                    body = JsonCodec.encode_value(state)
+                    location = self._locate(user_id)
+                    if location is not None and len(body) <= location[1]:
+                        patches.append((location[0], body.ljust(location[1])))
+                    else:
+                        appends.append((user_id, body.ljust(len(body) + APPEND_SLACK)))
+                self._patch(patches, appends)
+        if compact:
+            self.write_snapshot(users)
+
+    def write_snapshot(self, users: Mapping[int, UserState]) -> None:
+        """Merge cached ``users`` with every untouched record already on disk."""
+        with self._lock:
+            cached = sorted(users.items())
+            temp_path = f"{self.path}.tmp"
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+
+            entries: List[Tuple[int, int, int]] = []
+            with open(temp_path, "wb") as handle:
+                handle.write(b"{")
+                position = 1
+                for user_id, state, location in self._merge(cached):
+                    if state is not None:
+                        body = JsonCodec.encode_value(state)
+                    else:
+                        assert self._data_fd is not None
+                        body = os.pread(self._data_fd, location[1], location[0]).rstrip(WHITESPACE)
+                    prefix = b'%s\n  "%d": ' % (b"," if entries else b"", user_id)
+                    handle.write(prefix)
+                    handle.write(body)
+                    position += len(prefix)
+                    entries.append((user_id, position, len(body)))
+                    position += len(body)
+                handle.write(b"\n}\n")
+                handle.flush()
+                os.fsync(handle.fileno())
+                self.bytes_written += handle.tell()
+
+            os.replace(temp_path, self.path)
+            self._write_index(entries)
+            self._open_index()
+
+    def close(self) -> None:
+        with self._lock:
+            self._close_index()
+
+    def _merge(
+        self, cached: List[Tuple[int, UserState]]
+    ) -> Iterator[Tuple[int, Optional[UserState], Tuple[int, int]]]:
+        """Yield on-disk and cached users in id order, cached copies winning."""
+        on_disk = self._iter_index()
+        disk_entry = next(on_disk, None)
+        for user_id, state in cached:
+            while disk_entry is not None and disk_entry[0] < user_id:
+                yield disk_entry[0], None, (disk_entry[1], disk_entry[2])
+                disk_entry = next(on_disk, None)
+            if disk_entry is not None and disk_entry[0] == user_id:
+                disk_entry = next(on_disk, None)
+            yield user_id, state, (0, 0)
+        while disk_entry is not None:
+            yield disk_entry[0], None, (disk_entry[1], disk_entry[2])
+            disk_entry = next(on_disk, None)
+
+    def _patch(self, patches: List[Tuple[int, bytes]], appends: List[Tuple[int, bytes]]) -> None:
+        """Overwrite slots in place and append records before the closing brace."""
+        entries: List[Tuple[int, int, int]] = []
+        with open(self.path, "r+b") as handle:
+            for offset, body in patches:
+                handle.seek(offset)
+                handle.write(body)
+                self.bytes_written += len(body)
+            if appends:
+                handle.seek(self._close_at)
+                position = self._close_at
+                chunks = []
+                # The first record in an empty object takes no separator.
+                separator = b"" if self._count == 0 else b","
+                for user_id, body in appends:
+                    prefix = separator + b'\n  "%d": ' % user_id
+                    separator = b","
+                    chunks.append(prefix)
+                    chunks.append(body)
+                    position += len(prefix)
+                    entries.append((user_id, position, len(body)))
+                    position += len(body)
+                chunks.append(b"\n}\n")
+                payload = b"".join(chunks)
+                handle.write(payload)
+                handle.truncate()
+                self.bytes_written += len(payload)
+                self._close_at = position + 1
+            handle.flush()
+            os.fsync(handle.fileno())
+
+        for user_id, offset, length in entries:
+            if user_id not in self._tail and self._locate_sorted(user_id) is None:
+                self._count += 1
+            self._tail[user_id] = (offset, length)
+        self._tail_entries += len(entries)
+        stat = os.stat(self.path)
+        with open(self.index_path, "r+b") as handle:
+            handle.seek(0, os.SEEK_END)
+            handle.write(b"".join(INDEX_ENTRY.pack(*entry) for entry in entries))
+            handle.seek(0)
+            handle.write(INDEX_HEADER.pack(INDEX_MAGIC, self._sorted, stat.st_size, stat.st_mtime_ns))
+
+    def _iter_index(self) -> Iterator[Tuple[int, int, int]]:
+        """Every user on disk in id order, tail entries replacing sorted ones."""
+        if self._index is None:
+            return iter(())
+        end = INDEX_HEADER.size + self._sorted * INDEX_ENTRY.size
+        sorted_entries = INDEX_ENTRY.iter_unpack(self._index[INDEX_HEADER.size:end])
+        if not self._tail:
+            return sorted_entries
+        merged = {user_id: (offset, length) for user_id, offset, length in sorted_entries}
+        merged.update(self._tail)
+        return ((user_id, *merged[user_id]) for user_id in sorted(merged))
+
+    def _locate(self, user_id: int) -> Optional[Tuple[int, int]]:
+        location = self._tail.get(user_id)
+        return location if location is not None else self._locate_sorted(user_id)
+
+    def _locate_sorted(self, user_id: int) -> Optional[Tuple[int, int]]:
+        if self._index is None:
+            return None
+        low, high = 0, self._sorted
+        while low < high:
+            middle = (low + high) // 2
+            entry_id, offset, length = INDEX_ENTRY.unpack_from(
+                self._index, INDEX_HEADER.size + middle * INDEX_ENTRY.size
+            )
+            if entry_id < user_id:
+                low = middle + 1
+            elif entry_id > user_id:
+                high = middle
+            else:
+                return offset, length
+        return None
+
+    def _open_index(self) -> None:
+        self._close_index()
+        if not os.path.exists(self.path):
+            return
+
+        stat = os.stat(self.path)
+        if not self._index_matches(stat):
+            LOGGER.info("Rebuilding user index for %s", self.path)
+            self._write_index(self._scan_records())
+
+        self._data_fd = os.open(self.path, os.O_RDONLY)
+        with open(self.index_path, "rb") as handle:
+            self._index = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        _, self._sorted, _, _ = INDEX_HEADER.unpack_from(self._index, 0)
+        self._count = self._sorted
+        tail_start = INDEX_HEADER.size + self._sorted * INDEX_ENTRY.size
+        for user_id, offset, length in INDEX_ENTRY.iter_unpack(self._index[tail_start:]):
+            if user_id not in self._tail and self._locate_sorted(user_id) is None:
+                self._count += 1
+            self._tail[user_id] = (offset, length)
+            self._tail_entries += 1
+        self._close_at = self._find_close(stat.st_size)
+
+    def _find_close(self, size: int) -> int:
+        """Offset of the brace closing the top-level object."""
+        assert self._data_fd is not None
+        tail = os.pread(self._data_fd, min(size, 64), max(0, size - 64))
+        position = len(tail.rstrip(WHITESPACE)) - 1
+        if position < 0 or tail[position:position + 1] != b"}":
+            raise ValueError(f"{self.path} does not end with a JSON object")
+        return size - len(tail) + position
+
+    def _close_index(self) -> None:
+        self._tail = {}
+        self._tail_entries = 0
+        self._count = 0
+        self._sorted = 0
+        if self._index is not None:
+            self._index.close()
+            self._index = None
+        if self._data_fd is not None:
+            os.close(self._data_fd)
+            self._data_fd = None
+
+    def _index_matches(self, stat: os.stat_result) -> bool:
+        try:
+            with open(self.index_path, "rb") as handle:
+                header = handle.read(INDEX_HEADER.size)
+        except FileNotFoundError:
+            return False
+        if len(header) != INDEX_HEADER.size:
+            return False
+        magic, _, size, mtime_ns = INDEX_HEADER.unpack(header)
+        return magic == INDEX_MAGIC and size == stat.st_size and mtime_ns == stat.st_mtime_ns
+
+    def _write_index(self, entries: List[Tuple[int, int, int]]) -> None:
+        entries.sort()
+        stat = os.stat(self.path)
+        temp_path = f"{self.index_path}.tmp"
+        with open(temp_path, "wb") as handle:
+            handle.write(INDEX_HEADER.pack(INDEX_MAGIC, len(entries), stat.st_size, stat.st_mtime_ns))
+            for entry in entries:
+                handle.write(INDEX_ENTRY.pack(*entry))
+        os.replace(temp_path, self.index_path)
+
+    def _scan_records(self) -> List[Tuple[int, int, int]]:
+        """Find the byte span of every record value in one pass over the file."""
+        with open(self.path, "rb") as handle:
+            data = handle.read()
+        # latin-1 maps every byte to one character, so string offsets are byte offsets.
+        text = data.decode("latin-1")
+        decoder = json.JSONDecoder()
+        entries: List[Tuple[int, int, int]] = []
+
+        position = _skip_whitespace(data, 0)
+        if position >= len(data):
+            return entries
+        if data[position:position + 1] != b"{":
+            raise ValueError(f"{self.path} is not a JSON object")
+        position = _skip_whitespace(data, position + 1)
+        while data[position:position + 1] != b"}":
+            if data[position:position + 1] != b'"':
+                raise ValueError(f"Unexpected byte at offset {position} in {self.path}")
+            key, position = scanstring(text, position + 1)
+            position = _skip_whitespace(data, position)
+            position = _skip_whitespace(data, position + 1)  # the ':' separator
+            start = position
+            _, end = decoder.raw_decode(text, position)
+            position = _skip_whitespace(data, end)
+            # The slot includes trailing spaces left for in-place growth.
+            entries.append((int(key), start, position - start))
+            if data[position:position + 1] == b",":
+                position = _skip_whitespace(data, position + 1)
+        # A key appended after a grown record supersedes the earlier one.
+        return [(user_id, *location) for user_id, location in {
+            user_id: (offset, length) for user_id, offset, length in entries
+        }.items()]
+
+
+def _skip_whitespace(data: bytes, position: int) -> int:
+    while position < len(data) and data[position] in WHITESPACE:
+        position += 1
+    return position
+
+
+__all__ = ["IndexedJsonBackend"]
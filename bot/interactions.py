@@ -0,0 +1,265 @@
+"""Discord HTTP interactions: signature checks, slash commands, deferred replies."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import TYPE_CHECKING, Any, Awaitable, Dict, Optional, Set
+
+import aiohttp
+
+from .games import GAMES, GameError, GameResult
+from .streaming import StreamingMessage
+
+try:  # pragma: no cover - optional dependency
+    from nacl.exceptions import BadSignatureError
+    from nacl.signing import VerifyKey
+except ImportError:  # pragma: no cover - optional dependency
+    BadSignatureError = VerifyKey = None
+
+if TYPE_CHECKING:
+    from .games import GameEngine
+
+LOGGER = logging.getLogger(__name__)
+
+DISCORD_API = "https://discord.com/api/v10"
+
+# Interaction types
+PING = 1
+APPLICATION_COMMAND = 2
+
+# Interaction response types
+PONG = 1
+CHANNEL_MESSAGE_WITH_SOURCE = 4
+DEFERRED_CHANNEL_MESSAGE_WITH_SOURCE = 5
+
+EPHEMERAL = 1 << 6
+
+# Signed requests older than this are refused so a captured body cannot be replayed.
+MAX_TIMESTAMP_AGE = 300.0
+
+GREEN = 0x2ECC71
+RED = 0xE74C3C
+GOLD = 0xF1C40F
+BLURPLE = 0x5865F2
+
+BALANCE_COMMAND = ("balance", "Xem số dư")
+
+
+class InteractionHandler:
+    """Answer Discord interactions delivered to the webhook endpoint.
+
+    Every request is checked against the application's Ed25519 public
+    key. ``PING`` is answered with ``PONG``. A slash command runs its game
+    on the :class:`GameEngine` and is answered inline when it finishes
+    within ``ack_timeout`` seconds, well inside Discord's three second
+    limit. Otherwise the reply is deferred and the result is patched into
+    the original response once it is ready. AI games are always deferred
+    and their output is streamed into the response as it is generated.
+    """
+
+    def __init__(
+        self,
+        public_key: str,
+        *,
+        ack_timeout: float = 2.0,
+        edit_interval: float = 1.0,
+        api_base: str = DISCORD_API,
+    ) -> None:
+        if VerifyKey is None:
+            raise RuntimeError("Discord interactions require `pip install pynacl`.")
+        self._verify_key = VerifyKey(bytes.fromhex(public_key))
+        self._ack_timeout = ack_timeout
+        self._edit_interval = edit_interval
+        self._api_base = api_base
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._tasks: Set[asyncio.Task[None]] = set()
+
+    def verify(self, signature: str, timestamp: str, body: bytes) -> bool:
+        """Check the ``X-Signature-Ed25519`` header for ``timestamp + body``.
+
+        The timestamp must also be within :data:`MAX_TIMESTAMP_AGE` seconds
+        of the local clock.
+        """
+        try:
+            if abs(time.time() - int(timestamp)) > MAX_TIMESTAMP_AGE:
+                return False
+            self._verify_key.verify(timestamp.encode("utf-8") + body, bytes.fromhex(signature))
+        except (BadSignatureError, ValueError):
+            return False
+        return True
+
+    async def handle(self, engine: "GameEngine", interaction: Dict[str, Any]) -> Dict[str, Any]:
+        """Return the immediate response for a verified interaction."""
+        kind = interaction.get("type")
+        if kind == PING:
+            return {"type": PONG}
+        if kind != APPLICATION_COMMAND:
+            return _message("❌ Loại tương tác không được hỗ trợ.", ephemeral=True)
+
+        name = interaction.get("data", {}).get("name", "")
+        user = interaction.get("member", {}).get("user") or interaction.get("user") or {}
+        user_id = int(user["id"])
+
+        if name == BALANCE_COMMAND[0]:
+            state = await engine.ensure_ready(user_id)
+            display_name = user.get("global_name") or user.get("username", "")
+            return _embed(
+                {
+                    "title": f"💼 Ví của {display_name}",
+                    "color": GOLD,
+                    "fields": [
+                        {"name": "💰 Số dư", "value": f"**{state.coins}** coins", "inline": True},
+                        {"name": "🔥 Chuỗi daily", "value": f"**{state.streak}** ngày", "inline": True},
+                    ],
+                }
+            )
+        spec = GAMES.get(name)
+        if spec is None:
+            return _message("❌ Lệnh không tồn tại.", ephemeral=True)
+
+        token = interaction["token"]
+        application_id = interaction["application_id"]
+        if spec.requires_ai:
+            self._spawn(self._stream_game(engine, name, user_id, application_id, token))
+            return {"type": DEFERRED_CHANNEL_MESSAGE_WITH_SOURCE}
+
+        task = asyncio.ensure_future(engine.play(name, user_id))
+        done, _ = await asyncio.wait({task}, timeout=self._ack_timeout)
+        if done:
+            return await _response_for(engine, task, user_id)
+        self._spawn(self._follow_up(engine, task, user_id, application_id, token))
+        return {"type": DEFERRED_CHANNEL_MESSAGE_WITH_SOURCE}
+
+    async def close(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _spawn(self, coroutine: Awaitable[None]) -> None:
+        task = asyncio.ensure_future(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._task_done)
+
+    def _task_done(self, task: "asyncio.Task[None]") -> None:
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            LOGGER.error("Interaction follow-up failed", exc_info=task.exception())
+
+    async def _follow_up(
+        self,
+        engine: "GameEngine",
+        task: "asyncio.Future[GameResult]",
+        user_id: int,
+        application_id: str,
+        token: str,
+    ) -> None:
+        await asyncio.wait({task})
+        response = await _response_for(engine, task, user_id)
+        await self._deliver(application_id, token, response["data"])
+
+    async def _stream_game(
+        self, engine: "GameEngine", name: str, user_id: int, application_id: str, token: str
+    ) -> None:
+        async def publish(text: str) -> None:
+            await self._edit_original(
+                application_id, token, {"embeds": [{"description": text, "color": BLURPLE}]}
+            )
+
+        streaming = StreamingMessage(publish, interval=self._edit_interval)
+        task = asyncio.ensure_future(engine.play(name, user_id, streaming.update))
+        await asyncio.wait({task})
+        await streaming.close()
+        response = await _response_for(engine, task, user_id)
+        await self._deliver(application_id, token, response["data"])
+
+    async def _deliver(self, application_id: str, token: str, data: Dict[str, Any]) -> None:
+        """Put the final reply of a deferred interaction in place.
+
+        The visibility of a response is fixed when it is deferred, and the
+        deferral happens before the outcome is known. An ephemeral reply
+        (an error) therefore replaces the public placeholder with an
+        ephemeral follow-up message instead of editing it.
+        """
+        if not data.get("flags", 0) & EPHEMERAL:
+            await self._edit_original(application_id, token, data)
+            return
+        webhook = f"{self._api_base}/webhooks/{application_id}/{token}"
+        await self._request("DELETE", f"{webhook}/messages/@original")
+        await self._request("POST", webhook, {"content": data.get("content", ""), "flags": EPHEMERAL})
+
+    async def _edit_original(self, application_id: str, token: str, data: Dict[str, Any]) -> None:
+        url = f"{self._api_base}/webhooks/{application_id}/{token}/messages/@original"
+        payload = {"content": data.get("content", ""), "embeds": data.get("embeds", [])}
+        await self._request("PATCH", url, payload)
+
+    async def _request(self, method: str, url: str, payload: Optional[Dict[str, Any]] = None) -> None:
+        if self._session is None:
+            self._session = aiohttp.ClientSession()
+        async with self._session.request(method, url, json=payload) as response:
+            if response.status >= 400:
+                LOGGER.warning(
+                    "Interaction webhook %s failed: %d %s",
+                    method,
+                    response.status,
+                    await response.text(),
+                )
+
+
+async def register_commands(application_id: int, bot_token: str, api_base: str = DISCORD_API) -> None:
+    """Overwrite the application's global slash commands with the game commands."""
+    commands = [
+        {"name": spec.name, "description": spec.help_text, "type": 1}
+        for spec in GAMES.values()
+    ]
+    commands.append({"name": BALANCE_COMMAND[0], "description": BALANCE_COMMAND[1], "type": 1})
+    url = f"{api_base}/applications/{application_id}/commands"
+    headers = {"Authorization": f"Bot {bot_token}"}
+    async with aiohttp.ClientSession() as session:
+        async with session.put(url, json=commands, headers=headers) as response:
+            if response.status >= 400:
+                LOGGER.error(
+                    "Registering slash commands failed: %d %s",
+                    response.status,
+                    await response.text(),
+                )
+                return
+    LOGGER.info("Registered %d slash commands", len(commands))
+
+
+async def _response_for(
+    engine: "GameEngine", task: "asyncio.Future[GameResult]", user_id: int
+) -> Dict[str, Any]:
+    error = task.exception()
+    if isinstance(error, GameError):
+        return _message(f"❌ {error}", ephemeral=True)
+    if error is not None:
+        LOGGER.error("Interaction command failed: %s", error, exc_info=error)
+        return _message("❌ Có lỗi xảy ra, vui lòng thử lại sau!", ephemeral=True)
+    result = task.result()
+    state = result.state or await engine.ensure_ready(user_id)
+    return _embed(
+        {
+            "description": result.message,
+            "color": GREEN if result.coins_delta >= 0 else RED,
+            "footer": {"text": f"Số dư hiện tại: {state.coins} coins"},
+        }
+    )
+
+
+def _message(content: str, *, ephemeral: bool = False) -> Dict[str, Any]:
+    data: Dict[str, Any] = {"content": content}
+    if ephemeral:
+        data["flags"] = EPHEMERAL
+    return {"type": CHANNEL_MESSAGE_WITH_SOURCE, "data": data}
+
+
+def _embed(embed: Dict[str, Any]) -> Dict[str, Any]:
+    return {"type": CHANNEL_MESSAGE_WITH_SOURCE, "data": {"embeds": [embed]}}
+
+
+__all__ = ["InteractionHandler", "MAX_TIMESTAMP_AGE", "register_commands"]
@@ -0,0 +1,160 @@
+"""Append-only journal persistence with periodic snapshot compaction."""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import time
+from typing import Dict, Mapping, Optional, Set, TextIO
+
+from .serialization import UserCodec
+from .storage import USER_FIELDS, JsonFileBackend, UserState, parse_cooldowns
+
+LOGGER = logging.getLogger(__name__)
+
+
+class JournalBackend:
+    """Persist mutations as one compact journal line per changed field.
+
+    Each record is ``[timestamp, user_id, field, value]``. Values rather
+    than deltas are journaled because the store coalesces several mutations
+    into one flush, and set-records stay correct if they are replayed twice
+    after a crash during compaction. Once ``snapshot_every`` records have
+    accumulated, the next flush writes the full state to the JSON snapshot
+    and truncates the journal, which bounds replay time on
+    :meth:`read_all`. Other flushes only need the dirty users.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        fsync_interval: float = 1.0,
+        snapshot_every: int = 10_000,
+        codec: Optional[UserCodec] = None,
+    ) -> None:
+        self.path = path
+        self.journal_path = f"{path}.journal"
+        self._snapshot = JsonFileBackend(path, codec)
+        self._fsync_interval = fsync_interval
+        self._snapshot_every = max(1, snapshot_every)
+        self._handle: Optional[TextIO] = None
+        self._records = 0
+        self._last_fsync = 0.0
+        self._journal_bytes = 0
+
+    def read_all(self) -> Dict[int, UserState]:
+        users = self._snapshot.read_all()
+        self._records = self._replay(users)
+        if self._records:
+            LOGGER.info("Replayed %d journal records", self._records)
+        return users
+
+    def needs_all_users(self) -> bool:
+        """Only a flush that compacts the journal needs every user."""
+        return self._records >= self._snapshot_every
+
+    def write_changes(self, users: Mapping[int, UserState], dirty: Mapping[int, Set[str]]) -> None:
+        # Decided before appending: the store passed every user only if
+        # needs_all_users() already said so.
+        compact = self.needs_all_users()
+        timestamp = int(time.time())
+        lines = []
+        for user_id, fields in dirty.items():
+            state = users.get(user_id)
+            if state is None:
+                continue
+            for field in fields:
+                record = [timestamp, user_id, field, getattr(state, field)]
+                lines.append(json.dumps(record, separators=(",", ":")))
+        if not lines:
+            return
+
+        handle = self._open_journal()
+        text = "\n".join(lines) + "\n"
+        handle.write(text)
+        # Records are ASCII JSON, so characters and bytes agree.
+        self._journal_bytes += len(text)
+        handle.flush()
+        self._records += len(lines)
+
+        now = time.monotonic()
+        if now - self._last_fsync >= self._fsync_interval:
+            os.fsync(handle.fileno())
+            self._last_fsync = now
+
+        if compact:
+            self.write_snapshot(users)
+
+    @property
+    def bytes_written(self) -> int:
+        return self._journal_bytes + self._snapshot.bytes_written
+
+    def write_snapshot(self, users: Mapping[int, UserState]) -> None:
+        self._snapshot.write_snapshot(users)
+
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+        with open(self.journal_path, "w", encoding="utf-8"):
+            pass
+        self._records = 0
+
+    def close(self) -> None:
+        if self._handle is None:
+            return
+        self._handle.flush()
+        os.fsync(self._handle.fileno())
+        self._handle.close()
+        self._handle = None
+
+    def _open_journal(self) -> TextIO:
+        if self._handle is None:
+            os.makedirs(os.path.dirname(self.journal_path) or ".", exist_ok=True)
+            self._terminate_torn_record()
+            self._handle = open(self.journal_path, "a", encoding="utf-8")
+        return self._handle
+
+    def _terminate_torn_record(self) -> None:
+        """Make sure new records never get glued onto a half-written line."""
+        if not os.path.exists(self.journal_path):
+            return
+        with open(self.journal_path, "rb+") as handle:
+            handle.seek(0, os.SEEK_END)
+            if handle.tell() == 0:
+                return
+            handle.seek(-1, os.SEEK_END)
+            if handle.read(1) != b"\n":
+                handle.write(b"\n")
+
+    def _replay(self, users: Dict[int, UserState]) -> int:
+        if not os.path.exists(self.journal_path):
+            return 0
+
+        replayed = 0
+        with open(self.journal_path, "r", encoding="utf-8") as handle:
+            for line_number, line in enumerate(handle, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    _, user_id, field, value = json.loads(line)
+                except ValueError:
+                    LOGGER.warning("Skipping torn journal record at line %d", line_number)
+                    continue
+                if field not in USER_FIELDS:
+                    continue
+                user_id = int(user_id)
+                state = users.get(user_id)
+                if state is None:
+                    state = users[user_id] = UserState()
+                if field == "cooldowns":
+                    state.cooldowns = parse_cooldowns(value)
+                else:
+                    setattr(state, field, int(value))
+                replayed += 1
+        return replayed
+
+
+__all__ = ["JournalBackend"]
@@ -0,0 +1,250 @@
+"""Coin leaderboards kept up to date as balances change."""
+
+from __future__ import annotations
+
+import bisect
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from .storage import UserState
+
+# Users are ordered by coins descending, then by id. Both fit in one int
+# key, ``-coins`` in the high bits and the id in the low 64, which sorts
+# and compares faster than a tuple and takes less memory.
+_ID_BITS = 64
+_ID_MASK = (1 << _ID_BITS) - 1
+_BUCKET = 512  # a bucket is split when it grows past twice this size
+
+
+def _key(user_id: int, coins: int) -> int:
+    return (-coins << _ID_BITS) | user_id
+
+
+def _unpack(key: int) -> Tuple[int, int]:
+    return key & _ID_MASK, -(key >> _ID_BITS)
+
+
+class RankedIndex:
+    """Sorted multiset of ints with O(log n) rank lookups.
+
+    Keys live in sorted buckets of at most ``2 * _BUCKET`` items. A bisect
+    over the bucket maxima finds the bucket, a bisect inside it finds the
+    position, and a Fenwick tree over bucket sizes turns that into a global
+    rank. Inserting or removing shifts at most one bucket. Only a split or
+    an emptied bucket rebuilds the tree, which is O(n / _BUCKET).
+    """
+
+    __slots__ = ("_buckets", "_maxes", "_tree", "_len")
+
+    def __init__(self, keys: Iterable[int] = ()) -> None:
+        ordered = sorted(keys)
+        self._buckets: List[List[int]] = [
+            ordered[start:start + _BUCKET] for start in range(0, len(ordered), _BUCKET)
+        ]
+        self._maxes: List[int] = [bucket[-1] for bucket in self._buckets]
+        self._len = len(ordered)
+        self._rebuild_tree()
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self) -> Iterator[int]:
+        for bucket in self._buckets:
+            yield from bucket
+
+    def add(self, key: int) -> None:
+        if not self._buckets:
+            self._buckets.append([key])
+            self._maxes.append(key)
+            self._len = 1
+            self._rebuild_tree()
+            return
+        index = min(bisect.bisect_left(self._maxes, key), len(self._buckets) - 1)
+        bucket = self._buckets[index]
+        bisect.insort(bucket, key)
+        self._maxes[index] = bucket[-1]
+        self._len += 1
+        if len(bucket) > 2 * _BUCKET:
+            self._buckets[index:index + 1] = [bucket[:_BUCKET], bucket[_BUCKET:]]
+            self._maxes[index:index + 1] = [bucket[_BUCKET - 1], bucket[-1]]
+            self._rebuild_tree()
+        else:
+            self._tree_add(index, 1)
+
+    def remove(self, key: int) -> bool:
+        """Remove one occurrence of ``key``; return ``False`` if absent."""
+        index = bisect.bisect_left(self._maxes, key)
+        if index == len(self._buckets):
+            return False
+        bucket = self._buckets[index]
+        position = bisect.bisect_left(bucket, key)
+        if position == len(bucket) or bucket[position] != key:
+            return False
+        del bucket[position]
+        self._len -= 1
+        if bucket:
+            self._maxes[index] = bucket[-1]
+            self._tree_add(index, -1)
+        else:
+            del self._buckets[index]
+            del self._maxes[index]
+            self._rebuild_tree()
+        return True
+
+    def rank(self, key: int) -> int:
+        """Number of stored keys smaller than ``key``."""
+        index = bisect.bisect_left(self._maxes, key)
+        if index == len(self._buckets):
+            return self._len
+        return self._prefix(index) + bisect.bisect_left(self._buckets[index], key)
+
+    def head(self, count: int) -> List[int]:
+        """The ``count`` smallest keys, in order."""
+        keys: List[int] = []
+        for bucket in self._buckets:
+            if len(keys) >= count:
+                break
+            keys.extend(bucket[: count - len(keys)])
+        return keys
+
+    def _prefix(self, index: int) -> int:
+        """Total size of the buckets before ``index``."""
+        total = 0
+        while index > 0:
+            total += self._tree[index]
+            index -= index & -index
+        return total
+
+    def _tree_add(self, index: int, delta: int) -> None:
+        index += 1
+        while index < len(self._tree):
+            self._tree[index] += delta
+            index += index & -index
+
+    def _rebuild_tree(self) -> None:
+        tree = [0] * (len(self._buckets) + 1)
+        for index, bucket in enumerate(self._buckets, start=1):
+            tree[index] += len(bucket)
+            parent = index + (index & -index)
+            if parent < len(tree):
+                tree[parent] += tree[index]
+        self._tree = tree
+
+
+class Leaderboard:
+    """Global and per-guild coin rankings, updated on every balance change.
+
+    Register :meth:`on_change` as a :class:`~bot.storage.UserStore`
+    listener and every coins mutation, whether from ``update``,
+    ``increment`` or a committed game transaction, moves the player in the
+    global index and in each guild index they belong to. :meth:`top` and
+    :meth:`rank` then never sort. Guild membership is recorded with
+    :meth:`add_member`, which is cheap to call repeatedly.
+
+    :meth:`rebuild` ranks the players the store has in memory, which is
+    everyone for eagerly loaded backends. With lazy backends the engine
+    then calls :meth:`seed` with every persisted balance. Until that
+    finishes shortly after startup, only players seen since then are
+    ranked.
+    """
+
+    def __init__(self) -> None:
+        self._coins: Dict[int, int] = {}
+        self._global = RankedIndex()
+        self._guilds: Dict[int, RankedIndex] = {}
+        self._memberships: Dict[int, Set[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._global)
+
+    def __contains__(self, user_id: object) -> bool:
+        return user_id in self._coins
+
+    def rebuild(self, items: Iterable[Tuple[int, UserState]]) -> None:
+        """Replace the global ranking with ``items`` (as loaded from the store)."""
+        self._coins = {user_id: state.coins for user_id, state in items}
+        self._reindex()
+
+    def seed(self, balances: Iterable[Tuple[int, int]]) -> None:
+        """Rank ``(user_id, coins)`` pairs read from storage.
+
+        Players already ranked keep their balance: it was updated after the
+        backend was read, or comes from a newer cached state.
+        """
+        coins = dict(balances)
+        coins.update(self._coins)
+        self._coins = coins
+        self._reindex()
+
+    def _reindex(self) -> None:
+        self._global = RankedIndex(_key(user_id, coins) for user_id, coins in self._coins.items())
+        for guild_id in self._guilds:
+            self._guilds[guild_id] = RankedIndex(
+                _key(user_id, self._coins[user_id])
+                for user_id, guilds in self._memberships.items()
+                if guild_id in guilds and user_id in self._coins
+            )
+
+    def on_change(self, user_id: int, state: UserState, fields: Sequence[str]) -> None:
+        """Store listener: re-rank ``user_id`` when their coins changed."""
+        if "coins" in fields:
+            self.update(user_id, state.coins)
+
+    def update(self, user_id: int, coins: int) -> None:
+        previous = self._coins.get(user_id)
+        if previous == coins:
+            return
+        self._coins[user_id] = coins
+        new_key = _key(user_id, coins)
+        indexes = [self._global]
+        indexes.extend(self._guilds[guild_id] for guild_id in self._memberships.get(user_id, ()))
+        for index in indexes:
+            if previous is not None:
+                index.remove(_key(user_id, previous))
+            index.add(new_key)
+
+    def add_member(self, guild_id: int, user_id: int) -> None:
+        guilds = self._memberships.setdefault(user_id, set())
+        if guild_id in guilds:
+            return
+        guilds.add(guild_id)
+        index = self._guilds.setdefault(guild_id, RankedIndex())
+        coins = self._coins.get(user_id)
+        if coins is not None:
+            index.add(_key(user_id, coins))
+
+    def remove_member(self, guild_id: int, user_id: int) -> None:
+        guilds = self._memberships.get(user_id)
+        if not guilds or guild_id not in guilds:
+            return
+        guilds.discard(guild_id)
+        if not guilds:
+            del self._memberships[user_id]
+        coins = self._coins.get(user_id)
+        if coins is not None:
+            self._guilds[guild_id].remove(_key(user_id, coins))
+
+    def top(self, count: int = 10, guild_id: Optional[int] = None) -> List[Tuple[int, int]]:
+        """``(user_id, coins)`` for the ``count`` richest players."""
+        index = self._index(guild_id)
+        return [_unpack(key) for key in index.head(count)] if index is not None else []
+
+    def rank(self, user_id: int, guild_id: Optional[int] = None) -> Optional[int]:
+        """1-based position of ``user_id``, or ``None`` if they are not ranked there."""
+        coins = self._coins.get(user_id)
+        if coins is None:
+            return None
+        if guild_id is not None and guild_id not in self._memberships.get(user_id, ()):
+            return None
+        index = self._index(guild_id)
+        return index.rank(_key(user_id, coins)) + 1 if index is not None else None
+
+    def size(self, guild_id: Optional[int] = None) -> int:
+        """Number of ranked players globally or in ``guild_id``."""
+        index = self._index(guild_id)
+        return len(index) if index is not None else 0
+
+    def _index(self, guild_id: Optional[int]) -> Optional[RankedIndex]:
+        return self._global if guild_id is None else self._guilds.get(guild_id)
+
+
+__all__ = ["Leaderboard", "RankedIndex"]
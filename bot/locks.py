@@ -0,0 +1,117 @@
+"""Per-user asyncio locks that disappear once nobody holds or awaits them."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass, replace
+from types import TracebackType
+from typing import Dict, Hashable, Optional, Type
+
+from .metrics import LatencyHistogram
+
+
+@dataclass
+class LockStats:
+    """Counters describing how often per-user locks were contended."""
+
+    acquires: int = 0
+    contended: int = 0
+    wait_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+
+
+class _Entry:
+    __slots__ = ("lock", "holders")
+
+    def __init__(self) -> None:
+        self.lock = asyncio.Lock()
+        # Coroutines currently holding or waiting for ``lock``.
+        self.holders = 0
+
+
+class UserLockManager:
+    """Hand out one lock per key and drop it when the last user lets go.
+
+    Entries are reference counted, so the table only ever contains keys
+    that are locked or being waited on right now and memory stays flat on
+    long-running instances. Uncontended acquires are a dict lookup plus a
+    lock acquire that never suspends.
+    """
+
+    def __init__(self) -> None:
+        self._entries: Dict[Hashable, _Entry] = {}
+        self._stats = LockStats()
+        # Only contended acquires are recorded; the rest waited zero.
+        self.waits = LatencyHistogram()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def stats(self) -> LockStats:
+        return replace(self._stats)
+
+    def hold(self, key: Hashable) -> "_Hold":
+        """Return an async context manager that holds the lock for ``key``."""
+        return _Hold(self, key)
+
+    async def acquire(self, key: Hashable) -> float:
+        """Acquire the lock for ``key`` and return how long it waited."""
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = _Entry()
+        entry.holders += 1
+        self._stats.acquires += 1
+
+        # An unlocked lock can still suspend the caller when a woken waiter
+        # has not run yet, so both paths must give the entry back on cancel.
+        contended = entry.lock.locked()
+        if contended:
+            self._stats.contended += 1
+        started = time.perf_counter()
+        try:
+            await entry.lock.acquire()
+        except BaseException:
+            self._drop(key, entry)
+            raise
+        if not contended:
+            return 0.0
+        waited = time.perf_counter() - started
+        self.waits.observe(waited)
+        self._stats.wait_seconds += waited
+        if waited > self._stats.max_wait_seconds:
+            self._stats.max_wait_seconds = waited
+        return waited
+
+    def release(self, key: Hashable) -> None:
+        entry = self._entries[key]
+        entry.lock.release()
+        self._drop(key, entry)
+
+    def _drop(self, key: Hashable, entry: _Entry) -> None:
+        entry.holders -= 1
+        if entry.holders == 0:
+            del self._entries[key]
+
+
+class _Hold:
+    __slots__ = ("_manager", "_key")
+
+    def __init__(self, manager: UserLockManager, key: Hashable) -> None:
+        self._manager = manager
+        self._key = key
+
+    async def __aenter__(self) -> None:
+        await self._manager.acquire(self._key)
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self._manager.release(self._key)
+
+
+__all__ = ["LockStats", "UserLockManager"]
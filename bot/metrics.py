@@ -0,0 +1,291 @@
+"""In-process metrics rendered in the Prometheus text format."""
+
+from __future__ import annotations
+
+import asyncio
+import bisect
+import logging
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+if TYPE_CHECKING:
+    from .games import GameEngine
+    from .request_log import RequestLog
+
+LOGGER = logging.getLogger(__name__)
+
+# Upper bounds in seconds; the last bucket catches everything slower.
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+PREFIX = "bot_"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram; recording is one bisect and two adds."""
+
+    __slots__ = ("bounds", "counts", "total", "count")
+
+    def __init__(self, bounds: Sequence[float] = LATENCY_BUCKETS) -> None:
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+    def copy(self) -> "LatencyHistogram":
+        clone = LatencyHistogram(self.bounds)
+        clone.counts = list(self.counts)
+        clone.total = self.total
+        clone.count = self.count
+        return clone
+
+    def since(self, earlier: "LatencyHistogram") -> "LatencyHistogram":
+        """Observations recorded after ``earlier`` was copied."""
+        delta = LatencyHistogram(self.bounds)
+        delta.counts = [now - then for now, then in zip(self.counts, earlier.counts)]
+        delta.total = self.total - earlier.total
+        delta.count = self.count - earlier.count
+        return delta
+
+    def quantile(self, fraction: float) -> float:
+        """Upper bound of the bucket holding the ``fraction`` quantile."""
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for index, bucket in enumerate(self.counts):
+            seen += bucket
+            if seen >= rank:
+                return self.bounds[index] if index < len(self.bounds) else float("inf")
+        return float("inf")
+
+
+Value = Union[float, LatencyHistogram]
+
+
+class MetricFamily:
+    """One named metric and its labelled samples, built at scrape time."""
+
+    __slots__ = ("name", "kind", "help", "samples")
+
+    def __init__(self, name: str, kind: str, help: str) -> None:
+        self.name = PREFIX + name
+        self.kind = kind
+        self.help = help
+        self.samples: List[Tuple[Dict[str, str], Value]] = []
+
+    def add(self, value: Value, **labels: object) -> "MetricFamily":
+        self.samples.append(({key: str(label) for key, label in labels.items()}, value))
+        return self
+
+    def render(self, out: List[str]) -> None:
+        out.append(f"# HELP {self.name} {self.help}")
+        out.append(f"# TYPE {self.name} {self.kind}")
+        for labels, value in self.samples:
+            if isinstance(value, LatencyHistogram):
+                cumulative = 0
+                for bound, count in zip((*value.bounds, float("inf")), value.counts):
+                    cumulative += count
+                    out.append(f"{self.name}_bucket{_labels(labels, le=_number(bound))} {cumulative}")
+                out.append(f"{self.name}_sum{_labels(labels)} {_number(value.total)}")
+                out.append(f"{self.name}_count{_labels(labels)} {value.count}")
+            else:
+                out.append(f"{self.name}{_labels(labels)} {_number(value)}")
+
+
+def counter(name: str, help: str, value: Optional[float] = None, **labels: object) -> MetricFamily:
+    family = MetricFamily(name, "counter", help)
+    return family.add(value, **labels) if value is not None else family
+
+
+def gauge(name: str, help: str, value: Optional[float] = None, **labels: object) -> MetricFamily:
+    family = MetricFamily(name, "gauge", help)
+    return family.add(value, **labels) if value is not None else family
+
+
+def histogram(name: str, help: str, value: Optional[LatencyHistogram] = None, **labels: object) -> MetricFamily:
+    family = MetricFamily(name, "histogram", help)
+    return family.add(value, **labels) if value is not None else family
+
+
+Collector = Callable[[], Iterable[MetricFamily]]
+
+
+class MetricsRegistry:
+    """Collect metrics from their owners only when scraped.
+
+    Components keep plain counters and :class:`LatencyHistogram` objects
+    next to the code they measure, so recording stays an attribute
+    increment or a bisect. Nothing is copied or locked on the hot path.
+    A collector registered here turns that state into
+    :class:`MetricFamily` objects when ``/metrics`` is requested.
+    """
+
+    def __init__(self) -> None:
+        self._collectors: List[Collector] = []
+
+    def register(self, collector: Collector) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        out: List[str] = []
+        for collector in self._collectors:
+            try:
+                for family in collector():
+                    family.render(out)
+            except Exception:  # pragma: no cover - defensive logging
+                LOGGER.exception("Metrics collector %r failed", collector)
+        out.append("")
+        return "\n".join(out)
+
+
+class LoopLagMonitor:
+    """Measure how late the event loop wakes up a sleeping task.
+
+    Every ``interval`` seconds the monitor sleeps and records how far past
+    the deadline it resumed. Lag means a callback ran too long without
+    yielding, which delays every other command on the loop.
+    """
+
+    def __init__(self, interval: float = 0.5) -> None:
+        self.interval = interval
+        self.lag = LatencyHistogram()
+        self.max_lag = 0.0
+        self._task: Optional[asyncio.Task[None]] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def collect(self) -> Iterable[MetricFamily]:
+        yield histogram("event_loop_lag_seconds", "Delay of timer wake-ups on the event loop.", self.lag)
+        yield gauge("event_loop_lag_max_seconds", "Largest event loop delay seen.", self.max_lag)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            self.lag.observe(lag)
+            if lag > self.max_lag:
+                self.max_lag = lag
+
+
+def request_metrics(request_log: "RequestLog") -> Collector:
+    """Collector for the webhook server's per-route latency."""
+
+    def collect() -> Iterable[MetricFamily]:
+        family = histogram("http_request_duration_seconds", "Webhook server request latency by route.")
+        for route, latency in sorted(request_log.routes.items()):
+            family.add(latency, route=route)
+        yield family
+
+    return collect
+
+
+def engine_metrics(engine: "GameEngine") -> Collector:
+    """Collector for the game engine, its store, oracle, content pool and locks."""
+
+    def collect() -> Iterable[MetricFamily]:
+        durations = histogram("game_duration_seconds", "Time to play a game command, by game.")
+        for name, latency in sorted(engine.play_latency.items()):
+            durations.add(latency, game=name)
+        yield durations
+        plays = counter("game_plays_total", "Games played, by game and outcome.")
+        for (name, outcome), count in sorted(engine.play_outcomes.items()):
+            plays.add(count, game=name, outcome=outcome)
+        yield plays
+
+        locks = engine.lock_stats
+        yield counter("lock_acquires_total", "Per-user lock acquisitions.", locks.acquires)
+        yield counter("lock_contended_total", "Per-user lock acquisitions that had to wait.", locks.contended)
+        yield histogram("lock_wait_seconds", "Wait time of contended per-user lock acquisitions.", engine.lock_waits)
+        yield gauge("locks_active", "Per-user locks currently held or awaited.", engine.active_locks)
+
+        store = engine.store
+        writes = store.stats
+        operations = histogram("store_operation_seconds", "Duration of user store load, flush and save.")
+        for operation, latency in store.timings.items():
+            operations.add(latency, operation=operation)
+        yield operations
+        yield counter("store_mutations_total", "User mutations marked for writing.", writes.marked)
+        yield counter("store_writes_total", "Backend writes issued by the user store.", writes.flushes)
+        if store.bytes_written is not None:
+            yield counter("store_bytes_written_total", "Bytes written by the storage backend.", store.bytes_written)
+        yield gauge("store_cached_users", "Users held in memory.", store.cached_count)
+        yield gauge("leaderboard_players", "Players ranked on the global leaderboard.", len(engine.leaderboard))
+
+        pool = engine.content.stats
+        yield counter("content_pool_hits_total", "AI games served from the content pool.", pool.hits)
+        yield counter("content_pool_misses_total", "AI games that found the content pool empty.", pool.misses)
+        yield counter("content_pool_refills_total", "Content generated in the background.", pool.refills)
+        yield counter("content_pool_refill_failures_total", "Failed background generations.", pool.refill_failures)
+        sizes = gauge("content_pool_size", "Pre-generated entries ready, by key.")
+        for key, size in sorted(engine.content.sizes().items()):
+            sizes.add(size, key=key)
+        yield sizes
+
+        oracle = engine.language_oracle
+        if oracle is None:
+            return
+        stats = oracle.stats
+        yield histogram("oracle_request_seconds", "Latency of AI gateway requests.", oracle.call_latency)
+        yield counter("oracle_requests_total", "Completions requested through the cache.", stats.requests)
+        yield counter("oracle_cache_hits_total", "Completions answered from the cache.", stats.hits)
+        yield counter("oracle_errors_total", "Completions that failed after retries.", stats.failures)
+        yield counter("oracle_rejected_total", "Requests rejected by the open circuit.", stats.rejected)
+        yield counter("oracle_retries_total", "Retried AI gateway requests.", stats.retries)
+        yield counter("oracle_hedges_total", "Hedged AI gateway requests.", stats.hedges)
+        yield counter("oracle_fallbacks_total", "Failures answered with a stale cached completion.", stats.fallbacks)
+        yield gauge("oracle_available", "1 unless the AI gateway circuit is open.", int(oracle.available))
+
+    return collect
+
+
+def _labels(labels: Dict[str, str], **extra: str) -> str:
+    items = [*labels.items(), *extra.items()]
+    if not items:
+        return ""
+    rendered = ",".join(f'{key}="{_escape(value)}"' for key, value in items)
+    return "{" + rendered + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+__all__ = [
+    "CONTENT_TYPE",
+    "LATENCY_BUCKETS",
+    "LatencyHistogram",
+    "LoopLagMonitor",
+    "MetricFamily",
+    "MetricsRegistry",
+    "counter",
+    "engine_metrics",
+    "gauge",
+    "histogram",
+    "request_metrics",
+]
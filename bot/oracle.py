@@ -0,0 +1,496 @@
+"""OpenAI-compatible language oracle used by the word games."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import aclosing
+from dataclasses import dataclass, replace
+from functools import partial
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Union
+
+from openai import AsyncOpenAI, OpenAI
+
+from .metrics import LatencyHistogram
+from .resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    LatencyWindow,
+    ResiliencePolicy,
+    RetryBudget,
+    backoff_delay,
+    hedge,
+    is_retryable,
+)
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "openai/gpt-20-oss"
+
+# (model, system prompt, user prompt, max_tokens)
+CacheKey = Tuple[str, str, str, int]
+# generated text and how long the completion took
+Completion = Tuple[str, float]
+# system prompt, user prompt, max_tokens
+Prompt = Tuple[str, str, int]
+
+
+@dataclass
+class OracleStats:
+    """Counters describing how often the response cache saved a completion."""
+
+    requests: int = 0
+    hits: int = 0
+    coalesced: int = 0
+    misses: int = 0
+    evictions: int = 0
+    saved_seconds: float = 0.0
+    retries: int = 0
+    hedges: int = 0
+    hedge_wins: int = 0
+    rejected: int = 0
+    failures: int = 0
+    fallbacks: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        """Share of cached requests answered without a new completion."""
+        if not self.requests:
+            return 0.0
+        return (self.hits + self.coalesced) / self.requests
+
+
+class _CacheEntry:
+    __slots__ = ("variants", "expires")
+
+    def __init__(self, expires: float) -> None:
+        self.variants: List[Completion] = []
+        self.expires = expires
+
+
+class LanguageOracle:
+    """Thin wrapper around the OpenAI client for language-heavy games.
+
+    With an :class:`AsyncOpenAI` client completions run on the event loop
+    over the client's shared connection pool and cost no threads. A sync
+    :class:`OpenAI` client still works but gets a small private executor,
+    so slow completions never occupy the default pool that ``UserStore``
+    needs for disk I/O. Either way at most ``max_concurrency`` requests
+    are in flight and each one is bounded by ``timeout`` seconds.
+
+    Responses are cached per (model, prompts, max_tokens) for
+    ``cache_ttl`` seconds in an LRU of ``cache_size`` prompts. Identical
+    requests that arrive while a completion is running share it instead
+    of sending the prompt again. Each prompt collects up to
+    ``cache_variants`` different completions before the cache starts
+    answering, and then serves one of them at random.
+
+    The ``stream_*`` methods yield text chunks as they arrive so callers
+    can show output after the first token instead of the last one.
+
+    Every completion runs under a :class:`ResiliencePolicy`: an overall
+    deadline, jittered retries of transient errors paid for by a shared
+    retry budget, a hedged second request once an attempt outlives the
+    recent p95 latency, and a circuit breaker that fails fast while the
+    gateway is unhealthy. A failed cached request falls back to any
+    answer still in the cache, even an expired one.
+    """
+
+    def __init__(
+        self,
+        client: Union[AsyncOpenAI, OpenAI],
+        *,
+        model: str = DEFAULT_MODEL,
+        max_concurrency: int = 32,
+        timeout: float = 30.0,
+        cache_ttl: float = 300.0,
+        cache_size: int = 256,
+        cache_variants: int = 3,
+        resilience: Optional[ResiliencePolicy] = None,
+    ) -> None:
+        self._client = client
+        self._model = model
+        self._timeout = timeout
+        self._cache_ttl = cache_ttl
+        self._cache_size = max(0, cache_size)
+        self._cache_variants = max(1, cache_variants)
+        self._cache: "OrderedDict[CacheKey, _CacheEntry]" = OrderedDict()
+        self._inflight: Dict[CacheKey, asyncio.Task[Completion]] = {}
+        self._stats = OracleStats()
+        self._policy = resilience or ResiliencePolicy()
+        self._breaker = CircuitBreaker(
+            threshold=self._policy.breaker_threshold,
+            window=self._policy.breaker_window,
+            min_calls=self._policy.breaker_min_calls,
+            reset_timeout=self._policy.breaker_reset,
+        )
+        self._budget = RetryBudget(self._policy.retry_ratio)
+        self._latency = LatencyWindow()
+        # Every gateway request, for /metrics; _latency only keeps a window.
+        self.call_latency = LatencyHistogram()
+        self._slots = asyncio.Semaphore(max(1, max_concurrency))
+        self._executor: Optional[ThreadPoolExecutor] = None
+        if not isinstance(client, AsyncOpenAI):
+            self._executor = ThreadPoolExecutor(
+                max_workers=max(1, max_concurrency),
+                thread_name_prefix="oracle",
+            )
+
+    @property
+    def stats(self) -> OracleStats:
+        return replace(self._stats)
+
+    @property
+    def available(self) -> bool:
+        """False while the circuit breaker is rejecting calls."""
+        return self._breaker.state != "open"
+
+    async def close(self) -> None:
+        """Close the HTTP connection pool and any worker threads."""
+        for task in list(self._inflight.values()):
+            task.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        if isinstance(self._client, AsyncOpenAI):
+            await self._client.close()
+        else:
+            self._client.close()
+        stats = self._stats
+        LOGGER.info(
+            "Language oracle: %d cached requests, %.0f%% hit ratio, %.1fs saved, "
+            "%d retries, %d hedges, %d failures, %d fallbacks",
+            stats.requests,
+            stats.hit_ratio * 100,
+            stats.saved_seconds,
+            stats.retries,
+            stats.hedges,
+            stats.failures,
+            stats.fallbacks,
+        )
+
+    async def _generate(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        max_tokens: int = 400,
+        *,
+        cached: bool = True,
+    ) -> str:
+        if not cached or not self._cache_size:
+            text, _ = await self._complete(system_prompt, user_prompt, max_tokens)
+            return text
+
+        key = (self._model, system_prompt, user_prompt, max_tokens)
+        self._stats.requests += 1
+        text = self._lookup(key)
+        if text is not None:
+            return text
+
+        task = self._inflight.get(key)
+        shared = task is not None
+        if task is None:
+            self._stats.misses += 1
+            # The completion runs as its own task so a caller that gives up
+            # does not cancel it for everyone else waiting on the same prompt.
+            task = asyncio.ensure_future(self._complete(system_prompt, user_prompt, max_tokens))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._store(key, done))
+        else:
+            self._stats.coalesced += 1
+        try:
+            text, latency = await asyncio.shield(task)
+        except Exception as error:
+            return self._fallback(key, error)
+        if shared:
+            self._stats.saved_seconds += latency
+        return text
+
+    async def _stream(self, system_prompt: str, user_prompt: str, max_tokens: int = 400) -> AsyncIterator[str]:
+        if self._executor is not None:
+            # A sync client would need a thread per chunk; send it whole.
+            yield await self._generate(system_prompt, user_prompt, max_tokens)
+            return
+
+        key = (self._model, system_prompt, user_prompt, max_tokens)
+        if self._cache_size:
+            self._stats.requests += 1
+            text = self._lookup(key)
+            if text is not None:
+                yield text
+                return
+            self._stats.misses += 1
+        if not self._breaker.allow():
+            self._stats.rejected += 1
+            yield self._fallback(key, CircuitOpenError("AI gateway circuit is open"))
+            return
+        probe = self._breaker.probing
+        self._budget.deposit()
+
+        policy = self._policy
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + policy.deadline
+        started = time.perf_counter()
+        parts: List[str] = []
+        attempt = 0
+        try:
+            while True:
+                try:
+                    attempt_chunks = self._stream_attempt(system_prompt, user_prompt, max_tokens, deadline)
+                    async with aclosing(attempt_chunks) as chunks:
+                        async for delta in chunks:
+                            parts.append(delta)
+                            yield delta
+                except Exception as error:
+                    self._breaker.record_failure()
+                    delay = backoff_delay(attempt, policy.backoff_base, policy.backoff_cap)
+                    if (
+                        parts  # text already shown cannot be taken back
+                        or attempt >= policy.max_retries
+                        or not is_retryable(error)
+                        or loop.time() + delay >= deadline
+                        or not self._breaker.allow()
+                        or not self._budget.try_spend()
+                    ):
+                        self._stats.failures += 1
+                        if parts:
+                            raise
+                        # Nothing was shown yet, so a cached answer can still stand in.
+                        yield self._fallback(key, error)
+                        return
+                    probe = probe or self._breaker.probing
+                    attempt += 1
+                    self._stats.retries += 1
+                    await asyncio.sleep(delay)
+                    continue
+                self._breaker.record_success()
+                break
+        finally:
+            if probe:
+                # Cancelled or abandoned mid-stream: let the next call probe.
+                self._breaker.release()
+        self._remember(key, ("".join(parts).strip(), time.perf_counter() - started))
+
+    async def _stream_attempt(
+        self, system_prompt: str, user_prompt: str, max_tokens: int, deadline: float
+    ) -> AsyncIterator[str]:
+        """Stream one request, waiting on the gateway no later than ``deadline``."""
+        loop = asyncio.get_running_loop()
+        async with self._slots:
+            started = time.perf_counter()
+            stream = await asyncio.wait_for(
+                self._client.chat.completions.create(
+                    **self._request(system_prompt, user_prompt, max_tokens),
+                    stream=True,
+                ),
+                max(0.0, deadline - loop.time()),
+            )
+            try:
+                chunks = stream.__aiter__()
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(chunks.__anext__(), max(0.0, deadline - loop.time()))
+                    except StopAsyncIteration:
+                        break
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        yield delta
+            finally:
+                await stream.close()
+            elapsed = time.perf_counter() - started
+            self._latency.add(elapsed)
+            self.call_latency.observe(elapsed)
+
+    def _lookup(self, key: CacheKey) -> Optional[str]:
+        entry = self._cache.get(key)
+        if entry is None or entry.expires <= time.monotonic():
+            return None
+        if len(entry.variants) < self._cache_variants:
+            return None
+        self._cache.move_to_end(key)
+        text, latency = random.choice(entry.variants)
+        self._stats.hits += 1
+        self._stats.saved_seconds += latency
+        return text
+
+    def _fallback(self, key: CacheKey, error: Exception) -> str:
+        """Serve any cached answer for ``key``, even an expired one, or re-raise."""
+        entry = self._cache.get(key)
+        if entry is None or not entry.variants:
+            raise error
+        self._stats.fallbacks += 1
+        LOGGER.warning("AI gateway failed (%s), serving a cached answer", error)
+        return random.choice(entry.variants)[0]
+
+    def _store(self, key: CacheKey, task: "asyncio.Task[Completion]") -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled() and task.exception() is None:
+            self._remember(key, task.result())
+
+    def _remember(self, key: CacheKey, completion: Completion) -> None:
+        if not self._cache_size or not completion[0]:
+            return
+        now = time.monotonic()
+        entry = self._cache.get(key)
+        if entry is None or entry.expires <= now:
+            entry = self._cache[key] = _CacheEntry(now + self._cache_ttl)
+        if len(entry.variants) < self._cache_variants:
+            entry.variants.append(completion)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+            self._stats.evictions += 1
+
+    async def _complete(self, system_prompt: str, user_prompt: str, max_tokens: int) -> Completion:
+        """Run one completion under the deadline, retry and hedging policy."""
+        policy = self._policy
+        if not self._breaker.allow():
+            self._stats.rejected += 1
+            raise CircuitOpenError("AI gateway circuit is open")
+        probe = self._breaker.probing
+        self._budget.deposit()
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + policy.deadline
+        started = time.perf_counter()
+        attempt = 0
+        try:
+            while True:
+                try:
+                    text = await asyncio.wait_for(
+                        self._attempt(system_prompt, user_prompt, max_tokens),
+                        max(0.0, deadline - loop.time()),
+                    )
+                except Exception as error:
+                    self._breaker.record_failure()
+                    delay = backoff_delay(attempt, policy.backoff_base, policy.backoff_cap)
+                    if (
+                        attempt >= policy.max_retries
+                        or not is_retryable(error)
+                        or loop.time() + delay >= deadline
+                        or not self._breaker.allow()
+                        or not self._budget.try_spend()
+                    ):
+                        self._stats.failures += 1
+                        raise
+                    probe = probe or self._breaker.probing
+                    attempt += 1
+                    self._stats.retries += 1
+                    await asyncio.sleep(delay)
+                    continue
+                self._breaker.record_success()
+                return text, time.perf_counter() - started
+        finally:
+            if probe:
+                # A cancelled probe records nothing; let the next call probe.
+                self._breaker.release()
+
+    async def _attempt(self, system_prompt: str, user_prompt: str, max_tokens: int) -> str:
+        """Send one request, racing a hedge once it runs past the usual latency."""
+        call = partial(self._send, system_prompt, user_prompt, max_tokens)
+        policy = self._policy
+        if not policy.hedge_percentile or len(self._latency) < policy.hedge_min_samples:
+            return await call()
+        text, hedged = await hedge(
+            call, self._latency.percentile(policy.hedge_percentile), self._allow_hedge
+        )
+        if hedged:
+            self._stats.hedge_wins += 1
+        return text
+
+    def _allow_hedge(self) -> bool:
+        if self._slots.locked() or not self._budget.try_spend():
+            return False
+        self._stats.hedges += 1
+        return True
+
+    async def _send(self, system_prompt: str, user_prompt: str, max_tokens: int) -> str:
+        async with self._slots:
+            started = time.perf_counter()
+            if self._executor is None:
+                response = await self._client.chat.completions.create(
+                    **self._request(system_prompt, user_prompt, max_tokens)
+                )
+            else:
+                loop = asyncio.get_running_loop()
+                response = await loop.run_in_executor(
+                    self._executor,
+                    self._call,
+                    system_prompt,
+                    user_prompt,
+                    max_tokens,
+                )
+            elapsed = time.perf_counter() - started
+            self._latency.add(elapsed)
+            self.call_latency.observe(elapsed)
+        return response.choices[0].message.content.strip()
+
+    def _call(self, system_prompt: str, user_prompt: str, max_tokens: int):
+        return self._client.chat.completions.create(
+            **self._request(system_prompt, user_prompt, max_tokens)
+        )
+
+    def _request(self, system_prompt: str, user_prompt: str, max_tokens: int) -> dict:
+        return {
+            "model": self._model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+            "temperature": 0.8,
+            "max_tokens": max_tokens,
+            "timeout": self._timeout,
+        }
+
+    async def word_chain(self, start_word: str, *, cached: bool = True) -> str:
+        return await self._generate(*word_chain_prompt(start_word), cached=cached)
+
+    async def vietnamese_king(self, *, cached: bool = True) -> str:
+        return await self._generate(*vietnamese_king_prompt(), cached=cached)
+
+    def stream_word_chain(self, start_word: str) -> AsyncIterator[str]:
+        """Yield the word chain for ``start_word`` as the model produces it."""
+        return self._stream(*word_chain_prompt(start_word))
+
+    def stream_vietnamese_king(self) -> AsyncIterator[str]:
+        """Yield a Vua Tiếng Việt challenge as the model produces it."""
+        return self._stream(*vietnamese_king_prompt())
+
+
+def word_chain_prompt(start_word: str) -> Prompt:
+    system_prompt = (
+        "Bạn là MC dẫn dắt trò chơi nối từ tiếng Việt. "
+        "Hãy luôn trả lời bằng tiếng Việt, gọn gàng, nhiệt huyết."
+    )
+    user_prompt = (
+        "Tạo một lượt chơi nối từ bắt đầu bằng từ "
+        f"'{start_word}'. Liệt kê ít nhất 6 lượt nối tiếp nhau, "
+        "mỗi lượt dạng 'A → B' trên một dòng. "
+        "Giải thích ngắn (tối đa 10 từ) nếu cần ngay sau từ bằng ngoặc đơn."
+    )
+    return system_prompt, user_prompt, 400
+
+
+def vietnamese_king_prompt() -> Prompt:
+    system_prompt = (
+        "Bạn là giám khảo chương trình Vua Tiếng Việt. "
+        "Tạo thử thách sáng tạo, thân thiện cho người chơi luyện tiếng Việt."
+    )
+    user_prompt = (
+        "Viết một thử thách gồm ba phần: \n"
+        "1. Khởi động bằng một câu đố mẹo ngắn.\n"
+        "2. Thử thách từ vựng với 3 từ khó, yêu cầu người chơi giải nghĩa.\n"
+        "3. Bài tập đặt câu với một thành ngữ hoặc tục ngữ.\n"
+        "Hãy định dạng rõ ràng bằng danh sách đánh số."
+    )
+    return system_prompt, user_prompt, 500
+
+
+__all__ = ["LanguageOracle", "OracleStats"]
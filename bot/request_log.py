@@ -0,0 +1,173 @@
+"""Sampled structured request logging and per-route latency histograms."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from aiohttp import web
+
+from .metrics import LatencyHistogram
+
+LOGGER = logging.getLogger(__name__)
+
+Handler = Callable[[web.Request], Awaitable[web.StreamResponse]]
+
+# Body fields never written to the log. An interaction ``token`` lets anyone
+# post or edit messages as the bot for 15 minutes.
+REDACTED_FIELDS = frozenset({"token", "access_token", "password"})
+
+
+class RequestLog:
+    """aiohttp middleware that times every request and logs a sample of them.
+
+    Every request is recorded in a per-route :class:`LatencyHistogram`.
+    Only ``sample_rate`` of requests produce a log line: one JSON object
+    with method, route, status, latency and at most ``excerpt_bytes`` of
+    the body, with :data:`REDACTED_FIELDS` blanked out. Every
+    ``report_interval`` seconds one summary line per route (count, mean,
+    p50/p95/p99) is logged for the requests since the last report.
+    """
+
+    def __init__(
+        self,
+        *,
+        sample_rate: float = 0.01,
+        excerpt_bytes: int = 256,
+        report_interval: float = 60.0,
+    ) -> None:
+        self.sample_rate = sample_rate
+        self.excerpt_bytes = excerpt_bytes
+        self.report_interval = report_interval
+        self.routes: Dict[str, LatencyHistogram] = {}
+        self._reported: Dict[str, LatencyHistogram] = {}
+        self._reporter: Optional[asyncio.Task[None]] = None
+
+    @web.middleware
+    async def middleware(self, request: web.Request, handler: Handler) -> web.StreamResponse:
+        started = time.perf_counter()
+        status = 500
+        try:
+            response = await handler(request)
+            status = response.status
+            return response
+        except web.HTTPException as error:
+            status = error.status
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            route = _route_name(request)
+            histogram = self.routes.get(route)
+            if histogram is None:
+                histogram = self.routes[route] = LatencyHistogram()
+            histogram.observe(elapsed)
+            if self.sample_rate and random.random() < self.sample_rate:
+                await self._log(request, route, status, elapsed)
+
+    def start(self) -> None:
+        if self._reporter is None and self.report_interval > 0:
+            self._reporter = asyncio.create_task(self._report_loop())
+
+    async def close(self) -> None:
+        if self._reporter is not None:
+            self._reporter.cancel()
+            try:
+                await self._reporter
+            except asyncio.CancelledError:
+                pass
+            self._reporter = None
+        self.report()
+
+    def report(self) -> None:
+        """Log latency for each route since the previous report."""
+        for route, histogram in sorted(self.routes.items()):
+            previous = self._reported.get(route)
+            window = histogram.since(previous) if previous is not None else histogram
+            self._reported[route] = histogram.copy()
+            if not window.count:
+                continue
+            LOGGER.info(
+                "route=%s requests=%d mean_ms=%.2f p50_ms<=%s p95_ms<=%s p99_ms<=%s",
+                route,
+                window.count,
+                window.total / window.count * 1000,
+                _bound_ms(window.quantile(0.5)),
+                _bound_ms(window.quantile(0.95)),
+                _bound_ms(window.quantile(0.99)),
+            )
+
+    async def _report_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.report_interval)
+            self.report()
+
+    async def _log(self, request: web.Request, route: str, status: int, elapsed: float) -> None:
+        record = {
+            "method": request.method,
+            "route": route,
+            "status": status,
+            "ms": round(elapsed * 1000, 2),
+        }
+        if self.excerpt_bytes and request.body_exists:
+            # Handlers have already read the body; aiohttp hands back its copy.
+            body = await request.read()
+            record["bytes"] = len(body)
+            record["excerpt"] = _redact(body)[: self.excerpt_bytes]
+        LOGGER.info(json.dumps(record, ensure_ascii=False))
+
+
+def install_queue_logging() -> logging.handlers.QueueListener:
+    """Move the root logger's handlers behind a queue drained by a thread.
+
+    Log calls then only enqueue the record, so coroutines never block on
+    stream or file I/O. Stop the returned listener on shutdown to flush it.
+    """
+    root = logging.getLogger()
+    handlers: List[logging.Handler] = list(root.handlers)
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    for handler in handlers:
+        root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    return listener
+
+
+def _route_name(request: web.Request) -> str:
+    route = request.match_info.route
+    resource = route.resource if route is not None else None
+    return resource.canonical if resource is not None else "unmatched"
+
+
+def _redact(body: bytes) -> str:
+    """Decode ``body``, blanking :data:`REDACTED_FIELDS` if it is JSON."""
+    text = body.decode("utf-8", "replace")
+    try:
+        payload = json.loads(text)
+    except ValueError:
+        return text
+    return json.dumps(_scrub(payload), ensure_ascii=False, separators=(",", ":"))
+
+
+def _scrub(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {
+            key: "[redacted]" if key in REDACTED_FIELDS else _scrub(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [_scrub(item) for item in value]
+    return value
+
+
+def _bound_ms(seconds: float) -> str:
+    return "inf" if seconds == float("inf") else f"{seconds * 1000:g}"
+
+
+__all__ = ["REDACTED_FIELDS", "RequestLog", "install_queue_logging"]
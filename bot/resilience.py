@@ -0,0 +1,229 @@
+"""Failure-handling primitives for calls to remote services."""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Deque, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS = frozenset({408, 409, 429, 500, 502, 503, 504})
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a service whose circuit breaker is open."""
+
+
+@dataclass(frozen=True)
+class ResiliencePolicy:
+    """Tuning knobs for deadlines, retries, hedging and the circuit breaker."""
+
+    deadline: float = 20.0
+    max_retries: int = 2
+    retry_ratio: float = 0.2
+    backoff_base: float = 0.25
+    backoff_cap: float = 2.0
+    hedge_percentile: float = 0.95  # 0 disables hedged requests
+    hedge_min_samples: int = 20
+    breaker_threshold: float = 0.5
+    breaker_window: int = 20
+    breaker_min_calls: int = 10
+    breaker_reset: float = 30.0
+
+
+class CircuitBreaker:
+    """Fail fast once the recent error rate crosses ``threshold``.
+
+    The outcome of the last ``window`` calls is kept in a ring buffer.
+    When at least ``min_calls`` are recorded and the failure share
+    reaches ``threshold`` the circuit opens and :meth:`allow` refuses
+    calls for ``reset_timeout`` seconds. After that a single probe is let
+    through (half-open): success closes the circuit, failure re-opens it.
+    A probe that ends with neither, because it was cancelled, must call
+    :meth:`release` so the next call can probe instead.
+    """
+
+    def __init__(
+        self,
+        *,
+        threshold: float = 0.5,
+        window: int = 20,
+        min_calls: int = 10,
+        reset_timeout: float = 30.0,
+    ) -> None:
+        self._threshold = threshold
+        self._min_calls = max(1, min(min_calls, window))
+        self._reset_timeout = reset_timeout
+        self._outcomes: Deque[bool] = deque(maxlen=max(1, window))
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if self._probing or time.monotonic() - self._opened_at >= self._reset_timeout:
+            return "half-open"
+        return "open"
+
+    @property
+    def probing(self) -> bool:
+        """True while a half-open probe is in flight."""
+        return self._probing
+
+    def allow(self) -> bool:
+        """Return whether a call may be attempted right now."""
+        if self._opened_at is None:
+            return True
+        if self._probing or time.monotonic() - self._opened_at < self._reset_timeout:
+            return False
+        self._probing = True
+        return True
+
+    def release(self) -> None:
+        """Give up the half-open probe without recording an outcome."""
+        self._probing = False
+
+    def record_success(self) -> None:
+        if self._opened_at is not None:
+            self._close()
+        self._record(True)
+
+    def record_failure(self) -> None:
+        if self._opened_at is not None:
+            # The half-open probe failed: wait another full reset period.
+            self._opened_at = time.monotonic()
+            self._probing = False
+            return
+        self._record(False)
+        if (
+            len(self._outcomes) >= self._min_calls
+            and self._failures / len(self._outcomes) >= self._threshold
+        ):
+            self._opened_at = time.monotonic()
+
+    def _record(self, success: bool) -> None:
+        if len(self._outcomes) == self._outcomes.maxlen and not self._outcomes[0]:
+            self._failures -= 1
+        self._outcomes.append(success)
+        if not success:
+            self._failures += 1
+
+    def _close(self) -> None:
+        self._opened_at = None
+        self._probing = False
+        self._outcomes.clear()
+        self._failures = 0
+
+
+class RetryBudget:
+    """Cap retries and hedges at a fraction of first attempts.
+
+    Every request deposits ``ratio`` tokens (up to ``burst``) and every
+    retry or hedge spends one, so an outage cannot multiply the load on
+    the backend by more than ``1 + ratio``.
+    """
+
+    def __init__(self, ratio: float = 0.2, burst: float = 10.0) -> None:
+        self._ratio = ratio
+        self._burst = burst
+        self._tokens = burst
+
+    def deposit(self) -> None:
+        self._tokens = min(self._burst, self._tokens + self._ratio)
+
+    def try_spend(self) -> bool:
+        if self._tokens < 1.0:
+            return False
+        self._tokens -= 1.0
+        return True
+
+
+class LatencyWindow:
+    """Recent call latencies, for picking a hedging delay."""
+
+    def __init__(self, size: int = 200) -> None:
+        self._samples: Deque[float] = deque(maxlen=size)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def add(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, fraction: float) -> float:
+        if not self._samples:
+            return 0.0
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(fraction * len(ordered)))
+        return ordered[index]
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Full-jitter exponential backoff for the ``attempt``-th retry."""
+    return random.uniform(0.0, min(cap, base * (2 ** attempt)))
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether ``error`` looks transient (timeouts, resets, 429 and 5xx)."""
+    if isinstance(error, (asyncio.TimeoutError, ConnectionError)):
+        return True
+    status = getattr(error, "status_code", None)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    # OpenAI's APIConnectionError/APITimeoutError carry no status code.
+    return type(error).__name__ in {"APIConnectionError", "APITimeoutError"}
+
+
+async def hedge(
+    call: Callable[[], Awaitable[T]],
+    delay: float,
+    allow_hedge: Callable[[], bool],
+) -> Tuple[T, bool]:
+    """Run ``call`` and, if it is still pending after ``delay``, race a second one.
+
+    Returns the first successful result and whether it came from the hedge.
+    The losing attempt is cancelled. If one attempt fails the other is
+    still awaited; the error is only raised when both have failed.
+    """
+    primary = asyncio.ensure_future(call())
+    try:
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+    except BaseException:
+        primary.cancel()
+        raise
+    if done or not allow_hedge():
+        return await primary, False
+
+    secondary = asyncio.ensure_future(call())
+    pending = {primary, secondary}
+    error: Optional[BaseException] = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result(), task is secondary
+                error = task.exception()
+        assert error is not None
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+__all__ = [
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "LatencyWindow",
+    "ResiliencePolicy",
+    "RetryBudget",
+    "backoff_delay",
+    "hedge",
+    "is_retryable",
+]
@@ -0,0 +1,173 @@
+"""Serialization formats for the user database file."""
+
+from __future__ import annotations
+
+import json
+from typing import BinaryIO, Dict, Iterable, Mapping, Protocol, Tuple
+
+from .storage import UserState, parse_cooldowns
+
+try:  # pragma: no cover - optional dependency
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:  # pragma: no cover - optional dependency
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+
+CHUNK_SIZE = 4096
+JSON_VALUE = b'{"coins":%d,"streak":%d,"last_daily":%d}'
+JSON_VALUE_COOLDOWNS = b'{"coins":%d,"streak":%d,"last_daily":%d,"cooldowns":%s}'
+MSGPACK_MAP_PREFIXES = frozenset(range(0x80, 0x90)) | {0xDE, 0xDF}
+
+
+class UserCodec(Protocol):
+    """Encode a whole user mapping to a file and decode it back."""
+
+    name: str
+
+    def encode(self, users: Mapping[int, UserState], handle: BinaryIO) -> None:
+        ...
+
+    def decode(self, raw: bytes) -> Dict[int, UserState]:
+        ...
+
+
+class JsonCodec:
+    """Compact JSON written straight from ``UserState`` fields.
+
+    Records are formatted with a byte template and written in chunks, so no
+    per-user dict is ever built and no indentation whitespace is emitted.
+    """
+
+    name = "json"
+
+    def encode(self, users: Mapping[int, UserState], handle: BinaryIO) -> None:
+        handle.write(b"{")
+        for index, chunk in enumerate(_chunks(users.items())):
+            if index:
+                handle.write(b",")
+            handle.write(b",".join(self.encode_record(user_id, state) for user_id, state in chunk))
+        handle.write(b"}")
+
+    @classmethod
+    def encode_record(cls, user_id: int, state: UserState) -> bytes:
+        return b'"%d":%s' % (user_id, cls.encode_value(state))
+
+    @staticmethod
+    def encode_value(state: UserState) -> bytes:
+        if state.cooldowns:
+            cooldowns = json.dumps(state.cooldowns, separators=(",", ":")).encode()
+            return JSON_VALUE_COOLDOWNS % (state.coins, state.streak, state.last_daily, cooldowns)
+        return JSON_VALUE % (state.coins, state.streak, state.last_daily)
+
+    def decode(self, raw: bytes) -> Dict[int, UserState]:
+        payload = orjson.loads(raw) if orjson is not None else json.loads(raw)
+        return _from_mappings(payload.items())
+
+
+class OrjsonCodec(JsonCodec):
+    """JSON through ``orjson``, which serializes slotted dataclasses natively."""
+
+    name = "orjson"
+
+    def __init__(self) -> None:
+        if orjson is None:
+            raise RuntimeError("The orjson codec requires `pip install orjson`.")
+
+    def encode(self, users: Mapping[int, UserState], handle: BinaryIO) -> None:
+        handle.write(orjson.dumps(users, option=orjson.OPT_NON_STR_KEYS))
+
+
+class MsgpackCodec:
+    """MessagePack map of user id to a ``[coins, streak, last_daily]`` array.
+
+    Players with active cooldowns get their cooldown map as a fourth item.
+    """
+
+    name = "msgpack"
+
+    def __init__(self) -> None:
+        if msgpack is None:
+            raise RuntimeError("The msgpack codec requires `pip install msgpack`.")
+
+    def encode(self, users: Mapping[int, UserState], handle: BinaryIO) -> None:
+        packer = msgpack.Packer(autoreset=True)
+        handle.write(packer.pack_map_header(len(users)))
+        for chunk in _chunks(users.items()):
+            handle.write(b"".join(packer.pack(user_id) + packer.pack(_as_row(state)) for user_id, state in chunk))
+
+    def decode(self, raw: bytes) -> Dict[int, UserState]:
+        payload = msgpack.unpackb(raw, strict_map_key=False, use_list=False)
+        return {
+            int(user_id): UserState(
+                coins=record[0],
+                streak=record[1],
+                last_daily=record[2],
+                cooldowns=parse_cooldowns(record[3]) if len(record) > 3 else None,
+            )
+            if isinstance(record, (tuple, list))
+            else UserState.from_dict(record)
+            for user_id, record in payload.items()
+        }
+
+
+CODECS = {
+    "json": JsonCodec,
+    "orjson": OrjsonCodec,
+    "msgpack": MsgpackCodec,
+}
+
+
+def get_codec(name: str) -> UserCodec:
+    """Instantiate the codec registered as ``name``."""
+    try:
+        factory = CODECS[name.lower()]
+    except KeyError:
+        raise ValueError(f"Unknown user codec: {name}") from None
+    return factory()
+
+
+def detect_codec(raw: bytes) -> UserCodec:
+    """Pick the codec able to read ``raw`` from its first significant byte."""
+    head = raw.lstrip()[:1]
+    if not head or head == b"{":
+        return JsonCodec()
+    if head[0] in MSGPACK_MAP_PREFIXES:
+        return MsgpackCodec()
+    raise ValueError("Unrecognized user database format")
+
+
+def _as_row(state: UserState) -> tuple:
+    if state.cooldowns:
+        return (state.coins, state.streak, state.last_daily, state.cooldowns)
+    return (state.coins, state.streak, state.last_daily)
+
+
+def _chunks(items: Iterable[Tuple[int, UserState]]) -> Iterable[list]:
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == CHUNK_SIZE:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _from_mappings(items: Iterable[Tuple[str, Dict[str, int]]]) -> Dict[int, UserState]:
+    return {int(user_id): UserState.from_dict(data) for user_id, data in items}
+
+
+__all__ = [
+    "CODECS",
+    "JsonCodec",
+    "MsgpackCodec",
+    "OrjsonCodec",
+    "UserCodec",
+    "detect_codec",
+    "get_codec",
+]
@@ -0,0 +1,162 @@
+"""SQLite persistence with WAL mode and grouped commits."""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+from .storage import UserState, parse_cooldowns
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    user_id INTEGER PRIMARY KEY,
+    coins INTEGER NOT NULL DEFAULT 0,
+    streak INTEGER NOT NULL DEFAULT 0,
+    last_daily INTEGER NOT NULL DEFAULT 0,
+    cooldowns TEXT
+)
+"""
+
+# Columns added after the first release, applied with ALTER TABLE on open.
+MIGRATIONS = {
+    "cooldowns": "ALTER TABLE users ADD COLUMN cooldowns TEXT",
+}
+
+SYNCHRONOUS_MODES = ("OFF", "NORMAL", "FULL", "EXTRA")
+
+UPSERT = """
+INSERT INTO users (user_id, coins, streak, last_daily, cooldowns) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT(user_id) DO UPDATE SET
+    coins = excluded.coins,
+    streak = excluded.streak,
+    last_daily = excluded.last_daily,
+    cooldowns = excluded.cooldowns
+"""
+
+
+class SqliteBackend:
+    """Lazily fetch users from SQLite and write each flush as one transaction.
+
+    The database runs in WAL mode, so point reads on the reader connection
+    never wait for the dedicated writer connection. Every
+    :meth:`write_changes` call is a single group commit covering all the
+    commands the store coalesced since the previous flush.
+    """
+
+    lazy = True
+
+    def __init__(self, path: str, *, synchronous: str = "NORMAL") -> None:
+        if synchronous.upper() not in SYNCHRONOUS_MODES:
+            raise ValueError(f"Unsupported SQLite synchronous mode: {synchronous}")
+        self.path = path
+        self._synchronous = synchronous.upper()
+        self._reader: Optional[sqlite3.Connection] = None
+        self._writer: Optional[sqlite3.Connection] = None
+        self._read_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
+    def open(self) -> None:
+        if self._writer is not None:
+            return
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        self._writer = self._connect()
+        self._writer.execute("PRAGMA journal_mode=WAL")
+        self._writer.execute(SCHEMA)
+        columns = {row[1] for row in self._writer.execute("PRAGMA table_info(users)")}
+        for column, statement in MIGRATIONS.items():
+            if column not in columns:
+                self._writer.execute(statement)
+        self._writer.commit()
+        self._reader = self._connect()
+
+    def fetch(self, user_id: int) -> Optional[UserState]:
+        with self._read_lock:
+            row = self._reader_connection().execute(
+                "SELECT coins, streak, last_daily, cooldowns FROM users WHERE user_id = ?",
+                (user_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        return _to_state(*row)
+
+    def count(self) -> int:
+        with self._read_lock:
+            (total,) = self._reader_connection().execute("SELECT COUNT(*) FROM users").fetchone()
+        return int(total)
+
+    def balances(self) -> List[Tuple[int, int]]:
+        with self._read_lock:
+            return self._reader_connection().execute("SELECT user_id, coins FROM users").fetchall()
+
+    def read_all(self) -> Dict[int, UserState]:
+        with self._read_lock:
+            rows = self._reader_connection().execute(
+                "SELECT user_id, coins, streak, last_daily, cooldowns FROM users"
+            ).fetchall()
+        return {row[0]: _to_state(*row[1:]) for row in rows}
+
+    def needs_all_users(self) -> bool:
+        return False
+
+    def write_changes(self, users: Mapping[int, UserState], dirty: Mapping[int, Set[str]]) -> None:
+        self._upsert(users, dirty)
+
+    def write_snapshot(self, users: Mapping[int, UserState]) -> None:
+        self._upsert(users, users)
+
+    def close(self) -> None:
+        with self._write_lock, self._read_lock:
+            for connection in (self._reader, self._writer):
+                if connection is not None:
+                    connection.close()
+            self._reader = None
+            self._writer = None
+
+    def _upsert(self, users: Mapping[int, UserState], keys: Iterable[int]) -> None:
+        rows = []
+        for user_id in keys:
+            state = users.get(user_id)
+            if state is not None:
+                cooldowns = json.dumps(state.cooldowns, separators=(",", ":")) if state.cooldowns else None
+                rows.append((user_id, state.coins, state.streak, state.last_daily, cooldowns))
+        if not rows:
+            return
+
+        with self._write_lock:
+            writer = self._writer_connection()
+            with writer:
+                writer.executemany(UPSERT, rows)
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, check_same_thread=False)
+        connection.execute(f"PRAGMA synchronous={self._synchronous}")
+        return connection
+
+    def _reader_connection(self) -> sqlite3.Connection:
+        if self._reader is None:
+            self.open()
+        assert self._reader is not None
+        return self._reader
+
+    def _writer_connection(self) -> sqlite3.Connection:
+        if self._writer is None:
+            self.open()
+        assert self._writer is not None
+        return self._writer
+
+
+def _to_state(coins: int, streak: int, last_daily: int, cooldowns: Optional[str]) -> UserState:
+    return UserState(
+        coins=coins,
+        streak=streak,
+        last_daily=last_daily,
+        cooldowns=parse_cooldowns(json.loads(cooldowns)) if cooldowns else None,
+    )
+
+
+__all__ = ["SqliteBackend"]
@@ -3,105 +3,625 @@
 from __future__ import annotations
 
 import asyncio
-import json
+import logging
 import os
-from dataclasses import dataclass
-from typing import Dict
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, replace
+from itertools import islice
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Dict, List, Mapping, Optional, Protocol, Sequence, Set, Tuple, Union
+from urllib.parse import parse_qsl
 
+from .metrics import LatencyHistogram
+
+if TYPE_CHECKING:
+    from .serialization import UserCodec
+
+
+LOGGER = logging.getLogger(__name__)
 
 DEFAULT_USER_STATE = {"coins": 0, "streak": 0, "last_daily": 0}
+USER_FIELDS = (*DEFAULT_USER_STATE, "cooldowns")
 
+# Called as ``listener(user_id, state, changed_fields)`` after a mutation.
+ChangeListener = Callable[[int, "UserState", Sequence[str]], None]
 
-@dataclass
+
+@dataclass(slots=True)
 class UserState:
-    """Runtime representation of a player's persistent data."""
+    """Runtime representation of a player's persistent data.
+
+    Slotted so that a million cached players do not each carry a
+    per-instance ``__dict__``. ``cooldowns`` maps a cooldown name to the
+    unix time it expires at and stays ``None`` until the player has one.
+    """
 
     coins: int = 0
     streak: int = 0
     last_daily: int = 0
+    cooldowns: Optional[Dict[str, int]] = None
 
     @classmethod
-    def from_dict(cls, payload: Dict[str, int]) -> "UserState":
-        data = {**DEFAULT_USER_STATE, **payload}
+    def from_dict(cls, payload: Dict[str, Any]) -> "UserState":
         return cls(
-            coins=int(data.get("coins", 0)),
-            streak=int(data.get("streak", 0)),
-            last_daily=int(data.get("last_daily", 0)),
+            coins=int(payload.get("coins", 0)),
+            streak=int(payload.get("streak", 0)),
+            last_daily=int(payload.get("last_daily", 0)),
+            cooldowns=parse_cooldowns(payload.get("cooldowns")),
         )
 
-    def to_dict(self) -> Dict[str, int]:
-        return {
+    def to_dict(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {
             "coins": self.coins,
             "streak": self.streak,
             "last_daily": self.last_daily,
         }
+        if self.cooldowns:
+            data["cooldowns"] = dict(self.cooldowns)
+        return data
+
+    def copy(self) -> "UserState":
+        return UserState(
+            coins=self.coins,
+            streak=self.streak,
+            last_daily=self.last_daily,
+            cooldowns=dict(self.cooldowns) if self.cooldowns else None,
+        )
+
+
+def parse_cooldowns(payload: Any) -> Optional[Dict[str, int]]:
+    """Normalize a persisted cooldown mapping, treating empty as ``None``."""
+    if not payload:
+        return None
+    return {str(name): int(expires) for name, expires in dict(payload).items()}
+
+
+@dataclass
+class WriteStats:
+    """Counters describing how mutations were turned into disk writes."""
+
+    marked: int = 0
+    flushes: int = 0
+    coalesced: int = 0
+
+
+class StorageBackend(Protocol):
+    """Blocking persistence layer used by :class:`UserStore`.
+
+    Every method runs in an executor thread, never on the event loop.
+    Users are keyed by their integer Discord id, and ``dirty`` maps each
+    changed id to the fields that changed.
+
+    A backend may define ``needs_all_users()``. When it returns false,
+    :meth:`write_changes` is handed only the dirty users instead of a copy
+    of the whole table. Backends without it always get every user.
+    """
+
+    def read_all(self) -> Dict[int, UserState]:
+        ...
+
+    def write_changes(self, users: Mapping[int, UserState], dirty: Mapping[int, Set[str]]) -> None:
+        ...
+
+    def write_snapshot(self, users: Mapping[int, UserState]) -> None:
+        ...
+
+    def close(self) -> None:
+        ...
+
+
+class LazyStorageBackend(StorageBackend, Protocol):
+    """Backend that can look up single users instead of loading everyone.
+
+    Backends advertise this capability with a true ``lazy`` attribute.
+    """
+
+    lazy: bool
+
+    def open(self) -> None:
+        ...
+
+    def fetch(self, user_id: int) -> Optional[UserState]:
+        ...
+
+    def count(self) -> int:
+        ...
+
+    def balances(self) -> List[Tuple[int, int]]:
+        """``(user_id, coins)`` for every persisted user."""
+        ...
+
+
+class JsonFileBackend:
+    """Store every user in a single file, rewritten on each write.
+
+    The file is written with ``codec`` (compact JSON by default) and the
+    format is detected again on every read, so switching codecs only takes
+    effect on the next write. Writes go to a temporary file that replaces
+    the real one atomically, so a crash never leaves a half-written file.
+    """
+
+    lazy = False
+
+    def __init__(self, path: str, codec: Optional["UserCodec"] = None) -> None:
+        from .serialization import JsonCodec
+
+        self.path = path
+        self.codec = codec or JsonCodec()
+        self.bytes_written = 0
+
+    def read_all(self) -> Dict[int, UserState]:
+        from .serialization import detect_codec
+
+        if not os.path.exists(self.path):
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            return {}
+
+        with open(self.path, "rb") as handle:
+            raw = handle.read()
+        if not raw.strip():
+            return {}
+        return detect_codec(raw).decode(raw)
+
+    def needs_all_users(self) -> bool:
+        return True
+
+    def write_changes(self, users: Mapping[int, UserState], dirty: Mapping[int, Set[str]]) -> None:
+        self.write_snapshot(users)
+
+    def write_snapshot(self, users: Mapping[int, UserState]) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "wb") as handle:
+            self.codec.encode(users, handle)
+            handle.flush()
+            os.fsync(handle.fileno())
+            self.bytes_written += handle.tell()
+        os.replace(temp_path, self.path)
+
+    def close(self) -> None:
+        pass
+
+
+def parse_data_url(url: str) -> Tuple[str, str, Dict[str, str]]:
+    """Split ``DATA_PATH`` into ``(scheme, path, options)``.
+
+    Plain paths use the ``json`` scheme and take the same ``?options`` as
+    URLs (``users.json?codec=orjson``). URLs follow the SQLAlchemy
+    convention: ``journal:///data/users.json`` is relative and
+    ``journal:////app/data/users.json`` is absolute.
+    """
+
+    if "://" not in url:
+        path, _, query = url.partition("?")
+        return "json", path, dict(parse_qsl(query))
+
+    scheme, rest = url.split("://", 1)
+    path, _, query = rest.partition("?")
+    if path.startswith("/"):
+        path = path[1:]
+    return scheme.lower(), path, dict(parse_qsl(query))
+
+
+SUPPORTED_SCHEMES = ("json", "journal", "sqlite")
+
+
+def open_backend(url: str) -> StorageBackend:
+    """Build the storage backend selected by ``url``."""
+
+    from .serialization import get_codec
+
+    scheme, path, options = parse_data_url(url)
+    codec = get_codec(options.get("codec", "json"))
+    if scheme == "json":
+        if options.get("lazy", "").lower() in ("1", "true", "yes"):
+            from .indexed_json import IndexedJsonBackend
+
+            if codec.name != "json":
+                raise ValueError("Lazy loading only supports the json codec")
+            return IndexedJsonBackend(path)
+        return JsonFileBackend(path, codec)
+    if scheme == "journal":
+        from .journal import JournalBackend
+
+        return JournalBackend(
+            path,
+            codec=codec,
+            fsync_interval=float(options.get("fsync_interval", 1.0)),
+            snapshot_every=int(options.get("snapshot_every", 10_000)),
+        )
+    if scheme == "sqlite":
+        from .sqlite_backend import SqliteBackend
+
+        return SqliteBackend(path, synchronous=options.get("synchronous", "NORMAL"))
+    raise ValueError(f"Unsupported storage scheme: {scheme}")
 
 
 class UserStore:
-    """Asynchronous JSON-backed storage for user states."""
+    """Asynchronous storage for user states on top of a pluggable backend.
+
+    Mutations only mark users dirty; a background flusher started by
+    :meth:`load` writes them out every ``flush_interval`` seconds, or sooner
+    once ``flush_threshold`` users are pending. Call :meth:`close` on
+    shutdown so nothing marked dirty is lost.
+
+    With a lazy backend only the ``cache_size`` most recently used users
+    stay in memory; clean users are evicted and fetched again on demand.
+    Users with unwritten changes, or pinned with :meth:`pinned`, are never
+    evicted, so the cache grows past ``cache_size`` rather than detach a
+    state someone still holds.
 
-    def __init__(self, path: str) -> None:
-        self._path = path
+    Writes never hold the store lock during disk I/O. The lock only covers
+    taking a shallow copy of the dirty users, or of the whole table for
+    backends that rewrite everything; while the backend writes that
+    snapshot, any user handed out by :meth:`get` is first replaced by a
+    private copy, so the writer thread never sees a state being mutated.
+
+    Listeners added with :meth:`add_listener` are called synchronously
+    after every mutation with the fields that changed, which lets indexes
+    such as the leaderboard follow balances without scanning the table.
+    """
+
+    def __init__(
+        self,
+        backend: Union[StorageBackend, str],
+        *,
+        flush_interval: float = 2.0,
+        flush_threshold: int = 100,
+        cache_size: int = 50_000,
+    ) -> None:
+        self._backend = open_backend(backend) if isinstance(backend, str) else backend
+        self._lazy = bool(getattr(self._backend, "lazy", False))
+        self._cache_size = max(1, cache_size)
         self._lock = asyncio.Lock()
-        self._users: Dict[str, UserState] = {}
+        self._write_lock = asyncio.Lock()
+        self._users: Dict[int, UserState] = OrderedDict() if self._lazy else {}
+        self._snapshot: Optional[Dict[int, UserState]] = None
+        self._flushing: Set[int] = set()
+        self._pins: Dict[int, int] = {}
+        self._flush_interval = flush_interval
+        self._flush_threshold = max(1, flush_threshold)
+        self._dirty: Dict[int, Set[str]] = {}
+        self._pending_marks = 0
+        self._stats = WriteStats()
+        self._wake = asyncio.Event()
+        self._closing = False
+        self._flusher: Optional[asyncio.Task[None]] = None
+        self._listeners: List[ChangeListener] = []
+        # Durations of backend load, flush and save calls.
+        self.timings: Dict[str, LatencyHistogram] = {
+            "load": LatencyHistogram(),
+            "flush": LatencyHistogram(),
+            "save": LatencyHistogram(),
+        }
+
+    @property
+    def stats(self) -> WriteStats:
+        return replace(self._stats)
+
+    @property
+    def bytes_written(self) -> Optional[int]:
+        """Bytes the backend has written, if it keeps count."""
+        return getattr(self._backend, "bytes_written", None)
+
+    @property
+    def lazy(self) -> bool:
+        """Whether users are fetched on demand instead of all held in memory."""
+        return self._lazy
+
+    @property
+    def cached_count(self) -> int:
+        """Number of users held in memory."""
+        return len(self._users)
 
     async def load(self) -> None:
         async with self._lock:
-            if not os.path.exists(self._path):
-                os.makedirs(os.path.dirname(self._path), exist_ok=True)
-                self._users = {}
-                return
-
             loop = asyncio.get_running_loop()
-            raw = await loop.run_in_executor(None, self._read_file)
-            payload = json.loads(raw) if raw else {}
-            self._users = {
-                str(user_id): UserState.from_dict(data)
-                for user_id, data in payload.items()
-            }
+            started = time.perf_counter()
+            if self._lazy:
+                await loop.run_in_executor(None, self._backend.open)
+                self._users.clear()
+            else:
+                self._users = await loop.run_in_executor(None, self._backend.read_all)
+            self.timings["load"].observe(time.perf_counter() - started)
+
+        if self._flusher is None:
+            self._closing = False
+            self._flusher = asyncio.create_task(self._flush_loop())
 
     async def save(self) -> None:
-        async with self._lock:
+        """Write a full snapshot of every user immediately."""
+        async with self._write_lock:
+            async with self._lock:
+                dirty = self._dirty
+                marks = self._pending_marks
+                self._dirty = {}
+                self._pending_marks = 0
+                snapshot = self._begin_snapshot(dirty)
+
             loop = asyncio.get_running_loop()
-            await loop.run_in_executor(None, self._write_file)
+            started = time.perf_counter()
+            try:
+                await loop.run_in_executor(None, self._backend.write_snapshot, snapshot)
+            except Exception:
+                self._restore_dirty(dirty, marks)
+                raise
+            finally:
+                self._end_snapshot()
+            self.timings["save"].observe(time.perf_counter() - started)
+            self._stats.flushes += 1
+
+    def mark_dirty(self, user_id: int, *fields: str) -> None:
+        """Schedule ``user_id`` for the next background flush.
+
+        ``fields`` narrows down what changed; all fields are assumed
+        changed when it is omitted.
+        """
+        changed = fields or USER_FIELDS
+        self._dirty.setdefault(user_id, set()).update(changed)
+        self._pending_marks += 1
+        self._stats.marked += 1
+        if len(self._dirty) >= self._flush_threshold:
+            self._wake.set()
+        if self._listeners:
+            state = self._users.get(user_id)
+            if state is not None:
+                for listener in self._listeners:
+                    listener(user_id, state, changed)
+
+    def add_listener(self, listener: ChangeListener) -> None:
+        """Call ``listener(user_id, state, fields)`` after each mutation."""
+        self._listeners.append(listener)
+
+    async def flush(self) -> None:
+        """Write pending mutations, if any, in a single backend write."""
+        async with self._write_lock:
+            async with self._lock:
+                if not self._dirty:
+                    return
+                marks = self._pending_marks
+                dirty = self._dirty
+                self._dirty = {}
+                self._pending_marks = 0
+                snapshot = self._begin_snapshot(dirty, full=self._needs_all_users())
+
+            loop = asyncio.get_running_loop()
+            started = time.perf_counter()
+            try:
+                await loop.run_in_executor(None, self._backend.write_changes, snapshot, dirty)
+            except Exception:
+                self._restore_dirty(dirty, marks)
+                raise
+            finally:
+                self._end_snapshot()
+            self.timings["flush"].observe(time.perf_counter() - started)
+
+            self._stats.flushes += 1
+            self._stats.coalesced += marks - 1
+
+    def _needs_all_users(self) -> bool:
+        needs_all_users = getattr(self._backend, "needs_all_users", None)
+        return needs_all_users is None or needs_all_users()
+
+    def _begin_snapshot(self, dirty: Dict[int, Set[str]], *, full: bool = True) -> Dict[int, UserState]:
+        # Dirty users are never evicted, so they are all in ``_users``.
+        snapshot = dict(self._users) if full else {key: self._users[key] for key in dirty}
+        self._snapshot = snapshot
+        self._flushing = set(dirty)
+        return snapshot
 
-    def _read_file(self) -> str:
-        with open(self._path, "r", encoding="utf-8") as handle:
-            return handle.read()
+    def _end_snapshot(self) -> None:
+        self._snapshot = None
+        self._flushing = set()
 
-    def _write_file(self) -> None:
-        os.makedirs(os.path.dirname(self._path), exist_ok=True)
-        with open(self._path, "w", encoding="utf-8") as handle:
-            json.dump({uid: state.to_dict() for uid, state in self._users.items()}, handle, indent=2)
+    def _restore_dirty(self, dirty: Dict[int, Set[str]], marks: int) -> None:
+        for key, fields in dirty.items():
+            self._dirty.setdefault(key, set()).update(fields)
+        self._pending_marks += marks
+
+    async def close(self) -> None:
+        """Stop the background flusher and flush whatever is still pending."""
+        if self._flusher is not None:
+            # Let the flusher finish its current write instead of cancelling
+            # it mid-flight, which would release the snapshot too early.
+            self._closing = True
+            self._wake.set()
+            await self._flusher
+            self._flusher = None
+
+        await self.flush()
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._backend.close)
+        stats = self._stats
+        LOGGER.info(
+            "User store closed: %d mutations, %d writes, %d coalesced",
+            stats.marked,
+            stats.flushes,
+            stats.coalesced,
+        )
+
+    async def _flush_loop(self) -> None:
+        timeout = self._flush_interval if self._flush_interval > 0 else None
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except Exception:  # pragma: no cover - defensive logging
+                LOGGER.exception("Background flush of user store failed")
 
     def _get_unlocked(self, user_id: int) -> UserState:
-        key = str(user_id)
-        if key not in self._users:
-            self._users[key] = UserState()
-        return self._users[key]
+        state = self._users.get(user_id)
+        if state is None:
+            state = self._users[user_id] = UserState()
+            return state
+
+        if self._snapshot is not None and self._snapshot.get(user_id) is state:
+            # The writer thread is reading this object; mutate a copy instead.
+            state = self._users[user_id] = state.copy()
+        if self._lazy:
+            self._users.move_to_end(user_id)
+        return state
+
+    @asynccontextmanager
+    async def pinned(self, user_id: int) -> AsyncIterator[None]:
+        """Keep ``user_id`` in the cache for the duration of the block.
+
+        Only matters for lazy backends. Wrap a read-modify-:meth:`commit`
+        sequence in it so the user cannot be evicted in between.
+        """
+        if not self._lazy:
+            yield
+            return
+        self._pins[user_id] = self._pins.get(user_id, 0) + 1
+        try:
+            yield
+        finally:
+            remaining = self._pins.pop(user_id) - 1
+            if remaining:
+                self._pins[user_id] = remaining
+
+    @asynccontextmanager
+    async def _resident(self, user_id: int) -> AsyncIterator[None]:
+        """Hold the store lock with ``user_id`` in the cache.
+
+        For lazy backends the user is read without holding the lock. It is
+        pinned meanwhile: had it been cached, modified and evicted while
+        the read was in flight, the copy read could predate its last flush.
+        If another coroutine materialized the same user first, its
+        instance wins.
+        """
+        if not self._lazy:
+            async with self._lock:
+                yield
+            return
+        async with self.pinned(user_id):
+            fetched = None
+            if user_id not in self._users:
+                loop = asyncio.get_running_loop()
+                fetched = await loop.run_in_executor(None, self._backend.fetch, user_id)
+            async with self._lock:
+                if user_id not in self._users:
+                    self._users[user_id] = fetched if fetched is not None else UserState()
+                    self._evict()
+                yield
+
+    def _evict(self) -> None:
+        """Drop least recently used users that nobody needs in memory.
+
+        Dirty, flushing and pinned users stay; if only those are left the
+        cache is allowed to exceed ``cache_size``.
+        """
+        excess = len(self._users) - self._cache_size
+        if excess <= 0:
+            return
+        candidates = (
+            key for key in self._users
+            if key not in self._dirty and key not in self._flushing and key not in self._pins
+        )
+        for key in list(islice(candidates, excess)):
+            del self._users[key]
+
+    def prune_cooldown(self, user_id: int, name: str, expires: int) -> bool:
+        """Drop an expired cooldown from a cached user.
+
+        Only removes the entry if it still expires at ``expires``, so a
+        cooldown restarted in the meantime survives. Users that are not in
+        memory are left alone; their stale entries are trimmed the next
+        time they start a cooldown.
+        """
+        if user_id not in self._users:
+            return False
+        state = self._users[user_id]
+        if not state.cooldowns or state.cooldowns.get(name) != expires:
+            return False
+
+        state = self._get_unlocked(user_id)
+        assert state.cooldowns is not None
+        remaining = {key: value for key, value in state.cooldowns.items() if key != name}
+        state.cooldowns = remaining or None
+        self.mark_dirty(user_id, "cooldowns")
+        return True
+
+    def cached_items(self) -> List[Tuple[int, UserState]]:
+        """Return the users currently held in memory."""
+        return list(self._users.items())
+
+    def commit(
+        self, user_id: int, state: UserState, original: Optional[UserState] = None
+    ) -> UserState:
+        """Copy ``state`` into the stored user and mark what changed dirty.
+
+        With ``original`` (the snapshot ``state`` was copied from) only the
+        fields that differ from it are written, so a concurrent
+        :meth:`update` or :meth:`increment` to any other field survives.
+        Without it every field that differs from the stored user is.
+
+        Synchronous on purpose: it runs without yielding to the event loop,
+        so it cannot interleave with other store operations.
+        """
+        target = self._get_unlocked(user_id)
+        base = target if original is None else original
+        changed = [name for name in USER_FIELDS if getattr(base, name) != getattr(state, name)]
+        for name in changed:
+            setattr(target, name, getattr(state, name))
+        if changed:
+            self.mark_dirty(user_id, *changed)
+        return target
 
     async def get(self, user_id: int) -> UserState:
-        async with self._lock:
+        async with self._resident(user_id):
             return self._get_unlocked(user_id)
 
     async def update(self, user_id: int, **fields: int) -> UserState:
-        async with self._lock:
+        async with self._resident(user_id):
             state = self._get_unlocked(user_id)
-            for name, value in fields.items():
-                if hasattr(state, name):
-                    setattr(state, name, value)
+            changed = [name for name in fields if hasattr(state, name)]
+            for name in changed:
+                setattr(state, name, fields[name])
+            if changed:
+                self.mark_dirty(user_id, *changed)
             return state
 
     async def increment(self, user_id: int, field: str, amount: int) -> UserState:
-        async with self._lock:
+        async with self._resident(user_id):
             state = self._get_unlocked(user_id)
             current = getattr(state, field)
             setattr(state, field, current + amount)
+            self.mark_dirty(user_id, field)
             return state
 
+    async def balances(self) -> List[Tuple[int, int]]:
+        """``(user_id, coins)`` for every known user (persisted ones for lazy backends)."""
+        if self._lazy:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, self._backend.balances)
+        return [(user_id, state.coins) for user_id, state in self._users.items()]
+
     async def count(self) -> int:
+        """Return the number of known users (persisted ones for lazy backends)."""
+        if self._lazy:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, self._backend.count)
         async with self._lock:
             return len(self._users)
 
 
-__all__ = ["UserStore", "UserState"]
+__all__ = [
+    "USER_FIELDS",
+    "ChangeListener",
+    "JsonFileBackend",
+    "LazyStorageBackend",
+    "SUPPORTED_SCHEMES",
+    "StorageBackend",
+    "UserState",
+    "UserStore",
+    "WriteStats",
+    "open_backend",
+    "parse_cooldowns",
+    "parse_data_url",
+]
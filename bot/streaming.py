@@ -0,0 +1,71 @@
+"""Rate-limited progressive updates for a single chat message."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional
+
+LOGGER = logging.getLogger(__name__)
+
+Publisher = Callable[[str], Awaitable[None]]
+
+
+class StreamingMessage:
+    """Coalesce a stream of text updates into at most one edit per interval.
+
+    :meth:`update` only records the newest text and never waits on the
+    network. A single background task publishes it, sleeps ``interval``
+    seconds, and then publishes whatever is newest at that point, so any
+    number of intermediate updates collapse into one edit. Discord allows
+    roughly five edits per message every five seconds, which the default
+    interval stays well under. :meth:`close` waits for an edit already in
+    flight and drops pending ones, so the final content can replace the
+    message right away.
+    """
+
+    def __init__(self, publish: Publisher, *, interval: float = 1.0) -> None:
+        self._publish = publish
+        self._interval = interval
+        self._latest: Optional[str] = None
+        self._published: Optional[str] = None
+        self._next_at = 0.0
+        self._hurry = asyncio.Event()
+        self._task: Optional[asyncio.Task[None]] = None
+        self.edits = 0
+
+    async def update(self, text: str) -> None:
+        self._latest = text
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """Stop publishing; the caller sends the final content itself."""
+        self._hurry.set()
+        if self._task is not None:
+            try:
+                await self._task
+            except Exception as error:
+                LOGGER.warning("Streaming message update failed: %s", error)
+            self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while self._latest != self._published:
+            delay = self._next_at - loop.time()
+            if delay > 0 and not self._hurry.is_set():
+                try:
+                    await asyncio.wait_for(self._hurry.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+            if self._hurry.is_set():
+                return
+            text = self._latest
+            assert text is not None
+            await self._publish(text)
+            self._published = text
+            self._next_at = loop.time() + self._interval
+            self.edits += 1
+
+
+__all__ = ["StreamingMessage"]
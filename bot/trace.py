@@ -0,0 +1,137 @@
+"""Compact, anonymized traces of played commands for offline replay."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import secrets
+import time
+from dataclasses import dataclass
+from typing import Iterator, List, Optional
+
+LOGGER = logging.getLogger(__name__)
+
+TRACE_VERSION = 1
+
+
+@dataclass(frozen=True)
+class TraceRecord:
+    """One command: seconds since the trace started, player, game, result."""
+
+    offset: float
+    user: int
+    game: str
+    outcome: str
+    coins_delta: int
+
+
+class TraceRecorder:
+    """Append every command played on a :class:`GameEngine` to a trace file.
+
+    The file is JSON lines. A header object comes first, then one array
+    ``[offset, user, game, outcome, coins_delta]`` per command. ``user`` is
+    a keyed 63-bit BLAKE2 hash of the Discord id. It is stable within a
+    trace, so cooldowns and balances replay faithfully, but it cannot be
+    mapped back without ``salt``. A random salt is drawn when none is
+    given.
+
+    :meth:`record` only appends to a list. A background task writes the
+    buffer every ``flush_interval`` seconds in the default executor.
+    """
+
+    def __init__(self, path: str, *, salt: str = "", flush_interval: float = 1.0) -> None:
+        self.path = path
+        self.flush_interval = flush_interval
+        self.records = 0
+        self._key = (salt or secrets.token_hex(16)).encode("utf-8")[:64]
+        self._started = time.monotonic()
+        self._buffer: List[str] = []
+        self._task: Optional[asyncio.Task[None]] = None
+        self._write_lock = asyncio.Lock()
+
+    def anonymize(self, user_id: int) -> int:
+        digest = hashlib.blake2b(user_id.to_bytes(8, "big", signed=False), digest_size=8, key=self._key)
+        # 63 bits, so ids still fit a signed SQLite INTEGER.
+        return int.from_bytes(digest.digest(), "big") >> 1
+
+    def record(self, user_id: int, game: str, outcome: str, coins_delta: int) -> None:
+        offset = round(time.monotonic() - self._started, 3)
+        self._buffer.append(
+            json.dumps([offset, self.anonymize(user_id), game, outcome, coins_delta], separators=(",", ":"))
+        )
+        self.records += 1
+
+    def start(self) -> None:
+        """Write the header and start the background writer."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        header = {"version": TRACE_VERSION, "started": int(time.time())}
+        self._buffer.insert(0, json.dumps(header))
+        self._started = time.monotonic()
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        LOGGER.info("Trace closed: %d commands recorded to %s", self.records, self.path)
+
+    async def flush(self) -> None:
+        async with self._write_lock:
+            if not self._buffer:
+                return
+            lines, self._buffer = self._buffer, []
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self._append, lines)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except OSError:  # pragma: no cover - defensive logging
+                LOGGER.exception("Writing command trace failed")
+
+    def _append(self, lines: List[str]) -> None:
+        with open(self.path, "a", encoding="utf-8") as handle:
+            handle.write("\n".join(lines))
+            handle.write("\n")
+
+
+def read_trace(path: str) -> Iterator[TraceRecord]:
+    """Yield the commands of a trace written by :class:`TraceRecorder`.
+
+    A file may hold several sessions, each starting with its own header.
+    Offsets continue across sessions, so a restart does not replay as one
+    burst.
+    """
+    base = 0.0
+    last = 0.0
+    with open(path, "r", encoding="utf-8") as handle:
+        for line_number, line in enumerate(handle, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                payload = json.loads(line)
+                if isinstance(payload, dict):
+                    base = last
+                    continue
+                offset, user, game, outcome, coins_delta = payload
+                record = TraceRecord(base + float(offset), int(user), str(game), str(outcome), int(coins_delta))
+            except (TypeError, ValueError):
+                LOGGER.warning("Skipping malformed trace line %d", line_number)
+                continue
+            last = record.offset
+            yield record
+
+
+__all__ = ["TRACE_VERSION", "TraceRecord", "TraceRecorder", "read_trace"]
@@ -0,0 +1,199 @@
+"""Asynchronous, batched delivery of messages to a Discord webhook."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass, replace
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+
+LOGGER = logging.getLogger(__name__)
+
+MAX_CONTENT = 2000  # Discord's limit for a message body
+MAX_EMBEDS = 10  # Discord's limit for embeds in one message
+MAX_ATTEMPTS = 5
+
+
+@dataclass
+class SenderStats:
+    """Counters for queued, delivered and dropped webhook messages."""
+
+    queued: int = 0
+    sent: int = 0
+    posts: int = 0
+    dropped: int = 0
+    rate_limited: int = 0
+    failed: int = 0
+
+
+@dataclass
+class _Message:
+    username: str
+    content: str = ""
+    embed: Optional[Dict[str, Any]] = None
+
+
+class WebhookSender:
+    """Post messages to a Discord webhook from a background task.
+
+    :meth:`send` never waits. It appends to a queue bounded at
+    ``max_queue`` and drops the message when the queue is full. The
+    sender waits ``batch_window`` seconds after the first queued message
+    and then merges everything for the same username into as few posts
+    as Discord allows: contents are joined up to 2000 characters and
+    embeds are grouped ten at a time. One keep-alive ``aiohttp`` session
+    is reused for every post. A 429 is retried after Discord's
+    ``retry_after``, and a bucket reported as exhausted pauses the sender
+    until it resets.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        *,
+        username: str = "Game Bot",
+        max_queue: int = 1000,
+        batch_window: float = 0.5,
+    ) -> None:
+        self.url = url
+        self.username = username
+        self._batch_window = batch_window
+        self._queue: "asyncio.Queue[_Message]" = asyncio.Queue(maxsize=max(1, max_queue))
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._task: Optional[asyncio.Task[None]] = None
+        self._stats = SenderStats()
+
+    @property
+    def stats(self) -> SenderStats:
+        return replace(self._stats)
+
+    def send(
+        self,
+        content: str = "",
+        *,
+        embed: Optional[Dict[str, Any]] = None,
+        username: Optional[str] = None,
+    ) -> bool:
+        """Queue a message; return ``False`` if it was dropped."""
+        if not self.url:
+            return False
+        try:
+            self._queue.put_nowait(_Message(username or self.username, content, embed))
+        except asyncio.QueueFull:
+            self._stats.dropped += 1
+            return False
+        self._stats.queued += 1
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        return True
+
+    async def close(self, timeout: float = 5.0) -> None:
+        """Deliver what is queued (for up to ``timeout`` seconds) and stop."""
+        if self._task is not None:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout)
+            except asyncio.TimeoutError:
+                LOGGER.warning("Dropping %d undelivered webhook messages", self._queue.qsize())
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            await asyncio.sleep(self._batch_window)
+            while not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                for payload, count in _coalesce(batch):
+                    if await self._post(payload):
+                        self._stats.sent += count
+            except Exception as error:  # pragma: no cover - defensive logging
+                LOGGER.error("Webhook sender failed: %s", error, exc_info=True)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _post(self, payload: Dict[str, Any]) -> bool:
+        if self._session is None:
+            self._session = aiohttp.ClientSession()
+        for attempt in range(MAX_ATTEMPTS):
+            try:
+                async with self._session.post(self.url, json=payload) as response:
+                    if response.status == 429:
+                        self._stats.rate_limited += 1
+                        delay = await _retry_after(response)
+                        LOGGER.warning("Webhook rate limited, retrying in %.2fs", delay)
+                        await asyncio.sleep(delay)
+                        continue
+                    if response.status >= 500:
+                        await asyncio.sleep(2 ** attempt)
+                        continue
+                    if response.status >= 400:
+                        self._stats.failed += 1
+                        LOGGER.error("Webhook rejected: %d %s", response.status, await response.text())
+                        return False
+                    self._stats.posts += 1
+                    if response.headers.get("X-RateLimit-Remaining") == "0":
+                        reset_after = float(response.headers.get("X-RateLimit-Reset-After", "0"))
+                        await asyncio.sleep(reset_after)
+                    return True
+            except aiohttp.ClientError as error:
+                LOGGER.warning("Webhook post failed: %s", error)
+                await asyncio.sleep(2 ** attempt)
+        self._stats.failed += 1
+        return False
+
+
+def _coalesce(batch: List[_Message]) -> List[tuple]:
+    """Merge queued messages into ``(payload, message count)`` posts."""
+    posts: List[tuple] = []
+    by_user: Dict[str, List[_Message]] = {}
+    for message in batch:
+        by_user.setdefault(message.username, []).append(message)
+
+    for username, messages in by_user.items():
+        content = ""
+        embeds: List[Dict[str, Any]] = []
+        count = 0
+        for message in messages:
+            joined = f"{content}\n{message.content}" if content and message.content else content + message.content
+            if count and (len(joined) > MAX_CONTENT or (message.embed and len(embeds) == MAX_EMBEDS)):
+                posts.append((_payload(username, content, embeds), count))
+                content, embeds, count = message.content, [], 0
+            else:
+                content = joined
+            if message.embed:
+                embeds.append(message.embed)
+            count += 1
+        if count:
+            posts.append((_payload(username, content, embeds), count))
+    return posts
+
+
+def _payload(username: str, content: str, embeds: List[Dict[str, Any]]) -> Dict[str, Any]:
+    payload: Dict[str, Any] = {"username": username}
+    if content:
+        payload["content"] = content[:MAX_CONTENT]
+    if embeds:
+        payload["embeds"] = embeds
+    return payload
+
+
+async def _retry_after(response: aiohttp.ClientResponse) -> float:
+    try:
+        body = await response.json(content_type=None)
+        return float(body.get("retry_after", 1.0))
+    except (ValueError, AttributeError, aiohttp.ContentTypeError):
+        return float(response.headers.get("Retry-After", "1"))
+
+
+__all__ = ["SenderStats", "WebhookSender"]
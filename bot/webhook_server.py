@@ -1,66 +1,150 @@
-"""Flask webhook server for Discord interactions."""
+"""aiohttp webhook server for Discord interactions."""
 
 from __future__ import annotations
 
-import asyncio
+import json
 import logging
-from threading import Thread
+from typing import TYPE_CHECKING, Optional
 
-from flask import Flask, jsonify, request
+from aiohttp import web
+
+from .interactions import PING
+from .metrics import CONTENT_TYPE, LoopLagMonitor, MetricsRegistry, engine_metrics, request_metrics
+from .request_log import RequestLog
+
+if TYPE_CHECKING:
+    from .games import GameEngine
+    from .interactions import InteractionHandler
 
 LOGGER = logging.getLogger(__name__)
 
 
 class WebhookServer:
-    """Flask server for handling Discord webhooks."""
+    """Serve health checks and Discord webhooks on the bot's event loop.
+
+    The server runs inside the same asyncio loop as the Discord client, so
+    handlers can ``await`` the :class:`GameEngine` directly instead of
+    crossing threads. aiohttp handles requests concurrently and keeps
+    client connections alive between requests.
+
+    With an :class:`InteractionHandler` the webhook path becomes Discord's
+    Interactions Endpoint URL: requests must carry a valid signature and
+    slash commands are played directly on the engine.
 
-    def __init__(self, port: int = 8080, path: str = "/discord-webhook"):
-        self.app = Flask(__name__)
+    Requests are not logged one by one; :class:`RequestLog` records
+    per-route latency and logs a small sample of requests instead.
+
+    ``GET /metrics`` renders ``metrics`` in the Prometheus text format:
+    request latency, event-loop lag and, once :meth:`attach` is called,
+    the game engine, store, oracle, content pool and lock metrics.
+    """
+
+    def __init__(
+        self,
+        port: int = 8080,
+        path: str = "/discord-webhook",
+        host: str = "0.0.0.0",
+        interactions: Optional["InteractionHandler"] = None,
+        request_log: Optional[RequestLog] = None,
+        metrics: Optional[MetricsRegistry] = None,
+        loop_lag_interval: float = 0.5,
+    ):
         self.port = port
         self.path = path
+        self.host = host
+        self.interactions = interactions
+        self.request_log = request_log or RequestLog()
+        self.engine: Optional["GameEngine"] = None
+        self.metrics = metrics or MetricsRegistry()
+        self.loop_lag = LoopLagMonitor(loop_lag_interval)
+        self.metrics.register(request_metrics(self.request_log))
+        self.metrics.register(self.loop_lag.collect)
+        self.app = web.Application(middlewares=[self.request_log.middleware])
+        self._runner: Optional[web.AppRunner] = None
         self._setup_routes()
 
     def _setup_routes(self) -> None:
-        """Setup Flask routes."""
-        
-        @self.app.route("/health", methods=["GET"])
-        def health_check():
-            """Health check endpoint."""
-            return jsonify({"status": "ok", "service": "discord-bot"}), 200
-
-        @self.app.route(self.path, methods=["POST"])
-        def discord_webhook():
-            """Handle Discord webhook events."""
-            try:
-                data = request.get_json()
-                LOGGER.info("Received webhook: %s", data)
-                
-                # Process webhook data
-                # This can be extended for Discord Interactions
-                
-                return jsonify({"status": "received"}), 200
-            except Exception as error:
-                LOGGER.error("Webhook error: %s", error, exc_info=True)
-                return jsonify({"error": "Internal error"}), 500
-
-        @self.app.route("/", methods=["GET"])
-        def index():
-            """Root endpoint."""
-            return jsonify({
-                "service": "Discord Game Bot",
-                "status": "running",
-                "health": "/health",
-                "webhook": self.path
-            }), 200
-
-    def run(self) -> None:
-        """Run the Flask server."""
+        """Setup HTTP routes."""
+        self.app.router.add_get("/health", self.health_check)
+        self.app.router.add_get("/metrics", self.metrics_endpoint)
+        self.app.router.add_post(self.path, self.discord_webhook)
+        self.app.router.add_get("/", self.index)
+
+    def attach(self, engine: "GameEngine") -> None:
+        """Give handlers access to the running game engine."""
+        self.engine = engine
+        self.metrics.register(engine_metrics(engine))
+
+    async def health_check(self, request: web.Request) -> web.Response:
+        """Health check endpoint."""
+        return web.json_response({
+            "status": "ok",
+            "service": "discord-bot",
+            "engine": "running" if self.engine is not None and self.engine.running else "starting",
+            "loop_lag_max_ms": round(self.loop_lag.max_lag * 1000, 2),
+        })
+
+    async def metrics_endpoint(self, request: web.Request) -> web.Response:
+        """Prometheus scrape endpoint."""
+        return web.Response(
+            body=self.metrics.render().encode("utf-8"),
+            headers={"Content-Type": CONTENT_TYPE},
+        )
+
+    async def discord_webhook(self, request: web.Request) -> web.Response:
+        """Handle Discord webhook events."""
+        if self.interactions is not None:
+            return await self._interaction(request)
+        # Without an interaction handler (no public key configured) the
+        # endpoint only checks that the body is JSON and acknowledges it.
+        try:
+            await request.json()
+            return web.json_response({"status": "received"})
+        except ValueError:
+            return web.json_response({"error": "invalid JSON"}, status=400)
+        except Exception as error:
+            LOGGER.error("Webhook error: %s", error, exc_info=True)
+            return web.json_response({"error": "Internal error"}, status=500)
+
+    async def _interaction(self, request: web.Request) -> web.Response:
+        assert self.interactions is not None
+        body = await request.read()
+        signature = request.headers.get("X-Signature-Ed25519", "")
+        timestamp = request.headers.get("X-Signature-Timestamp", "")
+        if not self.interactions.verify(signature, timestamp, body):
+            return web.json_response({"error": "invalid request signature"}, status=401)
+        try:
+            interaction = json.loads(body)
+        except ValueError:
+            return web.json_response({"error": "invalid JSON"}, status=400)
+        if interaction.get("type") != PING and (self.engine is None or not self.engine.running):
+            return web.json_response({"error": "bot is starting"}, status=503)
+        return web.json_response(await self.interactions.handle(self.engine, interaction))
+
+    async def index(self, request: web.Request) -> web.Response:
+        """Root endpoint."""
+        return web.json_response({
+            "service": "Discord Game Bot",
+            "status": "running",
+            "health": "/health",
+            "webhook": self.path,
+        })
+
+    async def start(self) -> None:
+        """Start listening on the running event loop."""
         LOGGER.info("Starting webhook server on port %d", self.port)
-        self.app.run(host="0.0.0.0", port=self.port, debug=False)
-
-    def run_threaded(self) -> Thread:
-        """Run server in background thread."""
-        thread = Thread(target=self.run, daemon=True)
-        thread.start()
-        LOGGER.info("Webhook server started in background")
-        return thread
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.request_log.start()
+        self.loop_lag.start()
+
+    async def stop(self) -> None:
+        if self.interactions is not None:
+            await self.interactions.close()
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+        await self.request_log.close()
+        await self.loop_lag.close()
@@ -7,12 +7,16 @@ import logging
 import os
 import sys
 
-from openai import OpenAI
+import httpx
+from openai import AsyncOpenAI
 
 # Import bot modules
 from bot.config import BotConfig, ConfigError, load_config
 from bot.discord_bot import run_bot
-from bot.games import LanguageOracle
+from bot.interactions import InteractionHandler
+from bot.oracle import LanguageOracle
+from bot.request_log import RequestLog, install_queue_logging
+from bot.resilience import ResiliencePolicy
 from bot.webhook_server import WebhookServer
 
 # Setup logging
@@ -31,12 +35,42 @@ def build_language_oracle() -> LanguageOracle | None:
         LOGGER.info("AI_GATEWAY_API_KEY not set, AI games will be disabled")
         return None
 
-    client = OpenAI(
+    max_concurrency = int(os.getenv("AI_MAX_CONCURRENCY", "32"))
+    timeout = float(os.getenv("AI_TIMEOUT", "30"))
+    # One pooled client for every game: connections to the gateway are
+    # reused across requests instead of re-handshaking TLS each time.
+    http_client = httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=max_concurrency,
+            max_keepalive_connections=max_concurrency,
+            keepalive_expiry=30.0,
+        ),
+        timeout=httpx.Timeout(timeout, connect=5.0),
+    )
+    client = AsyncOpenAI(
         api_key=api_key,
         base_url="https://ai-gateway.vercel.sh/v1",
+        http_client=http_client,
+        # Retries are handled by the oracle's resilience policy.
+        max_retries=0,
+    )
+    resilience = ResiliencePolicy(
+        deadline=float(os.getenv("AI_DEADLINE", "20")),
+        max_retries=int(os.getenv("AI_MAX_RETRIES", "2")),
+        hedge_percentile=float(os.getenv("AI_HEDGE_PERCENTILE", "95")) / 100,
+        breaker_threshold=float(os.getenv("AI_BREAKER_THRESHOLD", "0.5")),
+        breaker_reset=float(os.getenv("AI_BREAKER_RESET", "30")),
+    )
+    LOGGER.info("AI Gateway configured for word games (max %d concurrent)", max_concurrency)
+    return LanguageOracle(
+        client,
+        max_concurrency=max_concurrency,
+        timeout=timeout,
+        cache_ttl=float(os.getenv("AI_CACHE_TTL", "300")),
+        cache_size=int(os.getenv("AI_CACHE_SIZE", "256")),
+        cache_variants=int(os.getenv("AI_CACHE_VARIANTS", "3")),
+        resilience=resilience,
     )
-    LOGGER.info("AI Gateway configured for word games")
-    return LanguageOracle(client)
 
 
 async def main_async() -> None:
@@ -51,9 +85,26 @@ async def main_async() -> None:
         LOGGER.error("❌ Configuration error: %s", error)
         sys.exit(1)
 
-    # Start webhook server in background
-    webhook_server = WebhookServer(port=config.webhook_port, path=config.webhook_path)
-    webhook_thread = webhook_server.run_threaded()
+    # Start webhook server on this event loop
+    interactions = None
+    if config.discord_public_key:
+        interactions = InteractionHandler(
+            config.discord_public_key,
+            edit_interval=config.stream_edit_interval,
+        )
+        LOGGER.info("✅ Slash commands enabled on %s", config.webhook_path)
+    request_log = RequestLog(
+        sample_rate=config.request_log_sample_rate,
+        excerpt_bytes=config.request_log_excerpt_bytes,
+        report_interval=config.request_stats_interval,
+    )
+    webhook_server = WebhookServer(
+        port=config.webhook_port,
+        path=config.webhook_path,
+        interactions=interactions,
+        request_log=request_log,
+    )
+    await webhook_server.start()
     LOGGER.info("✅ Webhook server started on port %d", config.webhook_port)
 
     # Build language oracle for AI games
@@ -62,14 +113,19 @@ async def main_async() -> None:
     # Run Discord bot
     LOGGER.info("🤖 Starting Discord bot...")
     try:
-        await run_bot(config, language_oracle)
+        await run_bot(config, language_oracle, webhook_server)
     except Exception as error:
         LOGGER.error("❌ Bot crashed: %s", error, exc_info=True)
         sys.exit(1)
+    finally:
+        await webhook_server.stop()
+        if language_oracle is not None:
+            await language_oracle.close()
 
 
 def main() -> None:
     """Main synchronous entry point."""
+    log_listener = install_queue_logging()
     try:
         # Check Python version
         if sys.version_info < (3, 11):
@@ -82,6 +138,8 @@ def main() -> None:
     except Exception as error:
         LOGGER.error("💥 Fatal error: %s", error, exc_info=True)
         sys.exit(1)
+    finally:
+        log_listener.stop()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,35 @@
+import argparse
+import asyncio
+
+from bench import game_load
+
+
+def load_args(**overrides):
+    options = dict(
+        users=50,
+        concurrency=8,
+        commands=400,
+        mix="dice=1,slots=1,work=1",
+        ai_latency=0.0,
+        ai_jitter=0.0,
+        data_path=None,
+        preload=True,
+        flush_interval=0.01,
+        flush_threshold=10,
+        cache_size=1000,
+        seed=3,
+        output=None,
+        think_time=0.0,
+    )
+    options.update(overrides)
+    return argparse.Namespace(**options)
+
+
+def test_game_load_interleaves_workers_and_flushes(tmp_path):
+    report = asyncio.run(game_load.run(load_args(), f"journal:///{tmp_path / 'users.json'}"))
+    commands = report["commands"]
+    assert sum(row["count"] for row in commands.values()) == 400
+    assert sum(row["errors"] for row in commands.values()) == 0
+    assert commands["work"]["rejected"] > 0  # players hit their cooldown
+    assert report["store"]["writes"] > 1  # the flusher ran during the run
+    assert report["store"]["bytes_on_disk"] > 0
@@ -0,0 +1,72 @@
+import asyncio
+
+from bot.content_pool import ContentPool
+
+
+def counter(prefix):
+    count = 0
+
+    async def generate():
+        nonlocal count
+        count += 1
+        return f"{prefix}{count}"
+
+    return generate
+
+
+async def settle(pool, key, size):
+    for _ in range(100):
+        if pool.sizes()[key] >= size:
+            return
+        await asyncio.sleep(0)
+
+
+def test_get_is_served_from_the_prefetched_pool():
+    async def scenario():
+        pool = ContentPool(capacity=3, low_water=2)
+        pool.register("king", counter("k"))
+        pool.start()
+        await settle(pool, "king", 3)
+        taken = [await pool.get("king"), await pool.get("king")]
+        await settle(pool, "king", 3)  # dropped below low water, topped up
+        size = pool.sizes()["king"]
+        await pool.close()
+        return taken, size, pool.stats
+
+    taken, size, stats = asyncio.run(scenario())
+    assert taken == ["k1", "k2"]
+    assert size == 3
+    assert (stats.hits, stats.misses) == (2, 0)
+
+
+def test_empty_pool_generates_on_demand():
+    async def scenario():
+        pool = ContentPool(capacity=2)
+        pool.register("king", counter("pooled"), on_demand=counter("inline"))
+        value = await pool.get("king")  # before start(): nothing prefetched
+        await pool.close()
+        return value, pool.stats.misses
+
+    assert asyncio.run(scenario()) == ("inline1", 1)
+
+
+def test_unused_entries_survive_a_restart(tmp_path):
+    path = str(tmp_path / "pool.json")
+
+    async def first_run():
+        pool = ContentPool(path, capacity=2)
+        pool.register("king", counter("k"))
+        pool.start()
+        await settle(pool, "king", 2)
+        await pool.close()
+
+    async def second_run():
+        pool = ContentPool(path, capacity=2)
+        pool.register("king", counter("fresh"))
+        pool.start()
+        value = pool.take("king")
+        await pool.close()
+        return value
+
+    asyncio.run(first_run())
+    assert asyncio.run(second_run()) == "k1"
@@ -0,0 +1,57 @@
+import asyncio
+
+import pytest
+
+from bot.cooldowns import CooldownTracker
+from bot.games import GameEngine, GameError
+from bot.storage import UserState, UserStore
+
+
+@pytest.mark.parametrize("scheme", ["json", "sqlite"])
+def test_work_cooldown_survives_a_restart(scheme, tmp_path):
+    url = str(tmp_path / "users.json") if scheme == "json" else f"sqlite:///{tmp_path / 'users.db'}"
+
+    async def session(play):
+        store = UserStore(url, flush_interval=0)
+        await store.load()
+        engine = GameEngine(store)
+        engine.start()
+        try:
+            return await play(engine)
+        finally:
+            await engine.close()
+            await store.close()
+
+    async def scenario():
+        await session(lambda engine: engine.play("work", 1))
+        with pytest.raises(GameError):
+            await session(lambda engine: engine.play("work", 1))
+
+    asyncio.run(scenario())
+
+
+def test_expired_cooldowns_are_popped_in_order():
+    tracker = CooldownTracker()
+    first, second = UserState(), UserState()
+    tracker.start(1, first, "work", 10, now=100)
+    tracker.start(2, second, "work", 5, now=100)
+    assert tracker.remaining(first, "work", now=104) == 6
+    assert list(tracker.pop_expired(now=105)) == [(2, "work", 105)]
+    assert list(tracker.pop_expired(now=110)) == [(1, "work", 110)]
+    assert len(tracker) == 0
+
+
+def test_prune_drops_expired_cooldowns_from_cached_players(tmp_path):
+    async def scenario():
+        store = UserStore(str(tmp_path / "users.json"), flush_interval=0)
+        await store.load()
+        engine = GameEngine(store)
+        await engine.play("work", 1)
+        expires = (await store.get(1)).cooldowns["work"]
+        assert engine.prune_cooldowns(now=expires - 1) == 0
+        pruned = engine.prune_cooldowns(now=expires)
+        state = await store.get(1)
+        await store.close()
+        return pruned, state.cooldowns
+
+    assert asyncio.run(scenario()) == (1, None)
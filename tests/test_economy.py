@@ -0,0 +1,61 @@
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from bench import economy  # noqa: E402
+from bot.games.tables import DICE, SLOTS, WORK_PAY  # noqa: E402
+
+PLAYS = 200_000
+
+
+def mean(bounds):
+    return (bounds[0] + bounds[1]) / 2
+
+
+def test_dice_and_slots_match_their_exact_expected_value():
+    rng = np.random.default_rng(1)
+    win = (DICE.sides - DICE.win_from + 1) / DICE.sides
+    dice_ev = win * mean(DICE.win) - (1 - win) * mean(DICE.loss)
+
+    icons = len(SLOTS.icons)
+    combos = icons ** 3
+    distinct = icons * (icons - 1) * (icons - 2)
+    pairs = combos - distinct - icons
+    slots_ev = (
+        SLOTS.jackpot + (icons - 1) * SLOTS.triple + pairs * mean(SLOTS.pair) - distinct * mean(SLOTS.loss)
+    ) / combos
+
+    for sampler, expected in ((economy.sample_dice, dice_ev), (economy.sample_slots, slots_ev)):
+        summary = economy.summarize(sampler(rng, PLAYS))
+        assert abs(summary["mean"] - expected) < 4 * (summary["variance"] / PLAYS) ** 0.5
+
+
+def test_samples_stay_within_the_table_ranges():
+    rng = np.random.default_rng(2)
+    work = economy.sample_work(rng, 10_000)
+    assert work.min() >= WORK_PAY[0] and work.max() <= WORK_PAY[1]
+    dice = economy.sample_dice(rng, 10_000)
+    assert dice.max() <= DICE.win[1] and dice.min() >= -DICE.loss[1]
+    assert 0 not in set(dice.tolist())
+
+
+def test_population_run_caps_work_and_daily():
+    rng = np.random.default_rng(3)
+    report = economy.simulate_population(rng, players=100, hours=48, rate=100.0, mix={"work": 1, "daily": 1})
+    by_game = report["coins_per_hour_by_game"]
+    work_cap = 3600 // economy.COOLDOWN_SECONDS
+    assert by_game["work"] <= 100 * work_cap * WORK_PAY[1]
+    assert by_game["daily"] > 0
+    assert report["money_supply"] == round(report["coins_per_hour"] * 48)
+
+
+def test_simulated_means_agree_with_the_live_games():
+    random.seed(4)
+    simulated = {
+        name: economy.summarize(economy.SAMPLERS[name](np.random.default_rng(5), PLAYS))
+        for name in economy.PER_PLAY_GAMES
+    }
+    results = economy.verify(simulated, plays=300)
+    assert all(result["ok"] for result in results.values()), results
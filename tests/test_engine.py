@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+from bot.games import GameEngine
+from bot.storage import UserStore
+
+
+def test_transaction_keeps_concurrent_writes_to_other_fields(tmp_path):
+    async def scenario():
+        store = UserStore(str(tmp_path / "users.json"), flush_interval=0)
+        await store.load()
+        await store.update(1, coins=100)
+        engine = GameEngine(store)
+
+        async with engine.transaction(1) as state:
+            state.streak += 1
+            await asyncio.sleep(0)
+            # e.g. an admin grant that does not take the player's lock
+            await store.increment(1, "coins", 50)
+
+        result = await store.get(1)
+        await store.close()
+        return result.coins, result.streak
+
+    assert asyncio.run(scenario()) == (150, 1)
+
+
+def test_failed_transaction_writes_nothing(tmp_path):
+    async def scenario():
+        store = UserStore(str(tmp_path / "users.json"), flush_interval=0)
+        await store.load()
+        engine = GameEngine(store)
+        try:
+            async with engine.transaction(1) as state:
+                state.coins = 999
+                raise ValueError
+        except ValueError:
+            pass
+        result = await store.get(1)
+        await store.close()
+        return result.coins
+
+    assert asyncio.run(scenario()) == 0
+
+
+@pytest.mark.parametrize("url", ["json:///{}/users.json?lazy=1", "sqlite:///{}/users.db"])
+def test_leaderboard_ranks_persisted_players_after_restart(url, tmp_path):
+    url = url.format(tmp_path)
+
+    async def scenario():
+        store = UserStore(url, flush_interval=0)
+        await store.load()
+        for user_id, coins in ((1, 50), (2, 80), (3, 20)):
+            await store.update(user_id, coins=coins)
+        await store.close()
+
+        store = UserStore(url, flush_interval=0)
+        await store.load()
+        engine = GameEngine(store)
+        engine.start()
+        # Player 3 plays before seeding finishes; the newer balance wins.
+        await store.update(3, coins=90)
+        await engine._seeding
+        result = engine.leaderboard.top(3), engine.leaderboard.rank(1)
+        await engine.close()
+        await store.close()
+        return result
+
+    assert asyncio.run(scenario()) == ([(3, 90), (2, 80), (1, 50)], 3)
@@ -0,0 +1,94 @@
+import os
+import random
+
+from bot import indexed_json
+from bot.indexed_json import IndexedJsonBackend
+from bot.storage import JsonFileBackend, UserState
+
+
+def random_state(rng):
+    cooldowns = {"work": rng.randint(10**9, 2 * 10**9)} if rng.random() < 0.3 else None
+    return UserState(coins=rng.randint(0, 10 ** rng.randint(1, 9)), streak=rng.randint(0, 40), cooldowns=cooldowns)
+
+
+def read_all(backend, ids):
+    return {user_id: backend.fetch(user_id) for user_id in ids}
+
+
+def test_flushes_patch_append_and_survive_reopen(tmp_path, monkeypatch):
+    monkeypatch.setattr(indexed_json, "COMPACT_MIN_TAIL", 20)
+    path = str(tmp_path / "users.json")
+    rng = random.Random(3)
+    expected = {user_id: random_state(rng) for user_id in range(100)}
+
+    backend = IndexedJsonBackend(path)
+    backend.open()
+    backend.write_snapshot(expected)
+    for _ in range(30):
+        changed = {rng.randrange(130): random_state(rng) for _ in range(5)}
+        expected.update(changed)
+        backend.write_changes(changed, {user_id: {"coins"} for user_id in changed})
+        assert backend.count() == len(expected)
+        assert read_all(backend, expected) == expected
+    backend.close()
+
+    reopened = IndexedJsonBackend(path)
+    reopened.open()
+    assert reopened.count() == len(expected)
+    assert read_all(reopened, expected) == expected
+    assert reopened.fetch(10_000) is None
+    reopened.close()
+
+    # The data file stays plain JSON for the eager backend, later keys winning.
+    assert JsonFileBackend(path).read_all() == expected
+
+    # A lost index is rebuilt from the data file alone.
+    os.remove(f"{path}.idx")
+    rebuilt = IndexedJsonBackend(path)
+    rebuilt.open()
+    assert read_all(rebuilt, expected) == expected
+    rebuilt.close()
+
+
+def test_small_flush_does_not_rewrite_the_file(tmp_path):
+    path = str(tmp_path / "users.json")
+    users = {user_id: UserState(coins=user_id) for user_id in range(5000)}
+    backend = IndexedJsonBackend(path)
+    backend.open()
+    backend.write_snapshot(users)
+    inode = os.stat(path).st_ino
+    written = backend.bytes_written
+
+    backend.write_changes({7: UserState(coins=8)}, {7: {"coins"}})
+    backend.write_changes(
+        {8: UserState(coins=10**12, cooldowns={"work": 2 * 10**9}), 9000: UserState(coins=1)},
+        {8: {"coins", "cooldowns"}, 9000: {"coins"}},
+    )
+
+    assert os.stat(path).st_ino == inode
+    assert backend.bytes_written - written < 500
+    assert backend.fetch(7) == UserState(coins=8)
+    assert backend.fetch(8).coins == 10**12
+    assert backend.fetch(9000) == UserState(coins=1)
+    assert backend.count() == 5001
+    backend.close()
+
+
+def test_appends_to_an_empty_object(tmp_path):
+    path = str(tmp_path / "users.json")
+    JsonFileBackend(path).write_snapshot({})
+
+    backend = IndexedJsonBackend(path)
+    backend.open()
+    assert backend.count() == 0
+    backend.write_changes({1: UserState(coins=1), 2: UserState(coins=2)}, {1: {"coins"}, 2: {"coins"}})
+    backend.write_changes({3: UserState(coins=3)}, {3: {"coins"}})
+    backend.close()
+
+    expected = {user_id: UserState(coins=user_id) for user_id in (1, 2, 3)}
+    assert JsonFileBackend(path).read_all() == expected
+    os.remove(f"{path}.idx")
+    rebuilt = IndexedJsonBackend(path)
+    rebuilt.open()
+    assert read_all(rebuilt, expected) == expected
+    rebuilt.close()
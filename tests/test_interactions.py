@@ -0,0 +1,97 @@
+import asyncio
+import time
+
+import pytest
+
+nacl_signing = pytest.importorskip("nacl.signing")
+
+from bot.games import GameError  # noqa: E402
+from bot.interactions import (  # noqa: E402
+    DEFERRED_CHANNEL_MESSAGE_WITH_SOURCE,
+    EPHEMERAL,
+    MAX_TIMESTAMP_AGE,
+    InteractionHandler,
+)
+
+BODY = b'{"type":1}'
+
+
+@pytest.fixture
+def signing_key():
+    return nacl_signing.SigningKey.generate()
+
+
+@pytest.fixture
+def handler(signing_key):
+    return InteractionHandler(signing_key.verify_key.encode().hex(), ack_timeout=0.01)
+
+
+def sign(signing_key, timestamp, body=BODY):
+    return signing_key.sign(timestamp.encode("utf-8") + body).signature.hex()
+
+
+def test_verify_accepts_a_fresh_signature(handler, signing_key):
+    timestamp = str(int(time.time()))
+    assert handler.verify(sign(signing_key, timestamp), timestamp, BODY)
+
+
+def test_verify_rejects_a_forged_or_altered_request(handler, signing_key):
+    timestamp = str(int(time.time()))
+    signature = sign(signing_key, timestamp)
+    assert not handler.verify(signature, timestamp, b'{"type":2}')
+    assert not handler.verify(sign(nacl_signing.SigningKey.generate(), timestamp), timestamp, BODY)
+    assert not handler.verify("not hex", timestamp, BODY)
+    assert not handler.verify("", timestamp, BODY)
+
+
+def test_verify_rejects_stale_or_malformed_timestamps(handler, signing_key):
+    stale = str(int(time.time() - MAX_TIMESTAMP_AGE - 5))
+    assert not handler.verify(sign(signing_key, stale), stale, BODY)
+    assert not handler.verify(sign(signing_key, "soon"), "soon", BODY)
+
+
+class SlowFailingEngine:
+    async def play(self, name, user_id, on_text=None):
+        await asyncio.sleep(0.05)
+        raise GameError("Bạn cần đợi thêm 10 giây.")
+
+
+def test_deferred_error_reply_stays_ephemeral(handler):
+    calls = []
+
+    async def request(method, url, payload=None):
+        calls.append((method, url.rsplit("/", 1)[-1], payload))
+
+    handler._request = request
+    interaction = {
+        "type": 2,
+        "data": {"name": "work"},
+        "user": {"id": "42"},
+        "token": "tok",
+        "application_id": "app",
+    }
+
+    async def scenario():
+        response = await handler.handle(SlowFailingEngine(), interaction)
+        await asyncio.gather(*handler._tasks)
+        await handler.close()
+        return response
+
+    assert asyncio.run(scenario()) == {"type": DEFERRED_CHANNEL_MESSAGE_WITH_SOURCE}
+    assert [(method, target) for method, target, _ in calls] == [("DELETE", "@original"), ("POST", "tok")]
+    assert calls[1][2]["flags"] == EPHEMERAL
+
+
+def test_failed_follow_up_is_logged(handler, caplog):
+    async def broken():
+        raise RuntimeError("boom")
+
+    async def scenario():
+        handler._spawn(broken())
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        await handler.close()
+
+    asyncio.run(scenario())
+    assert "Interaction follow-up failed" in caplog.text
+    assert not handler._tasks
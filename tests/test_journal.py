@@ -0,0 +1,56 @@
+from bot.journal import JournalBackend
+from bot.storage import UserState
+
+
+def write(backend, users):
+    backend.write_changes(users, {user_id: {"coins", "streak", "cooldowns"} for user_id in users})
+
+
+def test_replay_restores_changes_since_the_snapshot(tmp_path):
+    path = str(tmp_path / "users.json")
+    backend = JournalBackend(path, snapshot_every=1000)
+    backend.read_all()
+    backend.write_snapshot({1: UserState(coins=10)})
+    write(backend, {1: UserState(coins=20, streak=2), 2: UserState(coins=5, cooldowns={"work": 2 * 10**9})})
+    write(backend, {1: UserState(coins=30, streak=2)})
+    backend.close()
+
+    assert JournalBackend(path).read_all() == {
+        1: UserState(coins=30, streak=2),
+        2: UserState(coins=5, cooldowns={"work": 2 * 10**9}),
+    }
+
+
+def test_torn_record_is_skipped_and_not_glued_to_the_next(tmp_path):
+    path = str(tmp_path / "users.json")
+    backend = JournalBackend(path)
+    backend.read_all()
+    write(backend, {1: UserState(coins=7)})
+    backend.close()
+    with open(f"{path}.journal", "a", encoding="utf-8") as handle:
+        handle.write('[1700000000,1,"coins",99')  # crash mid-write
+
+    reopened = JournalBackend(path)
+    assert reopened.read_all()[1].coins == 7
+    write(reopened, {2: UserState(coins=3)})
+    reopened.close()
+
+    users = JournalBackend(path).read_all()
+    assert (users[1].coins, users[2].coins) == (7, 3)
+
+
+def test_snapshot_truncates_the_journal(tmp_path):
+    path = str(tmp_path / "users.json")
+    backend = JournalBackend(path, snapshot_every=4)
+    backend.read_all()
+    users = {user_id: UserState(coins=user_id) for user_id in range(3)}
+    write(backend, users)  # nine records, past snapshot_every
+    assert backend.needs_all_users()
+    users[0] = UserState(coins=100)
+    write(backend, users)  # the next flush compacts
+    assert not backend.needs_all_users()
+    backend.close()
+
+    with open(f"{path}.journal", encoding="utf-8") as handle:
+        assert handle.read() == ""
+    assert JournalBackend(path).read_all() == users
@@ -0,0 +1,59 @@
+import bisect
+import random
+
+from bot import leaderboard
+from bot.leaderboard import Leaderboard, RankedIndex
+
+
+def test_ranked_index_matches_a_sorted_list(monkeypatch):
+    monkeypatch.setattr(leaderboard, "_BUCKET", 4)  # force splits and emptied buckets
+    rng = random.Random(5)
+    initial = [rng.randrange(200) for _ in range(30)]
+    index = RankedIndex(initial)
+    expected = sorted(initial)
+    for _ in range(2000):
+        key = rng.randrange(200)
+        if rng.random() < 0.55:
+            index.add(key)
+            bisect.insort(expected, key)
+        else:
+            present = key in expected
+            assert index.remove(key) == present
+            if present:
+                expected.remove(key)
+        probe = rng.randrange(-1, 201)
+        assert index.rank(probe) == bisect.bisect_left(expected, probe)
+        assert len(index) == len(expected)
+    assert list(index) == expected
+    assert index.head(7) == expected[:7]
+
+
+def test_top_and_rank_follow_balance_changes():
+    board = Leaderboard()
+    for user_id, coins in ((1, 50), (2, 80), (3, 50), (4, 10)):
+        board.update(user_id, coins)
+    assert board.top(3) == [(2, 80), (1, 50), (3, 50)]  # ties by user id
+    assert [board.rank(user_id) for user_id in (1, 2, 3, 4)] == [2, 1, 3, 4]
+
+    board.update(4, 100)
+    assert board.top(1) == [(4, 100)]
+    assert board.rank(2) == 2
+    assert board.rank(99) is None
+
+
+def test_guild_rankings():
+    board = Leaderboard()
+    board.add_member(7, 1)
+    for user_id, coins in ((1, 5), (2, 9), (3, 7)):
+        board.update(user_id, coins)
+    board.add_member(7, 3)
+    assert board.top(guild_id=7) == [(3, 7), (1, 5)]
+    assert board.rank(1, guild_id=7) == 2
+    assert board.rank(2, guild_id=7) is None
+
+    board.update(1, 20)
+    assert board.rank(1, guild_id=7) == 1
+    board.remove_member(7, 1)
+    assert board.top(guild_id=7) == [(3, 7)]
+    assert board.size(7) == 1
+    assert board.top(guild_id=8) == []
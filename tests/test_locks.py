@@ -0,0 +1,59 @@
+import asyncio
+
+import pytest
+
+from bot.locks import UserLockManager
+
+
+def test_entries_are_dropped_after_release():
+    async def scenario():
+        locks = UserLockManager()
+        async with locks.hold(1):
+            waiter = asyncio.ensure_future(locks.acquire(1))
+            await asyncio.sleep(0)
+            assert len(locks) == 1
+        await waiter
+        locks.release(1)
+        return len(locks), locks.stats
+
+    size, stats = asyncio.run(scenario())
+    assert size == 0
+    assert (stats.acquires, stats.contended) == (2, 1)
+
+
+def test_cancelled_waiter_is_dropped():
+    async def scenario():
+        locks = UserLockManager()
+        await locks.acquire(1)
+        waiter = asyncio.ensure_future(locks.acquire(1))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        locks.release(1)
+        return len(locks)
+
+    assert asyncio.run(scenario()) == 0
+
+
+def test_cancel_while_lock_looks_free_is_dropped():
+    async def scenario():
+        locks = UserLockManager()
+        await locks.acquire(1)
+        woken = asyncio.ensure_future(locks.acquire(1))
+        await asyncio.sleep(0)
+
+        async def late():
+            locks.release(1)  # wakes ``woken``, which has not run yet
+            await locks.acquire(1)  # the lock is free but must queue behind it
+
+        task = asyncio.ensure_future(late())
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await woken
+        locks.release(1)
+        return len(locks)
+
+    assert asyncio.run(scenario()) == 0
@@ -0,0 +1,69 @@
+import asyncio
+
+from aiohttp.test_utils import TestClient, TestServer
+
+from bot.games import GameEngine
+from bot.metrics import LatencyHistogram, MetricsRegistry, counter, engine_metrics, histogram
+from bot.storage import UserStore
+from bot.webhook_server import WebhookServer
+
+
+def test_histogram_quantiles_and_windows():
+    latency = LatencyHistogram(bounds=(0.01, 0.1, 1.0))
+    for seconds in (0.005, 0.005, 0.05, 0.5, 5.0):
+        latency.observe(seconds)
+    assert latency.counts == [2, 1, 1, 1]
+    assert latency.quantile(0.4) == 0.01
+    assert latency.quantile(0.6) == 0.1
+    assert latency.quantile(1.0) == float("inf")
+
+    earlier = latency.copy()
+    latency.observe(0.05)
+    window = latency.since(earlier)
+    assert (window.count, window.counts) == (1, [0, 1, 0, 0])
+
+
+def test_render_is_prometheus_text():
+    latency = LatencyHistogram(bounds=(0.1, 1.0))
+    latency.observe(0.05)
+    latency.observe(2.0)
+    registry = MetricsRegistry()
+    registry.register(lambda: [
+        counter("plays_total", "Plays.", 3, game='say "hi"'),
+        histogram("duration_seconds", "Durations.", latency, game="dice"),
+    ])
+    assert registry.render().splitlines() == [
+        "# HELP bot_plays_total Plays.",
+        "# TYPE bot_plays_total counter",
+        'bot_plays_total{game="say \\"hi\\""} 3',
+        "# HELP bot_duration_seconds Durations.",
+        "# TYPE bot_duration_seconds histogram",
+        'bot_duration_seconds_bucket{game="dice",le="0.1"} 1',
+        'bot_duration_seconds_bucket{game="dice",le="1.0"} 1',
+        'bot_duration_seconds_bucket{game="dice",le="+Inf"} 2',
+        'bot_duration_seconds_sum{game="dice"} 2.05',
+        'bot_duration_seconds_count{game="dice"} 2',
+    ]
+
+
+def test_metrics_endpoint_reports_engine_and_requests(tmp_path):
+    async def scenario():
+        store = UserStore(str(tmp_path / "users.json"), flush_interval=0)
+        await store.load()
+        engine = GameEngine(store)
+        await engine.play("dice", 1)
+        server = WebhookServer()
+        server.attach(engine)
+        async with TestClient(TestServer(server.app)) as client:
+            await client.get("/health")
+            response = await client.get("/metrics")
+            body = await response.text()
+            content_type = response.headers["Content-Type"]
+        await store.close()
+        return body, content_type
+
+    body, content_type = asyncio.run(scenario())
+    assert content_type.startswith("text/plain; version=0.0.4")
+    assert 'bot_game_duration_seconds_count{game="dice"} 1' in body
+    assert 'bot_http_request_duration_seconds_count{route="/health"} 1' in body
+    assert "bot_store_cached_users 1" in body
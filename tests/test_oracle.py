@@ -0,0 +1,140 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+from openai import AsyncOpenAI, OpenAI
+
+from bot.oracle import LanguageOracle
+from bot.resilience import ResiliencePolicy
+
+POLICY = ResiliencePolicy(max_retries=0, hedge_percentile=0)
+
+
+def completion(text):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text))])
+
+
+class Gateway:
+    """Counts requests and answers each one after ``delay`` seconds."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+
+    async def create(self, **request):
+        self.calls.append(request)
+        await asyncio.sleep(self.delay)
+        return completion(f"answer {len(self.calls)}")
+
+
+def async_oracle(gateway, **options):
+    client = AsyncOpenAI(api_key="test", base_url="http://127.0.0.1:9")
+    client.chat.completions.create = gateway.create
+    options.setdefault("resilience", POLICY)
+    return LanguageOracle(client, **options)
+
+
+def test_async_client_runs_on_the_event_loop():
+    gateway = Gateway()
+    oracle = async_oracle(gateway, cache_size=0, timeout=7.0)
+
+    async def scenario():
+        text = await oracle.word_chain("mặt trời")
+        await oracle.close()
+        return text
+
+    assert asyncio.run(scenario()) == "answer 1"
+    assert oracle._executor is None
+    request = gateway.calls[0]
+    assert request["timeout"] == 7.0
+    assert "mặt trời" in request["messages"][1]["content"]
+
+
+def test_sync_client_uses_a_private_executor():
+    client = OpenAI(api_key="test", base_url="http://127.0.0.1:9")
+    threads = []
+
+    def create(**_):
+        threads.append(threading.current_thread().name)
+        return completion("sync answer")
+
+    client.chat.completions.create = create
+    oracle = LanguageOracle(client, cache_size=0, resilience=POLICY)
+
+    async def scenario():
+        text = await oracle.vietnamese_king()
+        await oracle.close()
+        return text
+
+    assert asyncio.run(scenario()) == "sync answer"
+    assert threads[0].startswith("oracle")
+
+
+def test_identical_requests_share_one_completion():
+    gateway = Gateway(delay=0.05)
+    oracle = async_oracle(gateway, cache_variants=1)
+
+    async def scenario():
+        texts = await asyncio.gather(*(oracle.word_chain("hoa") for _ in range(5)))
+        await oracle.close()
+        return texts
+
+    assert asyncio.run(scenario()) == ["answer 1"] * 5
+    assert len(gateway.calls) == 1
+    stats = oracle.stats
+    assert (stats.misses, stats.coalesced) == (1, 4)
+
+
+def test_cache_collects_variants_then_serves_them():
+    gateway = Gateway()
+    oracle = async_oracle(gateway, cache_variants=2)
+
+    async def scenario():
+        texts = [await oracle.word_chain("hoa") for _ in range(6)]
+        await oracle.close()
+        return texts
+
+    texts = asyncio.run(scenario())
+    assert texts[:2] == ["answer 1", "answer 2"]
+    assert set(texts[2:]) <= {"answer 1", "answer 2"}
+    assert len(gateway.calls) == 2
+    assert oracle.stats.hits == 4
+
+
+def test_cache_expires_and_evicts(monkeypatch):
+    from bot import oracle as oracle_module
+
+    now = [1000.0]
+    monkeypatch.setattr(oracle_module.time, "monotonic", lambda: now[0])
+    gateway = Gateway()
+    oracle = async_oracle(gateway, cache_variants=1, cache_ttl=60, cache_size=1)
+
+    async def scenario():
+        await oracle.word_chain("hoa")
+        await oracle.word_chain("hoa")  # hit
+        now[0] += 61
+        await oracle.word_chain("hoa")  # expired
+        await oracle.word_chain("mây")  # evicts "hoa"
+        await oracle.word_chain("hoa")
+        await oracle.close()
+
+    asyncio.run(scenario())
+    assert len(gateway.calls) == 4
+    assert oracle.stats.evictions >= 1
+
+
+def test_cancelled_caller_does_not_cancel_the_shared_completion():
+    gateway = Gateway(delay=0.05)
+    oracle = async_oracle(gateway, cache_variants=1)
+
+    async def scenario():
+        first = asyncio.ensure_future(oracle.word_chain("hoa"))
+        second = asyncio.ensure_future(oracle.word_chain("hoa"))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        text = await second
+        await oracle.close()
+        return text
+
+    assert asyncio.run(scenario()) == "answer 1"
+    assert len(gateway.calls) == 1
@@ -0,0 +1,64 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from bot.discord_bot import help_command
+from bot.games import CATEGORIES, GAMES, GameSpec
+from bot.games.registry import register_game
+from bot.interactions import BALANCE_COMMAND, register_commands
+
+
+def test_help_text_includes_the_cooldown():
+    assert GameSpec("a", object, "Làm").help_text == "Làm"
+    assert GameSpec("a", object, "Làm", cooldown=20 * 60).help_text == "Làm (20 phút hồi)"
+    assert GameSpec("a", object, "Làm", cooldown=24 * 3600).help_text == "Làm (24 giờ hồi)"
+
+
+def test_register_rejects_duplicates_and_unknown_categories():
+    name = next(iter(GAMES))
+    with pytest.raises(ValueError):
+        register_game(GameSpec(name, object, "trùng"))
+    with pytest.raises(ValueError):
+        register_game(GameSpec("new-game", object, "mới", category="khác"))
+    assert "new-game" not in GAMES
+
+
+def test_help_lists_every_registered_game_by_category():
+    sent = []
+
+    async def send(**message):
+        sent.append(message["embed"])
+
+    ctx = SimpleNamespace(bot=SimpleNamespace(command_prefix="!"), send=send)
+    asyncio.run(help_command(ctx))
+
+    fields = {field.name: field.value for field in sent[0].fields}
+    for spec in GAMES.values():
+        assert f"`!{spec.name}` - {spec.help_text}" in fields[spec.category]
+    assert [name for name in fields if name in CATEGORIES] == [
+        category for category in CATEGORIES if any(spec.category == category for spec in GAMES.values())
+    ]
+
+
+def test_slash_commands_are_generated_from_the_registry():
+    received = []
+
+    async def commands(request):
+        received.append((request.match_info["application"], request.headers["Authorization"], await request.json()))
+        return web.json_response([])
+
+    async def scenario():
+        app = web.Application()
+        app.router.add_put("/applications/{application}/commands", commands)
+        async with TestServer(app) as server:
+            await register_commands(123, "secret", api_base=str(server.make_url("")).rstrip("/"))
+
+    asyncio.run(scenario())
+    application, authorization, payload = received[0]
+    assert (application, authorization) == ("123", "Bot secret")
+    expected = [{"name": spec.name, "description": spec.help_text, "type": 1} for spec in GAMES.values()]
+    expected.append({"name": BALANCE_COMMAND[0], "description": BALANCE_COMMAND[1], "type": 1})
+    assert payload == expected
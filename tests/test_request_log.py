@@ -0,0 +1,35 @@
+import asyncio
+import json
+import logging
+
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+
+from bot.request_log import RequestLog
+
+
+def test_sampled_excerpt_redacts_interaction_token(caplog):
+    request_log = RequestLog(sample_rate=1.0, excerpt_bytes=4096, report_interval=0)
+
+    async def echo(request):
+        await request.read()
+        return web.json_response({"type": 1})
+
+    async def scenario():
+        app = web.Application(middlewares=[request_log.middleware])
+        app.router.add_post("/interactions", echo)
+        async with TestClient(TestServer(app)) as client:
+            body = {"type": 2, "token": "secret-token", "data": {"name": "work", "options": [{"token": "x"}]}}
+            response = await client.post("/interactions", json=body)
+            assert response.status == 200
+
+    with caplog.at_level(logging.INFO, logger="bot.request_log"):
+        asyncio.run(scenario())
+
+    assert "secret-token" not in caplog.text
+    record = json.loads(caplog.records[-1].getMessage())
+    assert record["route"] == "/interactions"
+    excerpt = json.loads(record["excerpt"])
+    assert excerpt["token"] == "[redacted]"
+    assert excerpt["data"]["options"][0]["token"] == "[redacted]"
+    assert excerpt["data"]["name"] == "work"
@@ -0,0 +1,196 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from openai import AsyncOpenAI
+
+from bot import resilience
+from bot.oracle import LanguageOracle
+from bot.resilience import CircuitBreaker, CircuitOpenError, ResiliencePolicy
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(resilience.time, "monotonic", clock)
+    return clock
+
+
+def open_breaker(clock):
+    breaker = CircuitBreaker(threshold=0.5, window=4, min_calls=4, reset_timeout=10)
+    for _ in range(4):
+        assert breaker.allow()
+        breaker.record_failure()
+    return breaker
+
+
+def test_breaker_opens_at_threshold(clock):
+    breaker = CircuitBreaker(threshold=0.5, window=4, min_calls=4, reset_timeout=10)
+    for outcome in (True, False, True):
+        breaker.allow()
+        breaker.record_success() if outcome else breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+
+def test_half_open_probe_success_closes(clock):
+    breaker = open_breaker(clock)
+    clock.now += 10
+    assert breaker.state == "half-open"
+    assert breaker.allow()
+    assert breaker.probing
+    assert not breaker.allow()  # only one probe at a time
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow()
+
+
+def test_half_open_probe_failure_reopens(clock):
+    breaker = open_breaker(clock)
+    clock.now += 10
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    clock.now += 9
+    assert not breaker.allow()
+    clock.now += 1
+    assert breaker.allow()
+
+
+def test_released_probe_lets_the_next_call_probe(clock):
+    breaker = open_breaker(clock)
+    clock.now += 10
+    assert breaker.allow()
+    breaker.release()
+    assert not breaker.probing
+    assert breaker.allow()
+
+
+class Chunk:
+    def __init__(self, text):
+        self.choices = [SimpleNamespace(delta=SimpleNamespace(content=text))]
+
+
+class FakeStream:
+    def __init__(self, chunks, delay=0.0, fail_after=None):
+        self._chunks = list(chunks)
+        self._delay = delay
+        self._fail_after = fail_after
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self._fail_after is not None and self._fail_after == 0:
+            raise ConnectionError("reset")
+        if not self._chunks:
+            raise StopAsyncIteration
+        await asyncio.sleep(self._delay)
+        if self._fail_after is not None:
+            self._fail_after -= 1
+        return Chunk(self._chunks.pop(0))
+
+    async def close(self):
+        self.closed = True
+
+
+def make_oracle(streams, **policy):
+    client = AsyncOpenAI(api_key="test", base_url="http://127.0.0.1:9")
+    pending = list(streams)
+
+    async def create(**_):
+        stream = pending.pop(0)
+        if isinstance(stream, Exception):
+            raise stream
+        return stream
+
+    client.chat.completions.create = create
+    options = dict(deadline=1.0, backoff_base=0.0, breaker_min_calls=1, breaker_window=1, breaker_reset=0.0)
+    options.update(policy)
+    return LanguageOracle(client, cache_size=0, resilience=ResiliencePolicy(**options))
+
+
+async def collect(oracle):
+    return [chunk async for chunk in oracle.stream_vietnamese_king()]
+
+
+def test_stream_retries_before_first_chunk():
+    oracle = make_oracle([ConnectionError("reset"), FakeStream(["a", "b"])])
+    assert asyncio.run(collect(oracle)) == ["a", "b"]
+    assert oracle.stats.retries == 1
+
+
+def test_stream_deadline_covers_reading_chunks():
+    oracle = make_oracle([FakeStream(["a", "b", "c"], delay=0.2)], deadline=0.3, max_retries=0)
+
+    async def scenario():
+        parts = []
+        with pytest.raises(asyncio.TimeoutError):
+            async for chunk in oracle.stream_vietnamese_king():
+                parts.append(chunk)
+        return parts
+
+    assert asyncio.run(scenario()) == ["a"]
+    assert oracle.stats.failures == 1
+
+
+def test_abandoned_probe_stream_does_not_wedge_breaker():
+    slow = FakeStream(["a", "b"], delay=0.05)
+    oracle = make_oracle([ConnectionError("down"), slow, FakeStream(["ok"])], max_retries=0)
+
+    async def scenario():
+        with pytest.raises(ConnectionError):
+            await collect(oracle)
+        assert oracle._breaker.state == "half-open"
+        stream = oracle.stream_vietnamese_king()
+        assert await stream.__anext__() == "a"  # the probe
+        await stream.aclose()  # the caller gives up mid-stream
+        assert slow.closed
+        return await collect(oracle)
+
+    assert asyncio.run(scenario()) == ["ok"]
+
+
+def test_cancelled_probe_completion_releases_breaker():
+    async def hang(**_):
+        await asyncio.sleep(10)
+
+    oracle = make_oracle([ConnectionError("down")], max_retries=0, hedge_percentile=0)
+
+    async def scenario():
+        with pytest.raises(ConnectionError):
+            await oracle.vietnamese_king(cached=False)
+        oracle._client.chat.completions.create = hang
+        probe = asyncio.ensure_future(oracle.vietnamese_king(cached=False))
+        await asyncio.sleep(0.01)
+        assert oracle._breaker.probing
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+        return oracle._breaker.probing, oracle._breaker.allow()
+
+    assert asyncio.run(scenario()) == (False, True)
+
+
+def test_open_circuit_rejects_stream_without_cache():
+    oracle = make_oracle([ConnectionError("down")], max_retries=0, breaker_reset=60)
+
+    async def scenario():
+        with pytest.raises(ConnectionError):
+            await collect(oracle)
+        with pytest.raises(CircuitOpenError):
+            await collect(oracle)
+
+    asyncio.run(scenario())
+    assert oracle.stats.rejected == 1
@@ -0,0 +1,58 @@
+import io
+
+import pytest
+
+from bot.serialization import JsonCodec, detect_codec, get_codec
+from bot.storage import UserState, parse_data_url
+
+USERS = {
+    1: UserState(coins=10, streak=3, last_daily=1_700_000_000),
+    2: UserState(coins=0, cooldowns={"work": 2 * 10**9}),
+}
+
+
+def encode(codec, users=USERS):
+    handle = io.BytesIO()
+    codec.encode(users, handle)
+    return handle.getvalue()
+
+
+def test_json_round_trip():
+    codec = JsonCodec()
+    assert codec.decode(encode(codec)) == USERS
+    assert codec.decode(encode(codec, {})) == {}
+
+
+@pytest.mark.parametrize("raw", [b"", b"   ", b'{"1":{"coins":1}}', b'\n  {"1":{"coins":1}}'])
+def test_detects_json(raw):
+    assert isinstance(detect_codec(raw), JsonCodec)
+
+
+def test_rejects_unknown_format():
+    with pytest.raises(ValueError):
+        detect_codec(b"[1, 2, 3]")
+    with pytest.raises(ValueError):
+        get_codec("yaml")
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        ("data/users.json", ("json", "data/users.json", {})),
+        ("data/users.json?codec=orjson", ("json", "data/users.json", {"codec": "orjson"})),
+        ("json:///data/users.json?codec=orjson", ("json", "data/users.json", {"codec": "orjson"})),
+        ("journal:////app/users.json?codec=msgpack", ("journal", "/app/users.json", {"codec": "msgpack"})),
+    ],
+)
+def test_parse_data_url_reads_options(url, expected):
+    assert parse_data_url(url) == expected
+
+
+def test_detects_msgpack():
+    pytest.importorskip("msgpack")
+    codec = get_codec("msgpack")
+    raw = encode(codec)
+    detected = detect_codec(raw)
+    assert detected.name == "msgpack"
+    assert detected.decode(raw) == USERS
+    assert detect_codec(encode(codec, {})).name == "msgpack"
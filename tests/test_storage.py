@@ -0,0 +1,271 @@
+import asyncio
+
+import pytest
+
+from bot.storage import UserStore
+
+BACKENDS = ["json", "json-lazy", "journal", "sqlite"]
+
+
+def data_url(kind, tmp_path):
+    if kind == "json":
+        return str(tmp_path / "users.json")
+    if kind == "json-lazy":
+        return f"json:///{tmp_path / 'users.json'}?lazy=1"
+    if kind == "journal":
+        return f"journal:///{tmp_path / 'users.json'}"
+    return f"sqlite:///{tmp_path / 'users.db'}"
+
+
+def open_store(url, **options):
+    options.setdefault("flush_interval", 0)
+    return UserStore(url, **options)
+
+
+@pytest.mark.parametrize("kind", BACKENDS)
+def test_round_trip_with_small_cache(kind, tmp_path):
+    url = data_url(kind, tmp_path)
+
+    async def scenario():
+        store = open_store(url, cache_size=10, flush_threshold=10**6)
+        await store.load()
+        for user_id in range(1, 51):
+            await store.update(user_id, coins=user_id * 10, streak=user_id)
+        await store.close()
+
+        store = open_store(url, cache_size=10)
+        await store.load()
+        states = {user_id: await store.get(user_id) for user_id in range(1, 51)}
+        await store.close()
+        return states
+
+    states = asyncio.run(scenario())
+    assert {user_id: (state.coins, state.streak) for user_id, state in states.items()} == {
+        user_id: (user_id * 10, user_id) for user_id in range(1, 51)
+    }
+
+
+@pytest.mark.parametrize("kind", BACKENDS)
+def test_new_user_survives_full_dirty_cache(kind, tmp_path):
+    url = data_url(kind, tmp_path)
+
+    async def scenario():
+        store = open_store(url, cache_size=2, flush_threshold=10**6)
+        await store.load()
+        await store.update(1, coins=100)
+        await store.update(2, coins=200)
+        await store.update(3, coins=300)
+        await store.increment(3, "coins", 5)
+        await store.close()
+
+        store = open_store(url, cache_size=2)
+        await store.load()
+        coins = [(await store.get(user_id)).coins for user_id in (1, 2, 3)]
+        await store.close()
+        return coins
+
+    assert asyncio.run(scenario()) == [100, 200, 305]
+
+
+@pytest.mark.parametrize("kind", BACKENDS)
+def test_existing_user_read_back_under_pressure(kind, tmp_path):
+    url = data_url(kind, tmp_path)
+
+    async def scenario():
+        store = open_store(url)
+        await store.load()
+        await store.update(99, coins=500)
+        await store.close()
+
+        store = open_store(url, cache_size=1, flush_threshold=10**6)
+        await store.load()
+        await store.update(1, coins=1)
+        await store.update(2, coins=2)
+        before = (await store.get(99)).coins
+        await store.increment(99, "coins", 10)
+        await store.close()
+
+        store = open_store(url, cache_size=1)
+        await store.load()
+        after = (await store.get(99)).coins
+        await store.close()
+        return before, after
+
+    assert asyncio.run(scenario()) == (500, 510)
+
+
+@pytest.mark.parametrize("kind", ["json-lazy", "sqlite"])
+def test_pinned_user_is_not_evicted(kind, tmp_path):
+    url = data_url(kind, tmp_path)
+
+    async def scenario():
+        store = open_store(url, cache_size=2)
+        await store.load()
+        await store.update(7, coins=70)
+        await store.flush()
+        async with store.pinned(7):
+            for user_id in range(100, 110):
+                await store.get(user_id)
+            cached = 7 in dict(store.cached_items())
+        await store.close()
+        return cached
+
+    assert asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("kind", BACKENDS)
+def test_cache_shrinks_back_after_flush(kind, tmp_path):
+    url = data_url(kind, tmp_path)
+
+    async def scenario():
+        store = open_store(url, cache_size=5, flush_threshold=10**6)
+        await store.load()
+        for user_id in range(20):
+            await store.update(user_id, coins=user_id)
+        grown = store.cached_count
+        await store.flush()
+        await store.get(1000)
+        shrunk = store.cached_count
+        await store.close()
+        return grown, shrunk
+
+    grown, shrunk = asyncio.run(scenario())
+    if kind in ("json-lazy", "sqlite"):
+        assert grown > 5
+        assert shrunk <= 5
+
+
+class RecordingBackend:
+    lazy = False
+
+    def __init__(self, users):
+        self._users = users
+        self.sizes = []
+
+    def needs_all_users(self):
+        return False
+
+    def read_all(self):
+        return dict(self._users)
+
+    def write_changes(self, users, dirty):
+        self.sizes.append(len(users))
+
+    def write_snapshot(self, users):
+        self.sizes.append(len(users))
+
+    def close(self):
+        pass
+
+
+def test_flush_copies_only_dirty_users():
+    from bot.storage import UserState
+
+    backend = RecordingBackend({user_id: UserState(coins=user_id) for user_id in range(1000)})
+
+    async def scenario():
+        store = open_store(backend)
+        await store.load()
+        await store.update(1, coins=5)
+        await store.update(2, coins=5)
+        await store.flush()
+        await store.save()
+        await store.close()
+
+    asyncio.run(scenario())
+    assert backend.sizes == [2, 1000]
+
+
+def test_journal_compaction_keeps_clean_users(tmp_path):
+    url = f"journal:///{tmp_path / 'users.json'}?snapshot_every=3"
+
+    async def scenario():
+        store = open_store(url)
+        await store.load()
+        for user_id in range(1, 6):
+            await store.update(user_id, coins=user_id)
+        await store.flush()
+        for coins in (10, 20, 30):
+            await store.update(1, coins=coins)
+            await store.flush()
+        await store.close()
+
+        store = open_store(url)
+        await store.load()
+        coins = [(await store.get(user_id)).coins for user_id in range(1, 6)]
+        await store.close()
+        return coins
+
+    assert asyncio.run(scenario()) == [30, 2, 3, 4, 5]
+
+
+def test_mutations_are_coalesced_until_flush(tmp_path):
+    url = data_url("json", tmp_path)
+    path = tmp_path / "users.json"
+
+    async def scenario():
+        store = open_store(url, flush_threshold=10**6)
+        await store.load()
+        for amount in range(10):
+            await store.increment(1, "coins", amount)
+        await store.update(2, coins=7)
+        assert not path.exists()  # nothing written yet
+        await store.flush()
+        stats = store.stats
+        await store.close()
+        return stats
+
+    stats = asyncio.run(scenario())
+    assert (stats.marked, stats.flushes, stats.coalesced) == (11, 1, 10)
+    assert path.exists()
+
+
+def test_threshold_wakes_the_background_flusher(tmp_path):
+    url = data_url("journal", tmp_path)
+
+    async def scenario():
+        store = UserStore(url, flush_interval=60, flush_threshold=3)
+        await store.load()
+        for user_id in range(3):
+            await store.update(user_id, coins=1)
+        for _ in range(10):
+            await asyncio.sleep(0.01)
+            if store.stats.flushes:
+                break
+        flushes = store.stats.flushes
+        await store.close()
+        return flushes
+
+    assert asyncio.run(scenario()) == 1
+
+
+def test_close_flushes_pending_mutations(tmp_path):
+    url = data_url("json", tmp_path)
+
+    async def scenario():
+        store = UserStore(url, flush_interval=60, flush_threshold=10**6)
+        await store.load()
+        await store.update(5, coins=50, streak=2)
+        await store.close()
+
+        store = open_store(url)
+        await store.load()
+        state = await store.get(5)
+        await store.close()
+        return state.coins, state.streak
+
+    assert asyncio.run(scenario()) == (50, 2)
+
+
+def test_user_state_is_slotted_and_round_trips():
+    from bot.storage import UserState
+
+    state = UserState(coins=5, streak=2, last_daily=1_700_000_000, cooldowns={"work": 2 * 10**9})
+    assert not hasattr(state, "__dict__")
+    assert UserState.from_dict(state.to_dict()) == state
+    assert UserState.from_dict({"coins": "3"}) == UserState(coins=3)
+    assert "cooldowns" not in UserState(cooldowns={}).to_dict()
+
+    clone = state.copy()
+    clone.cooldowns["work"] = 1
+    assert state.cooldowns == {"work": 2 * 10**9}
@@ -0,0 +1,55 @@
+import asyncio
+
+from bot.streaming import StreamingMessage
+
+
+def test_updates_are_coalesced_into_one_edit_per_interval():
+    published = []
+
+    async def publish(text):
+        published.append(text)
+
+    async def scenario():
+        message = StreamingMessage(publish, interval=0.05)
+        for index in range(1, 21):
+            await message.update("x" * index)
+            await asyncio.sleep(0.005)
+        await asyncio.sleep(0.06)
+        await message.close()
+        return message.edits
+
+    edits = asyncio.run(scenario())
+    assert published[0] == "x"
+    assert published[-1] == "x" * 20
+    assert edits == len(published) < 10
+    assert published == sorted(published, key=len)
+
+
+def test_close_drops_pending_updates():
+    published = []
+
+    async def publish(text):
+        published.append(text)
+
+    async def scenario():
+        message = StreamingMessage(publish, interval=10)
+        await message.update("first")
+        await asyncio.sleep(0)
+        await message.update("second")  # would wait 10 s for its turn
+        await message.close()
+
+    asyncio.run(scenario())
+    assert published == ["first"]
+
+
+def test_close_survives_a_failed_edit():
+    async def publish(text):
+        raise ConnectionError("gone")
+
+    async def scenario():
+        message = StreamingMessage(publish)
+        await message.update("text")
+        await asyncio.sleep(0)
+        await message.close()
+
+    asyncio.run(scenario())
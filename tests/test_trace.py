@@ -0,0 +1,81 @@
+import argparse
+import asyncio
+import json
+
+from bench import replay
+from bot.games import GameEngine
+from bot.storage import UserStore
+from bot.trace import TRACE_VERSION, TraceRecord, TraceRecorder, read_trace
+
+
+def test_engine_commands_are_recorded_anonymized(tmp_path):
+    path = str(tmp_path / "trace.jsonl")
+
+    async def scenario():
+        store = UserStore(str(tmp_path / "users.json"), flush_interval=0)
+        await store.load()
+        recorder = TraceRecorder(path, salt="pepper")
+        recorder.start()
+        engine = GameEngine(store, trace=recorder)
+        await engine.play("work", 123456789)
+        try:
+            await engine.play("work", 123456789)
+        except Exception:
+            pass
+        await recorder.close()
+        await store.close()
+        return recorder
+
+    recorder = asyncio.run(scenario())
+    with open(path, encoding="utf-8") as handle:
+        assert json.loads(handle.readline())["version"] == TRACE_VERSION
+        assert "123456789" not in handle.read()
+
+    records = list(read_trace(path))
+    user = recorder.anonymize(123456789)
+    assert [(record.user, record.game, record.outcome) for record in records] == [
+        (user, "work", "ok"),
+        (user, "work", "rejected"),
+    ]
+    assert records[0].coins_delta > 0 and records[1].coins_delta == 0
+    assert user == TraceRecorder(path, salt="pepper").anonymize(123456789)
+    assert user != TraceRecorder(path, salt="salt").anonymize(123456789)
+    assert 0 <= user < 2**63
+
+
+def test_sessions_continue_offsets_and_skip_bad_lines(tmp_path):
+    path = tmp_path / "trace.jsonl"
+    path.write_text(
+        '{"version":1}\n[1.0,1,"dice","ok",5]\n[2.5,1,"dice","ok",-5]\n'
+        "not json\n"
+        '{"version":1}\n[0.5,2,"slots","ok",0]\n',
+        encoding="utf-8",
+    )
+    assert [record.offset for record in read_trace(str(path))] == [1.0, 2.5, 3.0]
+
+
+def replay_args(**overrides):
+    options = dict(
+        speed=0.0, concurrency=1, limit=None, seed=11, check_balances=True,
+        ai_latency=0.0, ai_jitter=0.0, data_path=None,
+        flush_interval=0.01, flush_threshold=10, cache_size=1000, output=None,
+    )
+    options.update(overrides)
+    return argparse.Namespace(**options)
+
+
+def test_sequential_replay_is_deterministic_and_persists_balances(tmp_path):
+    records = [
+        TraceRecord(index * 0.01, user, game, "ok", 0)
+        for index, (user, game) in enumerate(
+            (user, game) for user in range(1, 6) for game in ("work", "dice", "slots", "daily", "dice")
+        )
+    ]
+
+    def run(name):
+        return asyncio.run(replay.run(replay_args(), records, str(tmp_path / name)))
+
+    first, second = run("a.json"), run("b.json")
+    assert first["balances_digest"] == second["balances_digest"]
+    assert first["balance_mismatches"] == []
+    assert first["records"] == 25 and first["players"] == 5
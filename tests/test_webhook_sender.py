@@ -0,0 +1,73 @@
+import asyncio
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from bot.webhook_sender import WebhookSender
+
+
+def run_against(responses, deliver):
+    """Serve ``responses`` in turn to ``deliver(sender)`` and return the posted payloads."""
+    posted = []
+
+    async def hook(request):
+        posted.append(await request.json())
+        return responses.pop(0) if responses else web.Response(status=204)
+
+    async def scenario():
+        app = web.Application()
+        app.router.add_post("/hook", hook)
+        async with TestServer(app) as server:
+            sender = WebhookSender(str(server.make_url("/hook")), batch_window=0.01)
+            await deliver(sender)
+            await sender.close()
+            return sender.stats
+
+    return posted, asyncio.run(scenario())
+
+
+def test_rate_limited_post_is_retried_after_retry_after():
+    async def deliver(sender):
+        assert sender.send("thắng lớn")
+
+    posted, stats = run_against([web.json_response({"retry_after": 0.05}, status=429)], deliver)
+    assert [payload["content"] for payload in posted] == ["thắng lớn", "thắng lớn"]
+    assert (stats.rate_limited, stats.sent, stats.posts, stats.failed) == (1, 1, 1, 0)
+
+
+def test_queued_messages_are_batched_per_username():
+    async def deliver(sender):
+        sender.send("một")
+        sender.send("hai")
+        sender.send(embed={"title": "ba"})
+        sender.send("khác", username="Other")
+
+    posted, stats = run_against([], deliver)
+    assert posted == [
+        {"username": "Game Bot", "content": "một\nhai", "embeds": [{"title": "ba"}]},
+        {"username": "Other", "content": "khác"},
+    ]
+    assert (stats.sent, stats.posts) == (4, 2)
+
+
+def test_full_queue_drops_instead_of_waiting():
+    async def deliver(sender):
+        results = [sender.send(str(index)) for index in range(3)]
+        assert results == [True, True, False]
+
+    async def scenario():
+        sender = WebhookSender("http://127.0.0.1:9/hook", max_queue=2, batch_window=10)
+        await deliver(sender)
+        await sender.close(timeout=0)
+        return sender.stats
+
+    assert asyncio.run(scenario()).dropped == 1
+
+
+def test_client_errors_are_not_retried():
+    async def deliver(sender):
+        sender.send("x")
+
+    posted, stats = run_against([web.Response(status=400, text="bad")], deliver)
+    assert len(posted) == 1
+    assert (stats.failed, stats.sent) == (1, 0)
@@ -0,0 +1,38 @@
+import asyncio
+
+from aiohttp.test_utils import TestClient, TestServer
+
+from bot.webhook_server import WebhookServer
+
+
+def requests(server, *calls):
+    """Run ``(method, path, options)`` calls against ``server`` on one loop."""
+
+    async def scenario():
+        results = []
+        async with TestClient(TestServer(server.app)) as client:
+            for method, path, options in calls:
+                response = await client.request(method, path, **options)
+                results.append((response.status, await response.text()))
+        return results
+
+    return asyncio.run(scenario())
+
+
+def test_health_and_index():
+    (health, _), (index, body) = requests(
+        WebhookServer(path="/hook"), ("GET", "/health", {}), ("GET", "/", {})
+    )
+    assert (health, index) == (200, 200)
+    assert '"/hook"' in body
+
+
+def test_webhook_without_interactions_acknowledges_json():
+    received, invalid = requests(
+        WebhookServer(path="/hook"),
+        ("POST", "/hook", {"json": {"type": 1}}),
+        ("POST", "/hook", {"data": b"not json"}),
+    )
+    assert received == (200, '{"status": "received"}')
+    assert invalid[0] == 400
+